@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import hash_password, verify_password
-from app.core.jwt import create_access_token
-from app.models.user import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
+from app.core.security import get_current_user, authorized_user_id, load_user, check_admin_role
+from app.core.password_hashing import password_hasher, PasswordHashingOverloaded
 from app.services.auth_service import AuthService  # Service import edildi
+from app.schemas.auth import CurrentUser
 from pydantic import BaseModel
 from typing import Optional
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
+auth_service = AuthService()
+
+# Seviye testi: her zorluk seviyesinden 2 soru (bkz. PlacementSampler)
+PLACEMENT_QUESTION_COUNT = 10
 
 class UserRegister(BaseModel):
     username: str
@@ -20,30 +25,39 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+def _busy(e: PasswordHashingOverloaded):
+    # Giriş yoğunluğunda bcrypt havuzu doluysa beklemeden reddedilir
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
 @router.post("/register")
-def register(user: UserRegister, db: Session = Depends(get_db)):
-    auth_service = AuthService()
+async def register(user: UserRegister, db: AsyncSession = Depends(get_async_db)):
     # Check if email exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await auth_service.async_user_repository.get_by_email(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    auth_service.register(db, user.username, user.email, user.password, user.role)
+    try:
+        await auth_service.register_async(db, user.username, user.email, user.password, user.role)
+    except PasswordHashingOverloaded as e:
+        raise _busy(e)
     return {"message": "User created successfully"}
 
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    auth_service = AuthService()
-    result = auth_service.login(db, user.email, user.password)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    try:
+        result = await auth_service.login_async(db, user.email, user.password)
+    except PasswordHashingOverloaded as e:
+        raise _busy(e)
     if not result:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return result
 
-@router.get("/me/{user_id}")
-def get_user_status(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+@router.get("/hashing/stats")
+def get_hashing_stats(admin_check = Depends(check_admin_role)):
+    # bcrypt süreç havuzu doluluğu ve reddedilen istekler
+    return password_hasher.stats()
+
+def _user_status(user: CurrentUser):
     return {
         "id": user.id,
         "username": user.username,
@@ -52,30 +66,28 @@ def get_user_status(user_id: int, db: Session = Depends(get_db)):
         "is_placement_completed": user.is_placement_completed
     }
 
+@router.get("/me")
+async def get_my_status(current_user: CurrentUser = Depends(get_current_user)):
+    # Token sahibi; kullanıcı satırı get_current_user ile zaten önbellekten geldi
+    return _user_status(current_user)
+
+@router.get("/me/{user_id}")
+async def get_user_status(user_id: int = Depends(authorized_user_id)):
+    user = await load_user(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return _user_status(user)
+
 @router.post("/complete-placement/{user_id}")
-def complete_placement(user_id: int, score: int, db: Session = Depends(get_db)):
-    auth_service = AuthService()
-    user = db.query(User).filter(User.id == user_id).first()
-    
+def complete_placement(score: int, user_id: int = Depends(authorized_user_id), db: Session = Depends(get_db)):
+    # Puan, soru zorluk ölçeğindeki başlangıç yeteneğine çevrilir (Level 1-5)
+    # Seviyeyi kaydeder ve öğrencinin önbellekteki sonuçlarını temizler
+    user = auth_service.update_placement_status(db, user_id, score, PLACEMENT_QUESTION_COUNT)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Yeni ve Hassas Seviye Mantığı (10 soru üzerinden)
-    # 0-3 doğru: Level 1 (Beginner)
-    # 4-7 doğru: Level 2 (Intermediate)
-    # 8-10 doğru: Level 3 (Advanced)
-    new_level = 1
-    if score >= 8:
-        new_level = 3
-    elif score >= 4:
-        new_level = 2
-    
-    user.current_level = new_level
-    user.is_placement_completed = True
-    db.commit()
-    
     return {
         "message": "Diagnostic completed", 
-        "new_level": new_level,
+        "new_level": user.current_level,
         "score": score
     }
\ No newline at end of file
@@ -1,45 +1,140 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.schemas.history import HistoryCreate, HistoryResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import engine, async_engine, get_db, get_async_db
+from app.core.db_pool import pool_stats
+from app.schemas.history import HistoryCreate, HistoryResponse, HistoryBatchCreate, HistoryBatchResponse
 from app.services.history_service import HistoryService
-from app.core.security import check_admin_role
+from app.services.recommendation_service import RecommendationService
+from app.core.security import check_admin_role, authorized_user_id, token_cache
+from app.core.cache import result_cache
+from app.services.catalogue_cache import catalogue_cache
+from app.services.answer_ingestion import answer_buffer, IngestionOverloaded
+from app.services.history_snapshot import history_snapshot, SnapshotUnavailable
 
 
 router = APIRouter(prefix="/history", tags=["Student History"])
 history_service = HistoryService()
+recommendation_service = RecommendationService()
+
+# live: canlı tablolar, snapshot: son aktarılan sütunsal görüntü (canlı veritabanına yük bindirmez)
+SOURCE = Query("live", pattern="^(live|snapshot)$")
+
+def _from_source(compute):
+    try:
+        return compute()
+    except SnapshotUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 @router.post("/submit", response_model=HistoryResponse)
-def submit_answer(history_data: HistoryCreate, user_id: int, db: Session = Depends(get_db)):
+async def submit_answer(
+    history_data: HistoryCreate,
+    user_id: int = Depends(authorized_user_id), # Verilmezse token sahibi
+    db: AsyncSession = Depends(get_async_db),
+    sync_db: Session = Depends(get_db) # Oturumlar bağlantıyı ilk sorguda alır; kullanılmayan boşa bağlantı tutmaz
+):
+    try:
+        if answer_buffer.running:
+            # Cevap hemen değerlendirilip onaylanır, kayıt arka planda toplu yazılır
+            return await history_service.queue_answer_async(db, user_id, history_data, answer_buffer)
+        # Sayaç/yetenek/seviye güncellemeleri tek transaction'da. ORM / Elo işi cevap başına ~10 ms CPU:
+        # olay döngüsünü tutmasın diye thread havuzunda, sync oturumla çalışır
+        return await run_in_threadpool(history_service.submit_answer, sync_db, user_id, history_data)
+    except IngestionOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/submit-batch", response_model=HistoryBatchResponse)
+def submit_answers(
+    batch: HistoryBatchCreate,
+    user_id: int = Depends(authorized_user_id),
+    db: Session = Depends(get_db)
+):
+    # Bir quiz denemesinin tüm cevapları tek istek ve tek transaction ile kaydedilir
     try:
-        return history_service.submit_answer(db, user_id, history_data)
+        return history_service.submit_answers(db, user_id, batch.answers)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/stats/{user_id}")
-def get_student_stats(user_id: int, db: Session = Depends(get_db)):
+def get_student_stats(user_id: int = Depends(authorized_user_id), db: Session = Depends(get_db)):
     stats = history_service.get_user_stats(db, user_id)
     if not stats:
         raise HTTPException(status_code=404, detail="İstatistik bulunamadı")
     return stats
 
 @router.get("/summary/{user_id}")
-def get_advanced_summary(user_id: int, db: Session = Depends(get_db)):
+def get_advanced_summary(
+    user_id: int = Depends(authorized_user_id),
+    source: str = SOURCE,
+    db: Session = Depends(get_db)
+):
     # Öğrenciye ait daha fazla detay sunan gelişmiş analiz yolu
-    return history_service.get_user_summary(db, user_id)
+    return _from_source(lambda: history_service.get_user_summary(db, user_id, source))
 
 @router.get("/recommendation/{user_id}")
-def get_adaptive_recommendation(user_id: int, db: Session = Depends(get_db)):
+def get_adaptive_recommendation(user_id: int = Depends(authorized_user_id), db: Session = Depends(get_db)):
     # AI/Adaptif mantığına göre öğrenciye özel yönlendirme
-    return history_service.get_adaptive_recommendation(db, user_id)
+    return recommendation_service.get_adaptive_recommendation(db, user_id)
+
+@router.get("/ability/{user_id}")
+def get_student_ability(user_id: int = Depends(authorized_user_id), db: Session = Depends(get_db)):
+    # Genel ve ders bazlı yetenek tahminleri (theta) ve karşılık gelen seviyeler
+    return history_service.ability_service.get_user_abilities(db, user_id)
 
 @router.get("/trend/{user_id}")
-def get_learning_trend(user_id: int, db: Session = Depends(get_db)):
-    return history_service.get_user_trend(db, user_id)
+def get_learning_trend(
+    user_id: int = Depends(authorized_user_id),
+    period: str = Query("week", pattern="^(day|week)$"),
+    days: int = Query(365, ge=1, le=3660),
+    lesson_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    # Gün / hafta başına cevap, doğruluk ve ortalama süre (ham geçmiş yerine rollup tablosundan)
+    return history_service.get_user_trend(db, user_id, period, days, lesson_id)
 
 @router.get("/teacher/analytics")
 def get_teacher_analytics(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500), # Boş bırakılırsa tüm öğrenciler
+    sort_by: str = Query("id", pattern="^(id|username|accuracy|total_xp|total_solved)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    source: str = SOURCE,
     db: Session = Depends(get_db),
     admin_check = Depends(check_admin_role) # Sadece öğretmen/admin görebilir
 ):
-    return history_service.get_class_analytics(db)
\ No newline at end of file
+    return _from_source(lambda: history_service.get_class_analytics(
+        db, skip=skip, limit=limit, sort_by=sort_by, order=order, source=source))
+
+@router.get("/teacher/lessons/{lesson_id}/report")
+def get_lesson_report(
+    lesson_id: int,
+    source: str = SOURCE,
+    db: Session = Depends(get_db),
+    admin_check = Depends(check_admin_role)
+):
+    # Soru bazlı cevap sayısı, doğruluk ve ortalama süre
+    return _from_source(lambda: history_service.get_lesson_report(db, lesson_id, source))
+
+@router.get("/snapshot/status")
+def get_snapshot_status(admin_check = Depends(check_admin_role)):
+    # Son aktarım zamanı, satır ve parça sayısı
+    return history_snapshot.status()
+
+@router.get("/ingestion/stats")
+def get_ingestion_stats(admin_check = Depends(check_admin_role)):
+    # Yazma arabelleği: kuyruk derinliği, batch boyutları, flush gecikmesi
+    return answer_buffer.stats()
+
+@router.get("/cache/stats")
+def get_cache_stats(admin_check = Depends(check_admin_role)):
+    # Önbellek isabet/ıska sayaçları (kullanıcı sonuçları + ders/soru kataloğu)
+    return {**result_cache.stats(), "catalogue": catalogue_cache.stats(), "tokens": token_cache.stats()}
+
+@router.get("/db/pool-stats")
+def get_db_pool_stats(admin_check = Depends(check_admin_role)):
+    # Bağlantı havuzu: doluluk, checkout bekleme süreleri, zaman aşımları
+    return {"sync": pool_stats(engine), "async": pool_stats(async_engine.sync_engine)}
@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.schemas.lessons import LessonCreate, LessonResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_db, get_async_db
+from app.schemas.lessons import LessonCreate, LessonResponse, LessonSummary
 from app.services.lessons_service import LessonService
+from app.services.catalogue_cache import catalogue_cache
 
 router = APIRouter(prefix="/lessons", tags=["Lessons"])
 lesson_service = LessonService()
 
-@router.get("/", response_model=List[LessonResponse])
-def get_all_lessons(db: Session = Depends(get_db)):
-    return lesson_service.get_all_lessons(db)
+@router.get("/", response_model=List[LessonSummary])
+async def get_all_lessons(
+    after: Optional[int] = Query(None, ge=0), # Önceki sayfanın X-Next-Cursor başlığı
+    limit: Optional[int] = Query(None, ge=1, le=500), # ikisi de yoksa tüm liste (eski istemciler)
+    difficulty: Optional[str] = Query(None, pattern="^(easy|medium|hard)$"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Özet liste (content_text yok); katalog önbelleğinden, istemcinin ETag'i güncelse 304
+    entry = await lesson_service.get_lessons_page(db, after, limit, difficulty)
+    return catalogue_cache.to_response(entry, if_none_match)
 
 @router.post("/", response_model=LessonResponse)
 def create_new_lesson(
@@ -20,11 +30,16 @@ def create_new_lesson(
     return lesson_service.create_lesson(db, lesson)
 
 @router.get("/{lesson_id}", response_model=LessonResponse)
-def get_lesson_detail(lesson_id: int, db: Session = Depends(get_db)):
-    lesson = lesson_service.get_lesson_by_id(db, lesson_id)
-    if not lesson:
+async def get_lesson_detail(
+    lesson_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Tam içerik sadece detayda
+    entry = await lesson_service.get_lesson_detail(db, lesson_id)
+    if not entry:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    return lesson
+    return catalogue_cache.to_response(entry, if_none_match)
 
 # --- DÜZELTİLEN SİLME FONKSİYONU ---
 @router.delete("/{lesson_id}")
@@ -37,4 +52,4 @@ def delete_lesson(lesson_id: int, db: Session = Depends(get_db)):
     # 2. Varsa sil (Artık servisi çağırıyoruz)
     lesson_service.delete_lesson(db, lesson_id)
     
-    return {"message": "Lesson deleted successfully"}
\ No newline at end of file
+    return {"message": "Lesson deleted successfully"}
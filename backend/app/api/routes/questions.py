@@ -1,22 +1,67 @@
 from sqlalchemy import func
 from app.models.questions import Question
 from sqlalchemy.sql.expression import func
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.schemas.questions import QuestionCreate, QuestionResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
+from app.schemas.questions import QuestionCreate, QuestionResponse, QuestionPublic, QuestionSummary, BulkGenerationRequest
 from app.services.questions_service import QuestionService
-from typing import List
-from app.core.security import check_admin_role
-from app.services.ai_service import AIService # AI Service importu
+from app.services.item_stats_service import ItemStatsService
+from typing import List, Optional, Union
+from app.core.security import check_admin_role, authorized_user_id
+from app.services.generation_jobs import generation_queue
+from app.services.ai_service import get_ai_service
+from app.services.bulk_generation import BulkGenerationService
+from app.services.question_index import PlacementSampler, NextQuestionSelector
+from app.services.catalogue_cache import catalogue_cache
 from app.models.lessons import Lesson
 
 router = APIRouter(prefix="/questions", tags=["Questions"])
 question_service = QuestionService()
+bulk_generation_service = BulkGenerationService(generation_queue)
+placement_sampler = PlacementSampler()
+next_question_selector = NextQuestionSelector()
+item_stats_service = ItemStatsService()
 
-@router.get("/lesson/{lesson_id}", response_model=List[QuestionResponse])
-def get_questions_by_lesson(lesson_id: int, db: Session = Depends(get_db)):
-    return question_service.get_lesson_questions(db, lesson_id)
+@router.get("/", response_model=List[QuestionSummary])
+async def list_questions(
+    lesson_id: Optional[int] = None,
+    difficulty_level: Optional[int] = Query(None, ge=1, le=5),
+    after: Optional[int] = Query(None, ge=0), # Önceki sayfanın X-Next-Cursor başlığı
+    limit: int = Query(100, ge=1, le=500),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Özet liste (şıklar / doğru cevap yok); tam soru için /questions/{id}
+    entry = await question_service.get_questions_page(db, lesson_id, after, limit, difficulty_level)
+    return catalogue_cache.to_response(entry, if_none_match)
+
+# view=full -> QuestionResponse listesi, view=summary -> QuestionSummary listesi
+@router.get("/lesson/{lesson_id}", response_model=Union[List[QuestionResponse], List[QuestionSummary]])
+async def get_questions_by_lesson(
+    lesson_id: int,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    difficulty_level: Optional[int] = Query(None, ge=1, le=5),
+    after: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500), # ikisi de yoksa dersin tüm soruları (quiz sayfaları)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Değişmemiş katalog için 304 (veritabanı ve serileştirme yok)
+    entry = await question_service.get_questions_page(
+        db, lesson_id, after, limit, difficulty_level, summary=view == "summary")
+    return catalogue_cache.to_response(entry, if_none_match)
+
+@router.get("/next/{lesson_id}", response_model=QuestionPublic)
+def get_next_question(lesson_id: int, user_id: int = Depends(authorized_user_id), db: Session = Depends(get_db)):
+    # Öğrencinin yeteneğine en uygun, henüz cevaplamadığı tek soru (doğru cevap olmadan)
+    question = next_question_selector.select(db, user_id, lesson_id)
+    if not question:
+        raise HTTPException(status_code=404, detail="No unanswered questions left in this lesson")
+    return question
 
 @router.post("/", response_model=QuestionResponse)
 def add_question(
@@ -46,41 +91,103 @@ def delete_question(
         raise HTTPException(status_code=404, detail="Soru bulunamadı")
     return {"message": "Soru başarıyla silindi"}
 
-# --- AI ENDPOINT ---
-@router.post("/generate/{lesson_id}")
+# --- TOPLU AI ÜRETİMİ (NDJSON / SSE AKIŞI) ---
+# Not: /generate/{lesson_id} rotasından önce tanımlanmalı
+@router.post("/generate/bulk")
+def generate_bulk_questions(
+    request: BulkGenerationRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    db: Session = Depends(get_db),
+    admin_check = Depends(check_admin_role)
+):
+    if any(level < 1 or level > 5 for level in request.counts):
+        raise HTTPException(status_code=400, detail="Difficulty levels must be between 1 and 5")
+
+    # Dersler tek IN sorgusuyla
+    lessons = db.query(Lesson.id, Lesson.title).filter(Lesson.id.in_(request.lesson_ids)).all()
+    missing = set(request.lesson_ids) - {l_id for l_id, _ in lessons}
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Lessons not found: {sorted(missing)}")
+
+    batches = bulk_generation_service.plan_batches(lessons, request.counts, request.batch_size)
+
+    def encode():
+        for event in bulk_generation_service.stream(batches):
+            if format == "sse":
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            else:
+                yield json.dumps(event) + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(encode(), media_type=media_type)
+
+# --- AI ENDPOINT (ARKA PLAN İŞİ) ---
+@router.post("/generate/{lesson_id}", status_code=202)
 def generate_ai_questions(lesson_id: int, db: Session = Depends(get_db)):
     # 1. Dersi bul
     lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
-    # 2. AI Servisini Çağır
-    ai_service = AIService()
-    generated_data = ai_service.generate_questions(topic=lesson.title, difficulty=lesson.difficulty.value)
-
-    # 3. Kaydet
-    new_questions = []
-    for q_data in generated_data:
-        new_q = Question(
-            lesson_id=lesson.id,
-            content=q_data["content"],
-            option_a=q_data["option_a"],
-            option_b=q_data["option_b"],
-            option_c=q_data["option_c"],
-            option_d=q_data["option_d"],
-            correct_answer=q_data["correct_answer"],
-            difficulty_level=q_data.get("difficulty_level", 3)
-        )
-        db.add(new_q)
-        new_questions.append(new_q)
-    
-    db.commit()
-    return {"message": f"{len(new_questions)} AI questions generated successfully!", "count": len(new_questions)}
+    # 2. Üretimi kuyruğa ekle (aynı ders + zorluk için bekleyen iş varsa ona bağlanır)
+    job, created = generation_queue.submit(lesson.id, lesson.title, lesson.difficulty.value)
+    return {
+        "message": "AI question generation started." if created else "AI question generation already in progress.",
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": not created
+    }
+
+@router.get("/generate/jobs/{job_id}")
+def get_generation_job(job_id: str):
+    job = generation_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/ai/stats")
+def get_ai_stats(admin_check = Depends(check_admin_role)):
+    # Model çağrı gecikmesi ve prompt önbelleği isabet oranı
+    return get_ai_service().stats()
 
 @router.get("/placement-test")
-def get_placement_questions(db: Session = Depends(get_db)):
-    all_questions = []
-    for level in range(1, 6):
-        questions = db.query(Question).filter(Question.difficulty_level == level).order_by(func.rand()).limit(2).all()
-        all_questions.extend(questions)
-    return all_questions
\ No newline at end of file
+def get_placement_questions(seed: Optional[int] = None, db: Session = Depends(get_db)):
+    # Her zorluk seviyesinden 2 soru; bellek içi indeksten seçilip tek IN sorgusuyla getirilir
+    return placement_sampler.sample(db, seed=seed)
+
+# --- MADDE İSTATİSTİKLERİ (ÖĞRETMEN) ---
+@router.get("/item-stats")
+def get_item_stats(
+    lesson_id: Optional[int] = None,
+    flagged: bool = False, # Sadece uyarı alan (anahtarı şüpheli, ayırt ediciliği düşük...) sorular
+    min_attempts: int = Query(0, ge=0),
+    sort_by: str = Query("id", pattern="^(id|attempts|p_value|discrimination)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    admin_check = Depends(check_admin_role)
+):
+    # Cevaplarla birlikte güncellenen hazır satırlardan okunur; geçmiş taranmaz
+    return item_stats_service.get_item_stats(
+        db, lesson_id=lesson_id, flagged=flagged, min_attempts=min_attempts,
+        sort_by=sort_by, order=order, skip=skip, limit=limit)
+
+@router.get("/{question_id}/item-stats")
+def get_question_item_stats(question_id: int, db: Session = Depends(get_db), admin_check = Depends(check_admin_role)):
+    stats = item_stats_service.get_question_item_stats(db, question_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Bu soru için henüz cevap yok")
+    return stats
+
+# Not: tek parçalı diğer GET rotalarından (placement-test, item-stats) sonra tanımlanmalı
+@router.get("/{question_id}", response_model=QuestionResponse)
+async def get_question_detail(
+    question_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    entry = await question_service.get_question_detail(db, question_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Soru bulunamadı")
+    return catalogue_cache.to_response(entry, if_none_match)
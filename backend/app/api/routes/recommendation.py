@@ -1,79 +1,49 @@
-from fastapi import APIRouter, Depends
+import json
+from collections import Counter
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.services.history_service import HistoryService
-from app.models.lessons import Lesson
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db, SessionLocal
+from app.services.recommendation_service import RecommendationService
+from app.services.class_recommendation import ClassRecommendationService
+from app.core.security import authorized_user_id, check_admin_role
 
 router = APIRouter(prefix="/recommendation", tags=["AI Recommendation"])
-history_service = HistoryService()
+recommendation_service = RecommendationService()
+class_recommendation_service = ClassRecommendationService()
 
 @router.get("/next-step/{user_id}")
-def get_ai_recommendation(user_id: int, db: Session = Depends(get_db)):
-    summary = history_service.get_user_summary(db, user_id)
-    lesson_breakdown = summary.get("lesson_breakdown", {})
-    total_stats = summary.get("total_stats", {})
-    
-    # --- SENARYO 1: YENİ KULLANICI (HİÇ VERİ YOK) ---
-    if not lesson_breakdown:
-        return {
-            "title": "Welcome, Future Expert! 🚀",
-            "message": "I'm your AI Coach. To build your personalized path, I need to see you in action!",
-            "recommended_action": "Start Diagnostic Test",
-            "reason": "We need to calibrate your learning map.",
-            "adaptive_tip": "Don't worry about mistakes. Just do your best!",
-            "priority": "high",
-            "is_critical": False,
-            "target_lesson": None
-        }
-    
-    # En zayıf dersi bul
-    weakest_lesson = min(lesson_breakdown, key=lesson_breakdown.get)
-    success_rate = lesson_breakdown[weakest_lesson]
-    
-    avg_time = total_stats.get("avg_time", 30) 
-    
-    # --- MOTIVATIONAL AI LOGIC (COACH MODE) ---
-    is_critical = False
-    title = ""
-    message = ""
-    
-    if success_rate < 45:
-        # Durum: Kritik (Ama destekleyici dil)
-        is_critical = True
-        title = "We believe in you! 💪"
-        action = "Review & Retry"
-        reason = f"It seems '{weakest_lesson}' is a bit tricky right now ({int(success_rate)}%). That's totally normal!"
-        message = "Success isn't about never failing, it's about never quitting. Let's look at the materials again."
-        tip = "Take your time reading the PDF summary before the quiz. No rush!"
-        
-    elif success_rate < 75:
-        # Durum: Gelişiyor (Hız ve Dikkat analizi)
-        title = "Great progress! 🌟"
-        if avg_time < 15: 
-            action = "Slow Down a Bit"
-            reason = "You have the speed of a cheetah, but let's sharpen the accuracy."
-            message = "You're answering very fast. If we slow down just a little, your score will skyrocket!"
-            tip = "Read the question twice. The answer is often hiding in the details."
-        else:
-            action = "Reinforce Knowledge"
-            reason = f"You're doing well in '{weakest_lesson}', just a few steps away from mastery."
-            message = "You are building a solid foundation. Keep pushing!"
-            tip = "Try solving similar questions to turn that 'Good' into 'Perfect'."
-    else:
-        # Durum: Usta (Challenge Modu)
-        title = "You're on Fire! 🔥"
-        action = "Level Up Challenge"
-        reason = f"You've dominated '{weakest_lesson}'. It's too easy for you now."
-        message = "Excellent work! I'm updating your curriculum to include more advanced challenges."
-        tip = "You're ready for the Hard mode. Let's test your limits!"
+async def get_ai_recommendation(user_id: int = Depends(authorized_user_id), db: AsyncSession = Depends(get_async_db)):
+    return await recommendation_service.get_next_step_async(db, user_id)
 
+@router.get("/class")
+def get_class_recommendations(
+    level: Optional[int] = Query(None, ge=1, le=5), # Sadece bu seviyedeki öğrenciler
+    after: int = Query(0, ge=0),                    # Öğrenci id cursor'ı (sonraki sayfa)
+    limit: Optional[int] = Query(None, ge=1),       # Boş bırakılırsa tüm öğrenciler
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+    admin_check = Depends(check_admin_role)
+):
+    # Tüm sınıfın sonraki adımı tek istekte; ndjson'da öğrenciler hesaplandıkça satır satır gönderilir
+    if format == "ndjson":
+        def encode():
+            # Akış yanıt gönderilirken sürer; istek oturumundan bağımsız kendi oturumu
+            stream_db = SessionLocal()
+            try:
+                for recommendation in class_recommendation_service.iter_recommendations(
+                        stream_db, level=level, after_id=after, limit=limit):
+                    yield json.dumps(recommendation, ensure_ascii=False) + "\n"
+            finally:
+                stream_db.close()
+        return StreamingResponse(encode(), media_type="application/x-ndjson")
+
+    students = list(class_recommendation_service.iter_recommendations(db, level=level, after_id=after, limit=limit))
     return {
-        "title": title,                 # UI Başlığı (Yeni)
-        "message": message,             # UI Motivasyon Mesajı (Yeni)
-        "recommended_action": action,   # Buton Metni
-        "reason": reason,               # Analiz Nedeni
-        "adaptive_tip": tip,            # İpucu
-        "priority": "high" if is_critical else "normal",
-        "is_critical": is_critical,
-        "target_lesson": weakest_lesson
-    }
\ No newline at end of file
+        "total": len(students),
+        "actions": Counter(s["recommended_action"] for s in students),
+        "next_after": students[-1]["user_id"] if students else None,
+        "students": students,
+    }
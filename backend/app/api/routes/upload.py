@@ -1,32 +1,39 @@
-import shutil
-import os
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from app.core.config import settings
+from app.services.upload_store import ContentAddressedStore, UploadTooLarge, InvalidUpload
 
 router = APIRouter(tags=["File Upload"])
+upload_store = ContentAddressedStore()
 
-# Upload klasörünü tanımla
-UPLOAD_DIR = "uploads"
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
+# Swagger'da dosya seçme alanı görünsün diye gövde şeması elle verilir
+UPLOAD_BODY = {
+    "required": True,
+    "content": {"multipart/form-data": {"schema": {
+        "type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}},
+    }}},
+}
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+@router.post("/upload", openapi_extra={"requestBody": UPLOAD_BODY})
+async def upload_file(request: Request):
+    # Form alanı yine "file"; gövde UploadFile'a toplanmadan akış halinde okunur (bkz. upload_store)
     try:
-        # Dosya adına zaman damgası ekle (Çakışmayı önlemek için)
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{timestamp}_{file.filename}"
-        file_location = f"{UPLOAD_DIR}/{filename}"
-        
-        # Dosyayı sunucuya kaydet
-        with open(file_location, "wb+") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Erişim linkini döndür (Backend URL'i + dosya yolu)
-        # Not: Frontend bu linki alıp veritabanına kaydedecek
-        return {
-            "url": f"http://127.0.0.1:8000/uploads/{filename}",
-            "filename": filename
-        }
+        upload_store.check_content_length(request.headers.get("content-length"))
+        stored = await upload_store.save_multipart(request.stream(), request.headers.get("content-type"))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
+
+    # Erişim linkini döndür (içerik adresli yol: aynı dosya her zaman aynı link)
+    # Not: Frontend bu linki alıp veritabanına kaydedecek
+    return {
+        "url": f"{settings.UPLOAD_PUBLIC_URL}/{stored['path']}",
+        # Eskisi gibi /uploads altındaki saklanan ad; istemcinin verdiği ad ayrıca döner
+        "filename": stored["path"],
+        "original_filename": stored["original_filename"],
+        "sha256": stored["sha256"],
+        "size": stored["size"],
+        "deduplicated": stored["deduplicated"],
+    }
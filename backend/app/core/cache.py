@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from app.core.config import settings
+
+# Kullanıcı başına önbelleğe alınan görünümler.
+# Geçersiz kılma bu listeyi kullanır, yeni bir görünüm eklenirse buraya da yazılmalı.
+USER_VIEWS = ("stats", "summary", "next_step")
+# Kullanıcı satırı (get_current_user); her cevapta değil, sadece seviye / seviye testi değişince silinir
+IDENTITY_VIEW = "identity"
+
+
+def user_key(user_id: int, view: str) -> str:
+    return f"user:{user_id}:{view}"
+
+
+class CacheBackend(ABC):
+    """Önbellek arka uçları için ortak arayüz"""
+
+    @abstractmethod
+    def get(self, key: str):
+        """Değer yoksa veya süresi dolduysa None döner"""
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: int):
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Süreç içi TTL + LRU önbellek (thread-safe)"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: int):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExternalCacheBackend(CacheBackend):
+    """
+    Harici bir anahtar-değer deposunu (örn. Redis) saran arka uç.
+    İstemcinin get(key), set(key, value, ex=saniye) ve delete(*keys) metotları olması yeterlidir.
+    Değerler JSON olarak saklanır.
+    """
+
+    def __init__(self, client, prefix: str = "adaptive:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, value, ttl: int):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*[self.prefix + k for k in keys])
+
+    def clear(self):
+        # Harici depoda toplu silme yapılmaz, anahtarlar TTL ile düşer
+        pass
+
+
+class LocalKVStore:
+    """ExternalCacheBackend arayüzünü karşılayan yerel (Redis yerine geçen) istemci"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            expires_at = time.monotonic() + ex if ex else None
+            self._data[key] = (expires_at, value.encode() if isinstance(value, str) else value)
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for k in keys if self._data.pop(k, None) is not None)
+
+
+class ResultCache:
+    """
+    Kullanıcı bazlı sonuç önbelleği; isabet/ıska sayaçlarını tutar.
+    Her kullanıcının bir nesil sayacı vardır: hesaplama sürerken gelen invalidate_user nesli artırır
+    ve hesaplanan (artık eski) değer önbelleğe yazılmaz.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = 60, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_skips = 0
+        self._generations = {}  # user_id -> nesil
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, user_id: int, view: str, compute, ttl: int = None):
+        """ttl: bu görünüm için varsayılandan farklı süre (saniye)"""
+        if not self.enabled:
+            return compute()
+        key = user_key(user_id, view)
+        hit, value, generation = self._lookup(user_id, key)
+        if hit:
+            return value
+        value = compute()
+        self._store(user_id, key, value, generation, ttl)
+        return value
+
+    async def aget_or_compute(self, user_id: int, view: str, compute, ttl: int = None):
+        """get_or_compute'un async rotalar için hali; compute bir coroutine fonksiyonudur"""
+        if not self.enabled:
+            return await compute()
+        key = user_key(user_id, view)
+        hit, value, generation = self._lookup(user_id, key)
+        if hit:
+            return value
+        value = await compute()
+        self._store(user_id, key, value, generation, ttl)
+        return value
+
+    def _lookup(self, user_id: int, key: str):
+        """(isabet mi, değer, hesaplamaya başlanan nesil)"""
+        with self._lock:
+            generation = self._generations.get(user_id, 0)
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value is not None, value, generation
+
+    def _store(self, user_id: int, key: str, value, generation: int, ttl: int = None):
+        if value is None or self._is_stale(user_id, generation):
+            return
+        self.backend.set(key, value, ttl or self.ttl)
+        # Yazma ile nesil kontrolü arasında gelen invalidate_user'ın silmesi bu yazmadan önce kalmış olabilir
+        if self._is_stale(user_id, generation):
+            self.backend.delete(key)
+
+    def _is_stale(self, user_id: int, generation: int) -> bool:
+        with self._lock:
+            if self._generations.get(user_id, 0) == generation:
+                return False
+            # Hesaplama sırasında kullanıcının verisi değişti
+            self.stale_skips += 1
+            return True
+
+    def invalidate_user(self, user_id: int, identity: bool = False):
+        """Kullanıcının verisi değiştiğinde (cevap, seviye testi) tüm görünümlerini siler"""
+        views = USER_VIEWS + (IDENTITY_VIEW,) if identity else USER_VIEWS
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.invalidations += 1
+        self.backend.delete(*[user_key(user_id, view) for view in views])
+
+    def stats(self):
+        total = self.hits + self.misses
+        stats = {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0,
+            "invalidations": self.invalidations,
+            "stale_skips": self.stale_skips,
+        }
+        if isinstance(self.backend, InMemoryCacheBackend):
+            stats["entries"] = len(self.backend)
+            stats["max_entries"] = self.backend.max_entries
+            stats["evictions"] = self.backend.evictions
+        return stats
+
+
+def build_backend(name: str) -> CacheBackend:
+    if name == "external":
+        return ExternalCacheBackend(LocalKVStore())
+    return InMemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+result_cache = ResultCache(
+    build_backend(settings.CACHE_BACKEND),
+    ttl=settings.CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED,
+)
+
+
+def configure_result_cache(backend: CacheBackend):
+    """Uygulama başlarken gerçek bir harici istemciyle (örn. redis.Redis) arka ucu değiştirmek için"""
+    result_cache.backend = backend
+    return result_cache
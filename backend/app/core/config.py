@@ -3,11 +3,112 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# backend klasörü; göreli veri klasörleri çalışma dizininden bağımsız olarak buna göre çözülür
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _parse_limits(value: str) -> dict:
+    """ "gemini=2,mock=8" biçimindeki ayarı {"gemini": 2, "mock": 8} sözlüğüne çevirir"""
+    limits = {}
+    for part in value.split(","):
+        if "=" in part:
+            name, limit = part.split("=", 1)
+            limits[name.strip()] = int(limit)
+    return limits
+
 class Settings:
     DB_HOST = os.getenv("DB_HOST")
     DB_PORT = os.getenv("DB_PORT")
     DB_NAME = os.getenv("DB_NAME")
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
+    # Tam bağlantı adresi verilirse DB_* ayarları yerine kullanılır (örn. benchmark için sqlite://)
+    DATABASE_URL = os.getenv("DATABASE_URL")
+    # Async rotalar için adres; boşsa DATABASE_URL'in async sürücülü hali kullanılır
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+    # Bağlantı havuzu (sync ve async motorlar için ayrı ayrı uygulanır)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    # Havuz doluyken bağlantı için en fazla beklenecek süre (saniye)
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Bu süreden eski bağlantılar yenilenir (MySQL wait_timeout'undan kısa olmalı), -1: kapalı
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    # Ping stratejisi: "always" (her checkout), "idle" (sadece uzun süre boşta kalanlar), "never"
+    DB_PRE_PING = os.getenv("DB_PRE_PING", "idle")
+    DB_PRE_PING_IDLE_SECONDS = float(os.getenv("DB_PRE_PING_IDLE_SECONDS", "60"))
+    # SELECT sorguları için süre sınırı (ms, MySQL max_execution_time), 0: kapalı
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+    # Sonuç önbelleği (istatistik / özet / öneri uç noktaları)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # "memory" veya "external"
+    CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    # Ders / soru kataloğu önbelleği; değişiklikler aynı süreçte anında, diğer worker'larda TTL sonunda görünür
+    CATALOGUE_CACHE_ENABLED = os.getenv("CATALOGUE_CACHE_ENABLED", "true").lower() == "true"
+    CATALOGUE_CACHE_TTL_SECONDS = int(os.getenv("CATALOGUE_CACHE_TTL_SECONDS", "300"))
+    # Önbellekte tutulan en fazla sayfa / detay cevabı (LRU)
+    CATALOGUE_CACHE_MAX_ENTRIES = int(os.getenv("CATALOGUE_CACHE_MAX_ENTRIES", "2048"))
+
+    # Sıradaki soru seçimi: öğrencinin cevapladığı soruların bellekteki kümesi bu süre sonunda yeniden okunur
+    # (diğer worker'larda verilen cevaplar); seçilen soru ayrıca veritabanında tekrar kontrol edilir
+    ANSWERED_CACHE_TTL_SECONDS = int(os.getenv("ANSWERED_CACHE_TTL_SECONDS", "30"))
+
+    # Kimlik doğrulama: doğrulanmış token önbelleği (token süresi dolana kadar) ve kullanıcı satırı önbelleği
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    AUTH_USER_CACHE_TTL_SECONDS = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+    # Parola hash'leme: bcrypt cost (değişirse eski hash'ler girişte yenilenir), süreç sayısı
+    # ve süreçler meşgulken bekleyebilecek en fazla iş (fazlası 503)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+    # Arka plan AI soru üretimi
+    GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "4"))
+    GENERATION_JOB_HISTORY = int(os.getenv("GENERATION_JOB_HISTORY", "200"))
+    # Sağlayıcı başına aynı anda çalışabilecek üretim sayısı
+    AI_PROVIDER_CONCURRENCY = _parse_limits(os.getenv("AI_PROVIDER_CONCURRENCY", "gemini=2,mock=8,default=1"))
+    # Çok dersli toplu üretim: aynı anda çalışan ve kuyrukta bekleyebilen batch sayısı
+    BULK_GENERATION_CONCURRENCY = int(os.getenv("BULK_GENERATION_CONCURRENCY", "4"))
+    BULK_GENERATION_MAX_IN_FLIGHT = int(os.getenv("BULK_GENERATION_MAX_IN_FLIGHT", "8"))
+
+    # AI modeli ve prompt -> cevap disk önbelleği
+    AI_MODEL_NAME = os.getenv("AI_MODEL_NAME", "gemini-pro")
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+    # Cevap kaydı: "sync" (her istek kendi transaction'ı) veya "buffered" (yazma arabelleği, toplu yazım)
+    INGESTION_MODE = os.getenv("INGESTION_MODE", "sync")
+    INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "20000"))
+    INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "500"))
+    INGESTION_FLUSH_INTERVAL_MS = int(os.getenv("INGESTION_FLUSH_INTERVAL_MS", "200"))
+    # Kuyruk doluysa isteğin en fazla bekleyeceği süre (sonra 503)
+    INGESTION_ENQUEUE_TIMEOUT_MS = int(os.getenv("INGESTION_ENQUEUE_TIMEOUT_MS", "500"))
+    # Onaylanmış ama henüz yazılmamış cevapların kayıt dosyaları. Her worker süreci klasörde kilitli
+    # kendi dilimini (answers-<n>.jsonl + kendi checkpoint'i) kullanır; göreli yol backend klasörüne göredir
+    INGESTION_SPILL_DIR = os.path.join(BACKEND_DIR, os.getenv("INGESTION_SPILL_DIR", ".ingestion"))
+    # Sabit dilim numarası (örn. süreç yöneticisinin worker sırası); boşsa ilk boş dilim alınır
+    INGESTION_WORKER_ID = os.getenv("INGESTION_WORKER_ID")
+    # Geçici hatada (bağlantı, deadlock) bir batch'in en fazla deneme sayısı; sonra reddedilenler dosyasına yazılır
+    INGESTION_MAX_RETRIES = int(os.getenv("INGESTION_MAX_RETRIES", "8"))
+    # true: her cevap diske fsync edilir (elektrik kesintisine karşı), false: sadece işletim sistemine yazılır
+    INGESTION_FSYNC = os.getenv("INGESTION_FSYNC", "false").lower() == "true"
+
+    # Analitik anlık görüntüsü (scripts/export_snapshot.py): sütunsal dosyaların klasörü ve okuma parça boyu
+    ANALYTICS_SNAPSHOT_DIR = os.getenv("ANALYTICS_SNAPSHOT_DIR", ".snapshots/history")
+    ANALYTICS_SNAPSHOT_CHUNK_ROWS = int(os.getenv("ANALYTICS_SNAPSHOT_CHUNK_ROWS", "100000"))
+    # Artımlı aktarımların biriktirdiği küçük parça sayısı bunu aşınca ardışık küçük parçalar birleştirilir
+    ANALYTICS_SNAPSHOT_MAX_SEGMENTS = int(os.getenv("ANALYTICS_SNAPSHOT_MAX_SEGMENTS", "32"))
+
+    # Dosya yükleme: içerik adresli depo klasörü, dosya başına sınır ve diske yazma blok boyu
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+    # Yazılmakta olan yüklemeler: /uploads altında sunulmaz; os.replace ile taşındığı için UPLOAD_DIR ile aynı
+    # dosya sisteminde olmalı. Boşsa UPLOAD_DIR'in yanındaki .uploads-staging klasörü
+    UPLOAD_STAGING_DIR = os.getenv("UPLOAD_STAGING_DIR")
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+    UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+    # Yanıttaki dosya linkinin öneki (statik /uploads sunucusu)
+    UPLOAD_PUBLIC_URL = os.getenv("UPLOAD_PUBLIC_URL", "http://127.0.0.1:8000/uploads")
 
 settings = Settings()
@@ -1,16 +1,21 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.db_pool import engine_options, install_pool_events
 
-DATABASE_URL = (
+DATABASE_URL = settings.DATABASE_URL or (
     f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}"
     f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
 )
 
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True
+    **engine_options(DATABASE_URL)
 )
+install_pool_events(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -18,11 +23,67 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# --- ASYNC (asyncio) ---
+# Aynı veritabanı, async sürücüyle: mysql+pymysql -> mysql+aiomysql, sqlite -> sqlite+aiosqlite
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_options(ASYNC_DATABASE_URL, is_async=True)
+)
+install_pool_events(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
+# --- UPSERT ---
+_DIALECT_INSERTS = {"mysql": mysql.insert, "postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def upsert(db, model, rows, update=None):
+    """
+    Satırları tek ifadeyle ekler; birincil anahtar zaten varsa hata vermez (eşzamanlı ilk eklemeler yarışmaz).
+    MySQL: INSERT ... ON DUPLICATE KEY UPDATE, SQLite / PostgreSQL: INSERT ... ON CONFLICT.
+    update(table, new): çakışmada uygulanacak {sütun adı: ifade}; new eklenmek istenen satırın değerleridir.
+    update verilmezse var olan satıra dokunulmaz. Commit etmez.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    stmt = _DIALECT_INSERTS[dialect](table)
+    keys = [column.name for column in table.primary_key]
+    if dialect == "mysql":
+        values = update(table, stmt.inserted) if update else {keys[0]: table.c[keys[0]]}
+        stmt = stmt.on_duplicate_key_update(values)
+    elif update:
+        stmt = stmt.on_conflict_do_update(index_elements=keys, set_=update(table, stmt.excluded))
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+    db.execute(stmt, list(rows))
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,181 @@
+"""
+Bağlantı havuzu ayarları ve ölçümleri.
+
+Havuz boyutu, taşma, bekleme süresi, yenileme süresi, ping stratejisi ve sorgu zaman aşımı
+Settings üzerinden (DB_* ortam değişkenleri) ayarlanır. Sync ve async motorlar aynı ayarları
+kullanır; her biri kendi havuzunu açar (süreç başına en fazla 2 x (size + overflow) bağlantı).
+"""
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from app.core.config import settings
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+
+
+class PoolMetrics:
+    """Havuzdan bağlantı alma (checkout) bekleme süreleri ve doluluk sayaçları"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)  # saniye
+        self.checkouts = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.stale = 0  # ping'e cevap vermediği için atılan bağlantılar
+        self.peak_in_use = 0
+
+    def record_checkout(self, waited: float, in_use: int):
+        with self._lock:
+            self.checkouts += 1
+            self._waits.append(waited)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self, waited: float):
+        with self._lock:
+            self.timeouts += 1
+            self._waits.append(waited)
+
+    def record_ping(self, alive: bool):
+        with self._lock:
+            self.pings += 1
+            self.stale += not alive
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = {"checkouts": self.checkouts, "timeouts": self.timeouts,
+                        "pings": self.pings, "stale_connections": self.stale, "peak_in_use": self.peak_in_use}
+
+        def ms(p):
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2) if waits else None
+
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        in_use = pool.checkedout()
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "in_use": in_use,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            # Kullanılan bağlantıların toplam kapasiteye oranı (1.0 = istekler beklemeye başlar)
+            "saturation": round(in_use / capacity, 3) if capacity else None,
+            "peak_saturation": round(counters["peak_in_use"] / capacity, 3) if capacity else None,
+            "checkout_wait_ms": {"p50": ms(0.5), "p95": ms(0.95), "p99": ms(0.99),
+                                 "max": round(waits[-1] * 1000, 2) if waits else None},
+            **counters,
+        }
+
+
+class _InstrumentedPool:
+    """QueuePool türevlerine checkout bekleme ölçümü ekler"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, self.checkedout())
+        return record
+
+    def recreate(self):
+        # engine.dispose() havuzu yeniden kurar; sayaçlar korunur
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, is_async: bool = False, **overrides) -> dict:
+    """create_engine / create_async_engine için havuz argümanları (overrides: benchmark için)"""
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pre_ping": settings.DB_PRE_PING,
+        **overrides,
+    }
+    if options["pre_ping"] not in PRE_PING_STRATEGIES:
+        raise ValueError(f"DB_PRE_PING must be one of {PRE_PING_STRATEGIES}, got {options['pre_ping']!r}")
+
+    # Bellek içi SQLite tek bağlantıyla çalışır; havuz ayarları uygulanmaz
+    if _is_memory_sqlite(make_url(url)):
+        return {}
+
+    pre_ping = options.pop("pre_ping")
+    return {
+        **options,
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        # "idle" stratejisi pool_pre_ping yerine install_pool_events'teki checkout olayını kullanır
+        "pool_pre_ping": pre_ping == "always",
+    }
+
+
+def install_pool_events(engine, pre_ping: str = None, idle_seconds: float = None, statement_timeout_ms: int = None):
+    """
+    Sync motora (async için async_engine.sync_engine) havuz olaylarını bağlar:
+      - pre_ping="idle": sadece idle_seconds'tan uzun süre boşta kalmış bağlantı ping'lenir
+      - statement_timeout_ms: MySQL'de SELECT sorgularına süre sınırı (max_execution_time)
+    """
+    pre_ping = pre_ping or settings.DB_PRE_PING
+    idle_seconds = settings.DB_PRE_PING_IDLE_SECONDS if idle_seconds is None else idle_seconds
+    statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+    dialect = engine.dialect
+
+    if statement_timeout_ms and dialect.name == "mysql":
+        @event.listens_for(engine, "connect")
+        def set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(f"SET SESSION max_execution_time = {int(statement_timeout_ms)}")
+            finally:
+                cursor.close()
+
+    if pre_ping == "idle":
+        @event.listens_for(engine, "checkin")
+        def remember_checkin(dbapi_connection, connection_record):
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+        @event.listens_for(engine, "checkout")
+        def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+            checked_in_at = connection_record.info.get("checked_in_at")
+            if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+                return
+            metrics = getattr(engine.pool, "metrics", None)
+            try:
+                dialect.do_ping(dbapi_connection)
+            except Exception as e:
+                if metrics:
+                    metrics.record_ping(False)
+                # Havuz bu bağlantıyı atar ve yenisiyle tekrar dener
+                raise exc.DisconnectionError(f"Stale pooled connection: {e}") from e
+            if metrics:
+                metrics.record_ping(True)
+
+
+def pool_stats(engine) -> dict:
+    metrics = getattr(engine.pool, "metrics", None)
+    if metrics is None:
+        return {"pool": type(engine.pool).__name__, "status": engine.pool.status()}
+    return metrics.snapshot(engine.pool)
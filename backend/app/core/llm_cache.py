@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+import time
+
+class DiskPromptCache:
+    """
+    İçerik adresli prompt -> model cevabı önbelleği.
+    Her kayıt <dizin>/<hash[:2]>/<hash>.txt dosyasıdır; toplam boyut max_bytes'ı aşınca
+    en uzun süredir kullanılmayan (mtime) kayıtlar silinir.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = {}  # path -> (boyut, son kullanım)
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                st = os.stat(path)
+                self._entries[path] = (st.st_size, st.st_mtime)
+                self._total_bytes += st.st_size
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if path in self._entries:
+                size, _ = self._entries[path]
+            else:
+                # Başka bir süreç tarafından yazılmış kayıt
+                size = len(text.encode("utf-8"))
+                self._total_bytes += size
+            self._entries[path] = (size, time.time())
+        try:
+            os.utime(path)  # LRU sırası yeniden başlatmalardan sonra da korunur
+        except OSError:
+            pass
+        return text
+
+    def put(self, key: str, text: str):
+        path = self._path(key)
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            old_size, _ = self._entries.get(path, (0, 0))
+            self._entries[path] = (len(data), time.time())
+            self._total_bytes += len(data) - old_size
+            self._evict()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for path, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            del self._entries[path]
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0,
+            "evictions": self.evictions,
+        }
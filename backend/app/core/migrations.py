@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from sqlalchemy import Table, Column, String, DateTime, MetaData, select, inspect
+from app.core.database import Base
+
+# Uygulanan migration'lar bu tabloda tutulur (uygulama modellerinden ayrı metadata)
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _meta,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def _import_models():
+    # create_all'ın tüm tabloları görmesi için modeller yüklenmeli
+    from app.models import user, lessons, questions, history, progress, ability, ingestion, trend, item_stats  # noqa: F401
+
+
+def create_tables(conn):
+    """Eksik tabloları oluşturur (var olan tablolara dokunmaz)"""
+    Base.metadata.create_all(bind=conn)
+
+
+def create_indexes(*index_names):
+    """Model üzerinde tanımlı indeksleri, mevcut veritabanında yoksa oluşturur"""
+    def step(conn):
+        wanted = set(index_names)
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            # Olmayan tablo, indeksleriyle birlikte sondaki create_tables adımında oluşturulur
+            if not inspector.has_table(table.name):
+                continue
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in wanted and index.name not in existing:
+                    index.create(bind=conn)
+    return step
+
+
+# histories / questions / users sıcak erişim yolları (modellerde tanımlı)
+HOT_PATH_INDEXES = (
+    "ix_histories_user_correct",
+    "ix_histories_question_correct",
+    "ix_histories_user_solved_at",
+    "ix_histories_solved_at",
+    "ix_questions_lesson_difficulty",
+    "ix_questions_difficulty",
+    "ix_users_role",
+)
+
+# Sıralı migration listesi: (sürüm, adım). Yeni adımlar SADECE sona eklenir.
+MIGRATIONS = [
+    ("0001_initial_tables", create_tables),
+    ("0002_hot_path_indexes", create_indexes(*HOT_PATH_INDEXES)),
+    # Kaydı olmayan öğrenci mevcut seviyesinden başlar; geçmişten uydurmak için: python scripts/refit_abilities.py
+    ("0003_ability_tables", create_tables),
+    ("0004_ingestion_checkpoints", create_tables),
+    ("0005_catalogue_keyset_indexes", create_indexes("ix_questions_lesson_id", "ix_lessons_difficulty_id")),
+    ("0006_learning_rollups", create_tables),  # sonrasında: python scripts/rebuild_trends.py
+    ("0007_question_item_stats", create_tables),  # sonrasında: python scripts/rebuild_item_stats.py
+    ("0008_question_item_events", create_tables),
+    # Sıradaki soru seçiminde "bu soruyu cevapladı mı" kontrolü
+    ("0009_history_user_question_index", create_indexes("ix_histories_user_question")),
+]
+
+
+def applied_versions(engine):
+    _meta.create_all(bind=engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(select(schema_migrations.c.version))}
+
+
+def run_migrations(engine, verbose: bool = False):
+    """
+    Uygulanmamış migration'ları sırayla çalıştırır. Her adım kendi transaction'ında çalışır.
+    Yeni eklenen tablolar için create_all her açılışta tekrar çalıştırılır.
+    """
+    _import_models()
+    done = applied_versions(engine)
+    applied = []
+    for version, step in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, applied_at=datetime.now(timezone.utc)
+            ))
+        applied.append(version)
+        if verbose:
+            print(f"✅ Migration applied: {version}")
+
+    # Sonradan eklenen modellerin tabloları (migration adımı olmadan)
+    with engine.begin() as conn:
+        create_tables(conn)
+    return applied
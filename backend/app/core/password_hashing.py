@@ -0,0 +1,155 @@
+"""
+Parola hash'leme (bcrypt) için ayrı, boyutu sınırlı süreç havuzu.
+
+bcrypt kasıtlı olarak yavaştır (cost 12 ~ 250 ms CPU). İstek thread'inde çalıştığında giriş
+yoğunluğunda (ders başı) Starlette thread havuzunu doldurup diğer uç noktaları bekletir.
+Burada hash'ler PASSWORD_HASH_WORKERS süreçte hesaplanır; aynı anda en fazla
+workers + PASSWORD_HASH_MAX_PENDING iş kabul edilir, fazlası beklemeden reddedilir (503).
+
+İşçi süreçlerde sadece bu modülün bcrypt fonksiyonları çalışır.
+"""
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from app.core.config import settings
+
+# bcrypt sadece ilk 72 baytı kullanır; passlib ile üretilmiş eski hash'lerle uyumlu olmak için kesilir
+BCRYPT_MAX_BYTES = 72
+
+
+class PasswordHashingOverloaded(Exception):
+    """Hash havuzu ve kuyruğu dolu; istemci biraz sonra tekrar denemeli (503)"""
+
+
+def _secret(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def hash_cost(hashed: str):
+    """"$2b$12$..." -> 12 (bcrypt hash'i değilse None)"""
+    parts = hashed.split("$") if hashed else []
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def compute_hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def compute_verify(password: str, hashed: str, rounds: int = None):
+    """
+    (doğru mu, yeni hash). Parola doğru ve hash'in cost'u rounds'tan farklıysa
+    aynı işte yeni cost ile tekrar hash'lenir (giriş sırasında şeffaf yükseltme).
+    """
+    try:
+        ok = bcrypt.checkpw(_secret(password), hashed.encode("ascii"))
+    except (ValueError, UnicodeEncodeError):
+        # bcrypt hash'i olmayan (bozuk / eski biçim) kayıt
+        return False, None
+    if ok and rounds and hash_cost(hashed) != rounds:
+        return True, compute_hash(password, rounds)
+    return ok, None
+
+
+def _warm_up():
+    return True
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = None, max_pending: int = None, rounds: int = None):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_pending = settings.PASSWORD_HASH_MAX_PENDING if max_pending is None else max_pending
+        self.rounds = rounds or settings.BCRYPT_ROUNDS
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+        # Metrikler
+        self._completed = 0
+        self._rejected = 0
+        self._rehashed = 0
+        self._peak_in_flight = 0
+
+    @property
+    def capacity(self):
+        """Aynı anda kabul edilen en fazla iş (çalışan + kuyrukta bekleyen)"""
+        return self.workers + self.max_pending
+
+    # --- YAŞAM DÖNGÜSÜ ---
+    def start(self):
+        """
+        Süreçleri önceden (uygulama açılırken, diğer thread'ler iş almadan) açar;
+        ilk girişler süreç başlatma maliyetini ödemez
+        """
+        executor = self._get_executor()
+        for future in [executor.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _reset_executor(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    # --- İŞLER ---
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise PasswordHashingOverloaded("Authentication is busy, please retry shortly")
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            executor = self._get_executor()
+            try:
+                return await asyncio.wrap_future(executor.submit(fn, *args))
+            except BrokenProcessPool:
+                # Bir işçi süreç öldü; havuz yeniden kurulup iş bir kez tekrarlanır
+                self._reset_executor(executor)
+                return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(compute_hash, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed: str):
+        """(doğru mu, yeni hash veya None); yeni hash varsa kullanıcı kaydına yazılmalı"""
+        ok, new_hash = await self._run(compute_verify, password, hashed, self.rounds)
+        if new_hash:
+            with self._lock:
+                self._rehashed += 1
+        return ok, new_hash
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "rehashed": self._rehashed,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -1,28 +1,85 @@
-from passlib.context import CryptContext
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from app.core.jwt import SECRET_KEY, ALGORITHM
+from app.core.config import settings
+from app.core.password_hashing import compute_hash, compute_verify
+from app.core.cache import result_cache, IDENTITY_VIEW
+from app.core.database import AsyncSessionLocal
+from app.repositories.user_repository import AsyncUserRepository
+from app.schemas.auth import CurrentUser
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Bu süreçte çalışır (script'ler için); istekler password_hasher süreç havuzunu kullanır
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return compute_hash(password, settings.BCRYPT_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return compute_verify(plain_password, hashed_password)[0]
+
+
+class TokenCache:
+    """Doğrulanmış token -> claims (LRU). Kayıt token'ın exp zamanından sonra kullanılmaz."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # token -> claims
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            claims = self._data.get(token)
+            if claims is None or claims["exp"] <= time.time():
+                self._data.pop(token, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def set(self, token: str, claims: dict):
+        # Süresiz token önbelleğe alınmaz (geçerliliği sınırlanamaz)
+        if not isinstance(claims.get("exp"), (int, float)):
+            return
+        with self._lock:
+            self._data[token] = claims
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self._data), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "hit_rate": round(self.hits / total, 3) if total else 0}
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+user_repository = AsyncUserRepository()
+
+def decode_token(token: str) -> dict:
+    """İmzayı ve süreyi doğrular; aynı token tekrar geldiğinde önbellekten döner"""
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
+        token_cache.set(token, claims)
+    return claims
 
 def get_current_user_role(token: str = Depends(oauth2_scheme)):
     """Token'dan rol bilgisini döner"""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        role: str = payload.get("role")
-        if role is None:
-            raise HTTPException(status_code=401, detail="Invalid token: Role missing")
-        return role.lower()
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    role: str = decode_token(token).get("role")
+    if role is None:
+        raise HTTPException(status_code=401, detail="Invalid token: Role missing")
+    return role.lower()
 
 def check_admin_role(role: str = Depends(get_current_user_role)):
     """Sadece admin veya teacher rollerine izin verir"""
@@ -31,4 +88,34 @@ def check_admin_role(role: str = Depends(get_current_user_role)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Bu işlem için yetkiniz yok."
         )
-    return role
\ No newline at end of file
+    return role
+
+async def load_user(user_id: int) -> Optional[CurrentUser]:
+    """Kullanıcı satırı kısa süreli önbellekten (seviye / seviye testi değişince silinir)"""
+    async def compute():
+        async with AsyncSessionLocal() as db:
+            user = await user_repository.get_by_id(db, user_id)
+            return CurrentUser.model_validate(user).model_dump() if user else None
+
+    row = await result_cache.aget_or_compute(user_id, IDENTITY_VIEW, compute, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+    return CurrentUser(**row) if row else None
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """İsteği yapan kullanıcı; aynı istekte birden fazla bağımlılık kullansa da bir kez çözülür"""
+    user_id = decode_token(token).get("id")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid token: User id missing")
+    user = await load_user(user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User no longer exists")
+    return user
+
+async def authorized_user_id(user_id: Optional[int] = None, current_user: CurrentUser = Depends(get_current_user)) -> int:
+    """
+    Rotadaki user_id: verilmezse token sahibi, başka bir öğrenciyse sadece öğretmen/admin erişebilir.
+    """
+    if user_id is None or user_id == current_user.id:
+        return current_user.id
+    if not current_user.is_staff:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu işlem için yetkiniz yok.")
+    return user_id
@@ -1,15 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles # <--- YENİ IMPORT
 import os
 
 from app.api.routes import auth, recommendation, lessons, questions, history, upload # <--- upload EKLENDİ
-from app.core.database import engine, Base
+from app.core.database import engine, async_engine
+from app.core.migrations import run_migrations
+from app.services.generation_jobs import generation_queue
+from app.services.ai_service import get_ai_service
+from app.services.answer_ingestion import answer_buffer
+from app.core.password_hashing import password_hasher
+from app.core.config import settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # AI servisi uygulama açılırken bir kez kurulur
+    get_ai_service()
+    # bcrypt işçi süreçleri ilk girişten önce açılır
+    password_hasher.start()
+    # Sınav yoğunluğu modu: cevaplar arabelleğe alınıp toplu yazılır (önceki çalışmadan kalanlar önce yazılır)
+    if settings.INGESTION_MODE == "buffered":
+        answer_buffer.start()
+    yield
+    # Kapanışta bekleyen üretim işlerini iptal et, çalışanları bitir
+    generation_queue.shutdown(wait=False)
+    # Arabellekteki cevaplar veritabanına yazılmadan kapanılmaz
+    answer_buffer.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 # FastAPI app TANIMI
 app = FastAPI(
     title="Adaptive Learning Backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Ayarları
@@ -19,18 +44,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Sayfalama cursor'ı ve önbellek doğrulayıcısı tarayıcıdan okunabilsin
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
-# DB tablolarını oluştur
-Base.metadata.create_all(bind=engine)
+# DB tablolarını oluştur ve bekleyen migration'ları (indeksler vb.) uygula
+run_migrations(engine)
 
 # --- STATİK DOSYA SUNUCUSU (YENİ KISIM) ---
 # uploads klasörü yoksa oluştur
-if not os.path.exists("uploads"):
-    os.makedirs("uploads")
+if not os.path.exists(settings.UPLOAD_DIR):
+    os.makedirs(settings.UPLOAD_DIR)
 
-# http://localhost:8000/uploads/dosya_adi.pdf adresinden erişim sağlar
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads") 
+# http://localhost:8000/uploads/ab/<sha256>.pdf adresinden erişim sağlar
+app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads") 
 
 # Router'ları ekle
 app.include_router(auth.router)
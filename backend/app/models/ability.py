@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from app.core.database import Base
+
+class UserAbility(Base):
+    __tablename__ = "user_abilities"
+
+    # Öğrencinin genel yetenek tahmini (seviye buradan hesaplanır)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    theta = Column(Float, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+
+class UserLessonAbility(Base):
+    __tablename__ = "user_lesson_abilities"
+
+    # Ders bazında yetenek tahmini
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True)
+    theta = Column(Float, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+
+class QuestionCalibration(Base):
+    __tablename__ = "question_calibrations"
+
+    # Sorunun cevaplardan öğrenilen zorluğu (ilk değer difficulty_level'dan)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    difficulty = Column(Float, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
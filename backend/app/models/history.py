@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -12,6 +12,14 @@ class DifficultyType(enum.Enum):
 
 class History(Base):
     __tablename__ = "histories"
+    # Sık kullanılan erişim yolları için bileşik indeksler (bkz. app/core/migrations.py)
+    __table_args__ = (
+        Index("ix_histories_user_correct", "user_id", "is_correct"),
+        Index("ix_histories_question_correct", "question_id", "is_correct"),
+        Index("ix_histories_user_solved_at", "user_id", "solved_at"),
+        Index("ix_histories_solved_at", "solved_at"),
+        Index("ix_histories_user_question", "user_id", "question_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from app.core.database import Base
+
+class IngestionCheckpoint(Base):
+    __tablename__ = "ingestion_checkpoints"
+
+    # Yazma arabelleğinin veritabanına işlenmiş son kayıt sıra numarası.
+    # Cevaplarla aynı transaction'da güncellenir; yeniden başlatmada kayıt dosyası buradan devam eder.
+    name = Column(String(100), primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
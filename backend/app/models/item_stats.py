@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Float, String, Boolean, JSON, ForeignKey, Index
+from app.core.database import Base
+
+class QuestionItemStats(Base):
+    __tablename__ = "question_item_stats"
+
+    # Soru başına madde istatistikleri; her cevapla aynı transaction'da çevrimiçi güncellenir
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+    # Şık seçilme sayıları (A-D dışındaki cevaplar count_other)
+    count_a = Column(Integer, nullable=False, default=0)
+    count_b = Column(Integer, nullable=False, default=0)
+    count_c = Column(Integer, nullable=False, default=0)
+    count_d = Column(Integer, nullable=False, default=0)
+    count_other = Column(Integer, nullable=False, default=0)
+    # Süre: Welford momentleri ve P² yüzdelik işaretçileri
+    time_mean = Column(Float, nullable=False, default=0.0)
+    time_m2 = Column(Float, nullable=False, default=0.0)
+    time_sketch = Column(JSON, nullable=True)
+    # Ayırt edicilik için cevaplayanların genel yetenek (theta) toplamları
+    ability_sum = Column(Float, nullable=False, default=0.0)
+    ability_sq_sum = Column(Float, nullable=False, default=0.0)
+    ability_correct_sum = Column(Float, nullable=False, default=0.0)
+
+
+class QuestionItemEvent(Base):
+    __tablename__ = "question_item_events"
+    # Bir sorunun bekleyen cevapları id (cevap) sırasıyla okunur
+    __table_args__ = (Index("ix_question_item_events_question", "question_id", "id"),)
+
+    # İstatistik satırına henüz işlenmemiş cevap. Cevap yolu sadece buraya ekler (kilit yok);
+    # ItemStatsService.fold bunları satır kilidi altında question_item_stats'a işleyip siler.
+    id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    given_answer = Column(String(255), nullable=False)
+    is_correct = Column(Boolean, nullable=False)
+    time_spent_seconds = Column(Integer, nullable=True)
+    # Cevap anındaki genel yetenek (ayırt edicilik için)
+    theta = Column(Float, nullable=False)
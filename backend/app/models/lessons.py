@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -11,7 +11,11 @@ class DifficultyType(enum.Enum):
 
 class Lesson(Base):
     __tablename__ = "lessons"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Zorluk filtresiyle id sıralı sayfalama (keyset)
+        Index("ix_lessons_difficulty_id", "difficulty", "id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class UserProgress(Base):
+    __tablename__ = "user_progress"
+
+    # Her öğrenci için tek satır: histories tablosunun özet sayaçları
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    correct_count = Column(Integer, nullable=False, default=0)
+    wrong_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    total_time_seconds = Column(Integer, nullable=False, default=0)
+    last_answered_at = Column(DateTime(timezone=True), nullable=True)
+
+    user = relationship("User", back_populates="progress")
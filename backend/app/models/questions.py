@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_lesson_difficulty", "lesson_id", "difficulty_level"),
+        Index("ix_questions_difficulty", "difficulty_level"),
+        # Ders içi id sıralı sayfalama (keyset)
+        Index("ix_questions_lesson_id", "lesson_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from app.core.database import Base
+
+# Rollup dönemleri: gün ve hafta (Pazartesi başlangıçlı), UTC
+PERIODS = ("day", "week")
+
+class LearningRollup(Base):
+    __tablename__ = "learning_rollups"
+
+    # Öğrenci x dönem x ders başına cevap sayaçları (histories.solved_at'e göre).
+    # Birincil anahtar sırası trend sorgusunun (user_id, period, bucket_start aralığı) erişim yoludur.
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period = Column(String(8), primary_key=True)
+    bucket_start = Column(Date, primary_key=True)
+    lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+    total_time_seconds = Column(Integer, nullable=False, default=0)
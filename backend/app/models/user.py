@@ -1,10 +1,13 @@
 # app/models/user.py
-from sqlalchemy import Column, Integer, String, Boolean # <--- Boolean eklendi
+from sqlalchemy import Column, Integer, String, Boolean, Index # <--- Boolean eklendi
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_role", "role"),  # öğretmen analitiğinde role = 'student' filtresi
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, nullable=False)
@@ -15,4 +18,5 @@ class User(Base):
     is_placement_completed = Column(Boolean, default=False)
     current_level = Column(Integer, default=1)
 
-    histories = relationship("History", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    histories = relationship("History", back_populates="user", cascade="all, delete-orphan")
+    progress = relationship("UserProgress", back_populates="user", uselist=False, cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,76 @@
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+from app.core.database import upsert
+from app.models.ability import UserAbility, UserLessonAbility, QuestionCalibration
+from app.models.user import User
+
+class AbilityRepository:
+    # for_update=True: satırlar kilitlenir ve oturumdaki eski kopyalar (upsert öncesi okunanlar) tazelenir
+    def get_user(self, db: Session, user_id: int, for_update: bool = False):
+        query = db.query(UserAbility).filter(UserAbility.user_id == user_id)
+        return (query.with_for_update().populate_existing() if for_update else query).first()
+
+    def has_user(self, db: Session, user_id: int) -> bool:
+        return db.query(UserAbility.user_id).filter(UserAbility.user_id == user_id).first() is not None
+
+    def get_users(self, db: Session, user_ids):
+        if not user_ids:
+            return []
+        return db.query(UserAbility).filter(UserAbility.user_id.in_(user_ids)).all()
+
+    def get_user_lesson(self, db: Session, user_id: int, lesson_id: int, for_update: bool = False):
+        query = db.query(UserLessonAbility).filter(
+            UserLessonAbility.user_id == user_id, UserLessonAbility.lesson_id == lesson_id
+        )
+        return (query.with_for_update() if for_update else query).first()
+
+    def get_user_lessons(self, db: Session, user_id: int, lesson_ids=None, for_update: bool = False):
+        query = db.query(UserLessonAbility).filter(UserLessonAbility.user_id == user_id)
+        if lesson_ids is not None:
+            if not lesson_ids:
+                return []
+            query = query.filter(UserLessonAbility.lesson_id.in_(lesson_ids))
+        if for_update:
+            query = query.order_by(UserLessonAbility.lesson_id).with_for_update().populate_existing()
+        return query.all()
+
+    def get_calibrations(self, db: Session, question_ids):
+        """
+        {question_id: (zorluk, deneme)}; kilitsiz, sütun sorgusuyla okunur (oturumdaki eski kopyalar kullanılmaz).
+        Soru satırı kilitlenmez: aynı soruyu cevaplayan istekler birbirini beklemez, değişiklik add_to_questions
+        ile göreli yazılır.
+        """
+        if not question_ids:
+            return {}
+        return {question_id: (difficulty, attempts) for question_id, difficulty, attempts in db.query(
+            QuestionCalibration.question_id, QuestionCalibration.difficulty, QuestionCalibration.attempts
+        ).filter(QuestionCalibration.question_id.in_(question_ids))}
+
+    def get_levels(self, db: Session, user_ids):
+        """{user_id: users.current_level}"""
+        if not user_ids:
+            return {}
+        return dict(db.query(User.id, User.current_level).filter(User.id.in_(user_ids)).all())
+
+    # --- EKSİK SATIRLAR ---
+    # Önce kilitsiz okunup eksikler upsert ile eklenir, sonra kilitlenir: aynı anda ilk cevabı veren
+    # iki istek aynı birincil anahtarı eklemeye çalışıp hata / deadlock almaz.
+    def missing_lessons(self, db: Session, user_id: int, lesson_ids):
+        existing = {lesson_id for (lesson_id,) in db.query(UserLessonAbility.lesson_id).filter(
+            UserLessonAbility.user_id == user_id, UserLessonAbility.lesson_id.in_(lesson_ids))}
+        return [lesson_id for lesson_id in lesson_ids if lesson_id not in existing]
+
+    def insert_missing(self, db: Session, model, rows):
+        """Satırları ekler; aynı anda başka bir istek eklediyse onunki kalır"""
+        upsert(db, model, rows)
+
+    def add_to_questions(self, db: Session, rows):
+        """
+        rows: {question_id, difficulty, attempts, delta} listesi, question_id sıralı.
+        Satır yoksa difficulty / attempts ile eklenir; varsa mevcut değerlere delta / attempts eklenir
+        (difficulty = difficulty + :delta). Okuma ile yazma arasında başka isteklerin yazdıkları ezilmez.
+        """
+        upsert(db, QuestionCalibration, rows, update=lambda table, new: {
+            "difficulty": table.c.difficulty + bindparam("delta"),
+            "attempts": table.c.attempts + new.attempts,
+        })
@@ -1,17 +1,178 @@
+from sqlalchemy import func, case, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.history import History
+from app.models.user import User
+from app.models.lessons import Lesson
+from app.models.questions import Question
+
+# Sync ve async repository'lerin ortak sorgusu (bkz. get_lesson_breakdown)
+def lesson_breakdown_query(user_id: int):
+    return (
+        select(
+            Lesson.id,
+            Lesson.title,
+            func.count(History.id),
+            func.sum(case((History.is_correct == True, 1), else_=0)),
+            func.coalesce(func.sum(History.time_spent_seconds), 0),
+        )
+        .join(Question, Question.id == History.question_id)
+        .join(Lesson, Lesson.id == Question.lesson_id)
+        .where(History.user_id == user_id)
+        .group_by(Lesson.id, Lesson.title)
+        .order_by(func.min(History.id))
+    )
 
 class HistoryRepository:
     def get_user_history(self, db: Session, user_id: int):
         """Kullanıcının tüm geçmişini getirir"""
         return db.query(History).filter(History.user_id == user_id).all()
 
-    def get_question_stats(self, db: Session, question_id: int):
-        """Bir sorunun genel başarı ve süre ortalamasını analiz etmek için kullanılabilir"""
-        return db.query(History).filter(History.question_id == question_id).all()
+    def add(self, db: Session, history: History):
+        """Kaydı commit etmeden oturuma ekler (çağıranın transaction'ına dahil olur)"""
+        db.add(history)
+        db.flush()
+        return history
+
+    def add_many(self, db: Session, rows):
+        """Çok satırı tek executemany INSERT ile ekler (commit etmez)"""
+        if rows:
+            db.execute(insert(History), rows)
 
     def create(self, db: Session, history: History):
         db.add(history)
         db.commit()
         db.refresh(history)
-        return history
\ No newline at end of file
+        return history
+
+    def get_lesson_breakdown(self, db: Session, user_id: int):
+        """
+        Tek sorguda (histories ⨝ questions ⨝ lessons) kullanıcının ders bazlı
+        (ders id, başlık, toplam, doğru, toplam süre) satırlarını döner.
+        """
+        return db.execute(lesson_breakdown_query(user_id)).all()
+
+    # --- SINIF ANALİTİĞİ İÇİN TOPLU (GROUP BY) SORGULAR ---
+    def count_students(self, db: Session):
+        return db.query(func.count(User.id)).filter(User.role == "student").scalar() or 0
+
+    def get_student_aggregates(self, db: Session, skip: int = 0, limit: int = None,
+                               sort_by: str = "id", descending: bool = False):
+        """
+        Öğrenci başına (id, username, email, doğru sayısı, toplam cevap) satırları döner.
+        Geçmişi olmayan öğrenciler de 0 değerleriyle listelenir.
+        """
+        per_user = (
+            db.query(
+                History.user_id.label("user_id"),
+                func.count(History.id).label("total"),
+                func.sum(case((History.is_correct == True, 1), else_=0)).label("correct"),
+            )
+            .group_by(History.user_id)
+            .subquery()
+        )
+        total = func.coalesce(per_user.c.total, 0)
+        correct = func.coalesce(per_user.c.correct, 0)
+
+        sort_columns = {
+            "id": User.id,
+            "username": User.username,
+            "accuracy": case((total > 0, correct * 1.0 / total), else_=0),
+            "total_xp": correct,
+            "total_solved": total,
+        }
+        sort_column = sort_columns.get(sort_by, User.id)
+        order = sort_column.desc() if descending else sort_column.asc()
+
+        query = (
+            db.query(User.id, User.username, User.email, correct, total)
+            .outerjoin(per_user, per_user.c.user_id == User.id)
+            .filter(User.role == "student")
+            .order_by(order, User.id.asc())
+        )
+        if skip:
+            query = query.offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_lesson_aggregates(self, db: Session):
+        """Ders başına (id, başlık, soru sayısı, cevap sayısı, doğru sayısı) satırları döner"""
+        question_counts = (
+            db.query(Question.lesson_id.label("lesson_id"), func.count(Question.id).label("question_count"))
+            .group_by(Question.lesson_id)
+            .subquery()
+        )
+        attempt_counts = (
+            db.query(
+                Question.lesson_id.label("lesson_id"),
+                func.count(History.id).label("attempts"),
+                func.sum(case((History.is_correct == True, 1), else_=0)).label("correct"),
+            )
+            .join(History, History.question_id == Question.id)
+            .group_by(Question.lesson_id)
+            .subquery()
+        )
+        return (
+            db.query(
+                Lesson.id,
+                Lesson.title,
+                func.coalesce(question_counts.c.question_count, 0),
+                func.coalesce(attempt_counts.c.attempts, 0),
+                func.coalesce(attempt_counts.c.correct, 0),
+            )
+            .outerjoin(question_counts, question_counts.c.lesson_id == Lesson.id)
+            .outerjoin(attempt_counts, attempt_counts.c.lesson_id == Lesson.id)
+            .order_by(Lesson.id)
+            .all()
+        )
+
+    def get_lesson_matrix(self, db: Session, user_ids):
+        """
+        Öğrenci x ders başına (user_id, ders id, toplam, doğru, toplam süre, ilk history id) satırları;
+        bir öğrenci grubunun tüm ders kırılımı tek GROUP BY sorgusuyla
+        """
+        if not user_ids:
+            return []
+        return db.execute(
+            select(
+                History.user_id,
+                Question.lesson_id,
+                func.count(History.id),
+                func.sum(case((History.is_correct == True, 1), else_=0)),
+                func.coalesce(func.sum(History.time_spent_seconds), 0),
+                func.min(History.id),
+            )
+            .join(Question, Question.id == History.question_id)
+            .where(History.user_id.in_(user_ids))
+            .group_by(History.user_id, Question.lesson_id)
+        ).all()
+
+    def get_question_aggregates(self, db: Session, lesson_id: int):
+        """Dersin soruları için (soru id, zorluk, cevap, doğru, toplam süre) satırları döner"""
+        return (
+            db.query(
+                Question.id,
+                Question.difficulty_level,
+                func.count(History.id),
+                func.coalesce(func.sum(case((History.is_correct == True, 1), else_=0)), 0),
+                func.coalesce(func.sum(History.time_spent_seconds), 0),
+            )
+            .outerjoin(History, History.question_id == Question.id)
+            .filter(Question.lesson_id == lesson_id)
+            .group_by(Question.id, Question.difficulty_level)
+            .order_by(Question.id)
+            .all()
+        )
+
+
+class AsyncHistoryRepository:
+    """HistoryRepository'nin async rotalar için yöntemleri"""
+
+    async def get_user_history(self, db: AsyncSession, user_id: int):
+        result = await db.execute(select(History).where(History.user_id == user_id))
+        return result.scalars().all()
+
+    async def get_lesson_breakdown(self, db: AsyncSession, user_id: int):
+        result = await db.execute(lesson_breakdown_query(user_id))
+        return result.all()
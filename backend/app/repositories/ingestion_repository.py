@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from app.models.ingestion import IngestionCheckpoint
+
+class IngestionRepository:
+    def get_last_seq(self, db: Session, name: str) -> int:
+        checkpoint = db.query(IngestionCheckpoint).filter(IngestionCheckpoint.name == name).first()
+        return checkpoint.last_seq if checkpoint else 0
+
+    def save_checkpoint(self, db: Session, name: str, last_seq: int):
+        """Commit etmez; cevapları yazan transaction'a dahil olur"""
+        now = datetime.now(timezone.utc)
+        updated = db.query(IngestionCheckpoint).filter(IngestionCheckpoint.name == name).update(
+            {IngestionCheckpoint.last_seq: last_seq, IngestionCheckpoint.updated_at: now},
+            synchronize_session=False
+        )
+        if not updated:
+            db.add(IngestionCheckpoint(name=name, last_seq=last_seq, updated_at=now))
+            db.flush()
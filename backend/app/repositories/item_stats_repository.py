@@ -0,0 +1,105 @@
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.orm import Session
+from app.core.database import upsert
+from app.models.item_stats import QuestionItemStats, QuestionItemEvent
+from app.models.ability import UserAbility
+from app.models.history import History
+from app.models.questions import Question
+from app.models.user import User
+from app.services.ability_engine import THETA_START, DIFFICULTY_STEP
+
+class ItemStatsRepository:
+    def get_for_update(self, db: Session, question_ids):
+        """Soruların istatistik satırlarını (id sıralı) kilitleyerek, veritabanındaki güncel halleriyle okur"""
+        if not question_ids:
+            return []
+        return (
+            db.query(QuestionItemStats)
+            .filter(QuestionItemStats.question_id.in_(sorted(question_ids)))
+            .order_by(QuestionItemStats.question_id)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+
+    def insert_missing(self, db: Session, records):
+        """Olmayan istatistik satırlarını ekler; var olanlara dokunmaz (eşzamanlı eklemeler yarışmaz)"""
+        upsert(db, QuestionItemStats, records)
+
+    def update_rows(self, db: Session, records):
+        """Birincil anahtara göre toplu UPDATE (satır silinip yeniden eklenmez)"""
+        if records:
+            db.execute(update(QuestionItemStats), records)
+
+    # --- BEKLEYEN CEVAPLAR ---
+    def append_events(self, db: Session, records):
+        db.execute(insert(QuestionItemEvent), records)
+
+    def pending_question_ids(self, db: Session, question_ids=None):
+        query = db.query(QuestionItemEvent.question_id).distinct()
+        if question_ids is not None:
+            query = query.filter(QuestionItemEvent.question_id.in_(question_ids))
+        return sorted(question_id for question_id, in query.all())
+
+    def get_events(self, db: Session, question_ids):
+        """Soruların bekleyen cevapları, cevap sırasıyla"""
+        return (
+            db.query(QuestionItemEvent)
+            .filter(QuestionItemEvent.question_id.in_(question_ids))
+            .order_by(QuestionItemEvent.id)
+            .all()
+        )
+
+    def get_event_keys(self, db: Session, question_ids=None):
+        """Bekleyen cevapların (id, soru id) çiftleri"""
+        query = db.query(QuestionItemEvent.id, QuestionItemEvent.question_id)
+        if question_ids is not None:
+            query = query.filter(QuestionItemEvent.question_id.in_(question_ids))
+        return query.all()
+
+    def delete_events(self, db: Session, event_ids):
+        if event_ids:
+            db.execute(delete(QuestionItemEvent).where(QuestionItemEvent.id.in_(event_ids)))
+
+    def answered_question_ids(self, db: Session, question_ids=None):
+        """Cevabı veya istatistik satırı olan sorular (id sıralı)"""
+        answered = select(History.question_id)
+        with_stats = select(QuestionItemStats.question_id)
+        if question_ids is not None:
+            answered = answered.where(History.question_id.in_(question_ids))
+            with_stats = with_stats.where(QuestionItemStats.question_id.in_(question_ids))
+        return sorted(question_id for question_id, in db.execute(answered.union(with_stats)).all())
+
+    def get_report_rows(self, db: Session, lesson_id: int = None, question_id: int = None, min_attempts: int = 0):
+        """(soru id, ders id, doğru cevap, QuestionItemStats) satırları; soru id sıralı"""
+        query = (
+            db.query(Question.id, Question.lesson_id, Question.correct_answer, QuestionItemStats)
+            .join(QuestionItemStats, QuestionItemStats.question_id == Question.id)
+        )
+        if lesson_id is not None:
+            query = query.filter(Question.lesson_id == lesson_id)
+        if question_id is not None:
+            query = query.filter(Question.id == question_id)
+        if min_attempts:
+            query = query.filter(QuestionItemStats.attempts >= min_attempts)
+        return query.order_by(Question.id).all()
+
+    def stream_history(self, db: Session, question_ids=None, chunk_size: int = 100000):
+        """
+        Yeniden oluşturma için cevap sırasıyla (soru id, doğru cevap, verilen cevap, süre, öğrencinin
+        güncel genel yeteneği) satır parçaları. Yetenek kaydı olmayan öğrenci mevcut seviyesinden sayılır
+        (ability_engine.theta_from_level).
+        """
+        level_theta = THETA_START + (func.coalesce(User.current_level, 1) - 1) * DIFFICULTY_STEP
+        stmt = (
+            select(History.question_id, Question.correct_answer, History.given_answer,
+                   History.time_spent_seconds, func.coalesce(UserAbility.theta, level_theta))
+            .join(Question, Question.id == History.question_id)
+            .join(User, User.id == History.user_id)
+            .outerjoin(UserAbility, UserAbility.user_id == History.user_id)
+            .order_by(History.id)
+        )
+        if question_ids is not None:
+            stmt = stmt.where(History.question_id.in_(question_ids))
+        result = db.connection().execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        return result.partitions()
@@ -1,9 +1,14 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.lessons import Lesson
 
+# Liste görünümünde açıklamanın ilk N karakteri gönderilir
+PREVIEW_CHARS = 200
+
 class LessonRepository:
     def get_all(self, db: Session):
-        return db.query(Lesson).all()
+        return db.query(Lesson).order_by(Lesson.id).all()
 
     def get_by_id(self, db: Session, lesson_id: int):
         return db.query(Lesson).filter(Lesson.id == lesson_id).first()
@@ -25,3 +30,27 @@ class LessonRepository:
             db.delete(lesson)
             db.commit()
         return lesson
+
+
+class AsyncLessonRepository:
+    """LessonRepository'nin async rotalar için okuma yöntemleri"""
+
+    async def get_all(self, db: AsyncSession):
+        result = await db.execute(select(Lesson).order_by(Lesson.id))
+        return result.scalars().all()
+
+    async def get_by_id(self, db: AsyncSession, lesson_id: int):
+        return await db.get(Lesson, lesson_id)
+
+    async def list_summaries(self, db: AsyncSession, after: int = None, limit: int = 100, difficulty=None):
+        """id'ye göre keyset sayfası; content_text okunmaz, açıklama kısaltılır"""
+        query = select(
+            Lesson.id, Lesson.title, func.substr(Lesson.description, 1, PREVIEW_CHARS).label("description"),
+            Lesson.difficulty
+        )
+        if after is not None:
+            query = query.where(Lesson.id > after)
+        if difficulty is not None:
+            query = query.where(Lesson.difficulty == difficulty)
+        result = await db.execute(query.order_by(Lesson.id).limit(limit))
+        return result.all()
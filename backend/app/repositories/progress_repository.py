@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from app.core.database import upsert
+from app.models.history import History
+from app.models.progress import UserProgress
+
+class ProgressRepository:
+    def get_by_user(self, db: Session, user_id: int):
+        return db.query(UserProgress).filter(UserProgress.user_id == user_id).first()
+
+    def aggregate_from_history(self, db: Session, user_id: int = None, user_ids=None):
+        """histories tablosundan (user_id, doğru, yanlış, toplam, süre, son cevap) satırlarını hesaplar"""
+        query = db.query(
+            History.user_id,
+            func.sum(case((History.is_correct == True, 1), else_=0)),
+            func.sum(case((History.is_correct == True, 0), else_=1)),
+            func.count(History.id),
+            func.coalesce(func.sum(History.time_spent_seconds), 0),
+            func.max(History.solved_at),
+        )
+        if user_id is not None:
+            query = query.filter(History.user_id == user_id)
+        if user_ids is not None:
+            query = query.filter(History.user_id.in_(user_ids))
+        return query.group_by(History.user_id).all()
+
+    def apply_answers(self, db: Session, user_id: int, correct: int, wrong: int, time_spent: int):
+        """
+        Sayaçları tek bir atomik UPDATE ile artırır (commit etmez, çağıranın transaction'ına dahildir).
+        Satır yoksa (eski veri / yeni öğrenci) kullanıcının geçmişinden upsert ile oluşturulur.
+        Güncel sayaçlarla UserProgress döner.
+        """
+        now = datetime.now(timezone.utc)
+        updated = db.query(UserProgress).filter(UserProgress.user_id == user_id).update({
+            UserProgress.correct_count: UserProgress.correct_count + correct,
+            UserProgress.wrong_count: UserProgress.wrong_count + wrong,
+            UserProgress.total_count: UserProgress.total_count + correct + wrong,
+            UserProgress.total_time_seconds: UserProgress.total_time_seconds + time_spent,
+            UserProgress.last_answered_at: now,
+        }, synchronize_session=False)
+
+        if not updated:
+            # Geçmiş zaten flush edildiği için yeni cevaplar da bu toplama dahildir. Aynı anda satırı
+            # ekleyen başka bir istek varsa onun toplamı bu transaction'ın cevaplarını görmez:
+            # çakışmada sadece bu cevapların artışı uygulanır.
+            rows = self.aggregate_from_history(db, user_id)
+            upsert(db, UserProgress, [self._values(user_id, rows[0] if rows else None)],
+                   update=lambda table, new: {
+                       "correct_count": table.c.correct_count + correct,
+                       "wrong_count": table.c.wrong_count + wrong,
+                       "total_count": table.c.total_count + correct + wrong,
+                       "total_time_seconds": table.c.total_time_seconds + time_spent,
+                       "last_answered_at": now,
+                   })
+        return db.query(UserProgress).populate_existing().filter(UserProgress.user_id == user_id).first()
+
+    def rebuild_users(self, db: Session, user_ids):
+        """
+        Kullanıcıların sayaçlarını histories tablosundan yeniden yazar (commit etmez).
+        Soru / ders silinince cascade ile silinen cevaplardan sonra kullanılır.
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+        # Önce satırlar garanti edilip kilitlenir, toplam kilit altında okunur (eşzamanlı cevaplarla yarışmaz)
+        upsert(db, UserProgress, [self._values(user_id, None) for user_id in user_ids])
+        db.query(UserProgress.user_id).filter(UserProgress.user_id.in_(user_ids)) \
+            .order_by(UserProgress.user_id).with_for_update().all()
+        aggregates = {row[0]: row for row in self.aggregate_from_history(db, user_ids=user_ids)}
+        for user_id in user_ids:
+            values = self._values(user_id, aggregates.get(user_id))
+            db.query(UserProgress).filter(UserProgress.user_id == user_id).update(
+                {getattr(UserProgress, name): value for name, value in values.items() if name != "user_id"},
+                synchronize_session=False
+            )
+
+    def users_who_answered(self, db: Session, question_ids):
+        """Bu sorulardan en az birini cevaplamış öğrenciler"""
+        if not question_ids:
+            return []
+        return [user_id for (user_id,) in
+                db.query(History.user_id).filter(History.question_id.in_(question_ids)).distinct().all()]
+
+    @staticmethod
+    def _values(user_id: int, aggregate):
+        # aggregate: aggregate_from_history satırı (cevabı olmayan kullanıcı için None)
+        _, correct, wrong, total, total_time, last_at = aggregate or (user_id, 0, 0, 0, 0, None)
+        return {
+            "user_id": user_id,
+            "correct_count": int(correct or 0),
+            "wrong_count": int(wrong or 0),
+            "total_count": int(total or 0),
+            "total_time_seconds": int(total_time or 0),
+            "last_answered_at": last_at,
+        }
+
+    def get_all(self, db: Session):
+        return db.query(UserProgress).all()
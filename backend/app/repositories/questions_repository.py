@@ -1,13 +1,24 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.questions import Question
 
+# Liste görünümünde soru metninin ilk N karakteri gönderilir
+PREVIEW_CHARS = 200
+
 class QuestionRepository:
     def get_questions_by_lesson(self, db: Session, lesson_id: int):
-        return db.query(Question).filter(Question.lesson_id == lesson_id).all()
+        return db.query(Question).filter(Question.lesson_id == lesson_id).order_by(Question.id).all()
 
     def get_by_id(self, db: Session, question_id: int):
         return db.query(Question).filter(Question.id == question_id).first()
 
+    def get_by_ids(self, db: Session, question_ids):
+        """Birden fazla soruyu tek IN sorgusuyla getirir"""
+        if not question_ids:
+            return []
+        return db.query(Question).filter(Question.id.in_(question_ids)).all()
+
     def create(self, db: Session, question: Question):
         db.add(question)
         db.commit()
@@ -25,3 +36,42 @@ class QuestionRepository:
             db.delete(question)
             db.commit()
         return question
+
+
+class AsyncQuestionRepository:
+    """QuestionRepository'nin async rotalar için okuma yöntemleri"""
+
+    async def get_questions_by_lesson(self, db: AsyncSession, lesson_id: int):
+        result = await db.execute(select(Question).where(Question.lesson_id == lesson_id).order_by(Question.id))
+        return result.scalars().all()
+
+    async def get_by_id(self, db: AsyncSession, question_id: int):
+        return await db.get(Question, question_id)
+
+    async def get_by_ids(self, db: AsyncSession, question_ids):
+        if not question_ids:
+            return []
+        result = await db.execute(select(Question).where(Question.id.in_(question_ids)))
+        return result.scalars().all()
+
+    async def list_page(self, db: AsyncSession, lesson_id: int = None, after: int = None, limit: int = 100,
+                        difficulty_level: int = None, summary: bool = False):
+        """
+        id'ye göre keyset sayfası (OFFSET yok; her sayfa indeks üzerinde aynı maliyette).
+        summary=True: şıklar ve doğru cevap okunmaz, soru metni kısaltılır.
+        """
+        if summary:
+            query = select(
+                Question.id, Question.lesson_id,
+                func.substr(Question.content, 1, PREVIEW_CHARS).label("content"), Question.difficulty_level
+            )
+        else:
+            query = select(Question)
+        if lesson_id is not None:
+            query = query.where(Question.lesson_id == lesson_id)
+        if difficulty_level is not None:
+            query = query.where(Question.difficulty_level == difficulty_level)
+        if after is not None:
+            query = query.where(Question.id > after)
+        result = await db.execute(query.order_by(Question.id).limit(limit))
+        return result.all() if summary else result.scalars().all()
@@ -0,0 +1,156 @@
+import numpy as np
+from sqlalchemy.orm import Session
+from app.services.history_snapshot import HistorySnapshot, history_snapshot
+
+
+def _bincount(index, size: int, weights=None):
+    """np.bincount; anlık görüntüde boyut tablosunda olmayan (silinmiş) id'ler sayılmaz"""
+    index = np.asarray(index)
+    mask = index < size
+    if not mask.all():
+        index = index[mask]
+        weights = None if weights is None else np.asarray(weights)[mask]
+    return np.bincount(index, weights=weights, minlength=size)
+
+
+class SnapshotHistoryRepository:
+    """
+    HistoryRepository'nin analitik sorgularının anlık görüntü (NumPy, mmap) karşılıkları.
+    İmzalar aynıdır; db kullanılmaz, canlı tablolara hiç sorgu gitmez.
+    Görüntü değişmediği sürece tablo geneli toplamlar bir kez hesaplanır.
+    """
+
+    def __init__(self, snapshot: HistorySnapshot = history_snapshot):
+        self.snapshot = snapshot
+
+    def info(self):
+        return self.snapshot.status()
+
+    # --- ORTAK TOPLAMLAR ---
+    def _totals(self, data):
+        """Öğrenci ve soru başına (cevap, doğru, süre) dizileri"""
+        def compute():
+            dims = data.dims
+            user_size = int(dims["user_id"].max()) + 1 if len(dims["user_id"]) else 0
+            question_size = int(dims["question_id"].max()) + 1 if len(dims["question_id"]) else 0
+            totals = {
+                "user_total": np.zeros(user_size), "user_correct": np.zeros(user_size),
+                "question_total": np.zeros(question_size), "question_correct": np.zeros(question_size),
+                "question_time": np.zeros(question_size),
+            }
+            for user_ids, question_ids, correct, time_spent in data.columns(
+                    "user_id", "question_id", "is_correct", "time_spent_seconds"):
+                totals["user_total"] += _bincount(user_ids, user_size)
+                totals["user_correct"] += _bincount(user_ids, user_size, correct)
+                totals["question_total"] += _bincount(question_ids, question_size)
+                totals["question_correct"] += _bincount(question_ids, question_size, correct)
+                totals["question_time"] += _bincount(question_ids, question_size, time_spent)
+            return totals
+        return data.memo("totals", compute)
+
+    # --- SINIF ANALİTİĞİ ---
+    def count_students(self, db: Session = None):
+        return int((self.snapshot.get().dims["user_role"] == "student").sum())
+
+    def get_student_aggregates(self, db: Session = None, skip: int = 0, limit: int = None,
+                               sort_by: str = "id", descending: bool = False):
+        """(id, username, email, doğru sayısı, toplam cevap) satırları; sıralama canlı sorguyla aynı"""
+        data = self.snapshot.get()
+        dims = data.dims
+        totals = self._totals(data)
+        students = np.flatnonzero(dims["user_role"] == "student")
+        ids = dims["user_id"][students]
+        total = totals["user_total"][ids]
+        correct = totals["user_correct"][ids]
+
+        if sort_by == "username":
+            # Öğrenciler id sıralı; kararlı sıralama eşitlikte id'yi artan bırakır
+            usernames = dims["user_username"][students]
+            order = np.asarray(sorted(range(len(ids)), key=lambda i: usernames[i], reverse=descending), dtype=np.int64)
+        else:
+            keys = {
+                "accuracy": np.divide(correct, total, out=np.zeros_like(correct), where=total > 0),
+                "total_xp": correct,
+                "total_solved": total,
+            }
+            key = keys.get(sort_by, ids.astype(np.float64))
+            order = np.lexsort((ids, -key if descending else key))
+
+        order = order[skip:] if limit is None else order[skip:skip + limit]
+        return [
+            (int(ids[i]), str(dims["user_username"][students[i]]), str(dims["user_email"][students[i]]),
+             int(correct[i]), int(total[i]))
+            for i in order
+        ]
+
+    def get_lesson_aggregates(self, db: Session = None):
+        """Ders başına (id, başlık, soru sayısı, cevap sayısı, doğru sayısı)"""
+        data = self.snapshot.get()
+        dims = data.dims
+        totals = self._totals(data)
+        lesson_size = int(dims["lesson_id"].max()) + 1 if len(dims["lesson_id"]) else 0
+        question_lessons = dims["question_lesson_id"]
+        question_ids = dims["question_id"]
+
+        question_count = _bincount(question_lessons, lesson_size)
+        attempts = _bincount(question_lessons, lesson_size, totals["question_total"][question_ids])
+        correct = _bincount(question_lessons, lesson_size, totals["question_correct"][question_ids])
+        return [
+            (int(lesson_id), str(title), int(question_count[lesson_id]), int(attempts[lesson_id]),
+             int(correct[lesson_id]))
+            for lesson_id, title in zip(dims["lesson_id"], dims["lesson_title"])
+        ]
+
+    def get_question_aggregates(self, db: Session, lesson_id: int):
+        """Dersin soruları için (soru id, zorluk, cevap, doğru, toplam süre)"""
+        data = self.snapshot.get()
+        dims = data.dims
+        totals = self._totals(data)
+        in_lesson = np.flatnonzero(dims["question_lesson_id"] == lesson_id)
+        return [
+            (int(question_id), int(dims["question_difficulty"][i]),
+             int(totals["question_total"][question_id]), int(totals["question_correct"][question_id]),
+             int(totals["question_time"][question_id]))
+            for i, question_id in zip(in_lesson, dims["question_id"][in_lesson])
+        ]
+
+    # --- ÖĞRENCİ ÖZETİ ---
+    def get_lesson_breakdown(self, db: Session, user_id: int):
+        """(ders id, başlık, toplam, doğru, toplam süre); dersler ilk cevap sırasıyla (canlı sorgu gibi)"""
+        data = self.snapshot.get()
+        dims = data.dims
+        question_size = int(dims["question_id"].max()) + 1 if len(dims["question_id"]) else 0
+        lesson_size = int(dims["lesson_id"].max()) + 1 if len(dims["lesson_id"]) else 0
+        if not question_size or not lesson_size:
+            return []
+        lesson_of = data.memo("lesson_of_question", lambda: self._lesson_of_question(dims, question_size))
+
+        total = np.zeros(lesson_size)
+        right = np.zeros(lesson_size)
+        seconds = np.zeros(lesson_size)
+        first = np.full(lesson_size, np.iinfo(np.int64).max)
+        for history_ids, question_ids, correct, time_spent in data.user_columns(
+                user_id, "id", "question_id", "is_correct", "time_spent_seconds"):
+            # Görüntüdeki boyut tablolarında olmayan (silinmiş) sorular ve dersler sayılmaz
+            lessons = lesson_of[np.minimum(question_ids, question_size - 1)]
+            known = (question_ids < question_size) & (lessons < lesson_size)
+            lessons = lessons[known]
+            total += np.bincount(lessons, minlength=lesson_size)
+            right += np.bincount(lessons, weights=correct[known], minlength=lesson_size)
+            seconds += np.bincount(lessons, weights=time_spent[known], minlength=lesson_size)
+            np.minimum.at(first, lessons, history_ids[known])
+
+        # Ders 0: lesson_of'ta boşluk (silinmiş soru id'si)
+        total[0] = 0
+        answered = np.flatnonzero(total)
+        answered = answered[np.argsort(first[answered], kind="stable")]
+        titles = dict(zip(dims["lesson_id"].tolist(), dims["lesson_title"].tolist()))
+        return [(int(lesson_id), titles.get(int(lesson_id), ""), int(total[lesson_id]), int(right[lesson_id]),
+                 int(seconds[lesson_id]))
+                for lesson_id in answered]
+
+    @staticmethod
+    def _lesson_of_question(dims, size: int):
+        lesson_of = np.zeros(size, dtype=np.int32)
+        lesson_of[dims["question_id"]] = dims["question_lesson_id"]
+        return lesson_of
@@ -0,0 +1,76 @@
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+from app.core.database import upsert
+from app.models.trend import LearningRollup
+from app.models.history import History
+from app.models.questions import Question
+
+class TrendRepository:
+    def increment(self, db: Session, records):
+        """
+        records: {"user_id", "period", "bucket_start", "lesson_id", "attempts", "correct_count",
+        "total_time_seconds"} sözlükleri. Satır yoksa eklenir, varsa sayaçlar tek ifadede artırılır
+        (ilk cevapta aynı satırı ekleyen eşzamanlı istekler yarışmaz). Commit etmez.
+        """
+        # Anahtar sırası sabit: aynı satırlara yazan iki transaction kilitleri aynı sırayla alır
+        records = sorted(records, key=lambda r: (r["user_id"], r["period"], r["bucket_start"], r["lesson_id"]))
+        upsert(db, LearningRollup, records, update=lambda table, new: {
+            "attempts": table.c.attempts + new.attempts,
+            "correct_count": table.c.correct_count + new.correct_count,
+            "total_time_seconds": table.c.total_time_seconds + new.total_time_seconds,
+        })
+
+    def get_series(self, db: Session, user_id: int, period: str, since, lesson_id: int = None):
+        """Dönem başına (bucket_start, cevap, doğru, toplam süre); ders verilmezse tüm dersler toplanır"""
+        query = (
+            db.query(
+                LearningRollup.bucket_start,
+                func.sum(LearningRollup.attempts),
+                func.sum(LearningRollup.correct_count),
+                func.sum(LearningRollup.total_time_seconds),
+            )
+            .filter(
+                LearningRollup.user_id == user_id,
+                LearningRollup.period == period,
+                LearningRollup.bucket_start >= since,
+            )
+        )
+        if lesson_id is not None:
+            query = query.filter(LearningRollup.lesson_id == lesson_id)
+        return query.group_by(LearningRollup.bucket_start).order_by(LearningRollup.bucket_start).all()
+
+    def max_history_id(self, db: Session) -> int:
+        return db.query(func.max(History.id)).scalar() or 0
+
+    def _history_rows(self):
+        return (
+            select(History.user_id, Question.lesson_id, History.solved_at,
+                   History.is_correct, History.time_spent_seconds)
+            .join(Question, Question.id == History.question_id)
+        )
+
+    def stream_history(self, db: Session, up_to: int = None, chunk_size: int = 100000, user_ids=None):
+        """
+        Yeniden oluşturma için (user_id, lesson_id, solved_at, is_correct, süre) parçaları;
+        up_to verilirse id <= up_to cevaplar, user_ids verilirse sadece bu öğrenciler
+        """
+        stmt = self._history_rows()
+        if up_to is not None:
+            stmt = stmt.where(History.id <= up_to)
+        if user_ids is not None:
+            stmt = stmt.where(History.user_id.in_(user_ids))
+        result = db.connection().execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        return result.partitions()
+
+    def history_after_for_update(self, db: Session, after: int):
+        """
+        id > after cevapları kilitleyerek okur: yazılmakta olan cevapların commit'i beklenir,
+        MySQL'de sona eklenecek yeni cevaplar da transaction bitene kadar bekler.
+        """
+        return db.execute(self._history_rows().where(History.id > after).with_for_update(of=History)).all()
+
+    def delete_all(self, db: Session):
+        db.execute(delete(LearningRollup))
+
+    def delete_users(self, db: Session, user_ids):
+        db.execute(delete(LearningRollup).where(LearningRollup.user_id.in_(user_ids)))
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 
@@ -11,3 +13,27 @@ class UserRepository:
         db.commit()
         db.refresh(user)
         return user
+
+    def get_students_page(self, db: Session, after_id: int = 0, limit: int = 500, level: int = None):
+        """id sıralı (keyset) öğrenci sayfası: (id, username) satırları"""
+        query = db.query(User.id, User.username).filter(User.role == "student", User.id > after_id)
+        if level is not None:
+            query = query.filter(User.current_level == level)
+        return query.order_by(User.id).limit(limit).all()
+
+
+class AsyncUserRepository:
+    """UserRepository'nin async rotalar için okuma yöntemleri"""
+
+    async def get_by_email(self, db: AsyncSession, email: str):
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
+    async def get_by_id(self, db: AsyncSession, user_id: int):
+        return await db.get(User, user_id)
+
+    async def create(self, db: AsyncSession, user: User):
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
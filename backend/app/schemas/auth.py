@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+
+# İstek sahibinin kimliği (get_current_user); kısa süreli önbellekte tutulur
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    email: str
+    role: str
+    current_level: Optional[int] = 1
+    is_placement_completed: Optional[bool] = False
+
+    class Config:
+        from_attributes = True
+
+    @property
+    def is_staff(self) -> bool:
+        return self.role.lower() in ("admin", "teacher")
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Optional
 
 class HistoryBase(BaseModel):
     question_id: int
@@ -10,10 +11,28 @@ class HistoryCreate(HistoryBase):
     pass
 
 class HistoryResponse(HistoryBase):
-    id: int
+    id: Optional[int] = None  # arabellekli modda kayıt henüz yazılmadığı için boş
     user_id: int
     is_correct: bool
     solved_at: datetime
+    queued: bool = False
 
     class Config:
         from_attributes = True
+
+
+# --- TOPLU CEVAP GÖNDERİMİ (bir quiz denemesi) ---
+class HistoryBatchCreate(BaseModel):
+    answers: List[HistoryCreate] = Field(..., min_length=1, max_length=100)
+
+class AnswerResult(BaseModel):
+    question_id: int
+    given_answer: str
+    correct_answer: str
+    is_correct: bool
+
+class HistoryBatchResponse(BaseModel):
+    results: List[AnswerResult]
+    correct_count: int
+    total: int
+    new_level: int
@@ -12,6 +12,16 @@ class LessonBase(BaseModel):
 class LessonCreate(LessonBase):
     pass
 
+# Liste görünümü: büyük metin alanları (content_text) yok, açıklama kısaltılmış
+class LessonSummary(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = ""
+    difficulty: str = "medium"
+
+    class Config:
+        from_attributes = True
+
 class LessonResponse(LessonBase):
     id: int
 
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
 
 class QuestionBase(BaseModel):
     lesson_id: int
@@ -18,4 +18,34 @@ class QuestionResponse(QuestionBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Öğrenciye gösterilen soru: doğru cevap gönderilmez
+class QuestionPublic(BaseModel):
+    id: int
+    lesson_id: int
+    content: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    difficulty_level: int
+
+    class Config:
+        from_attributes = True
+
+# Liste görünümü: şıklar ve doğru cevap yok, soru metni kısaltılmış
+class QuestionSummary(BaseModel):
+    id: int
+    lesson_id: int
+    content: str
+    difficulty_level: int
+
+    class Config:
+        from_attributes = True
+
+class BulkGenerationRequest(BaseModel):
+    lesson_ids: List[int] = Field(..., min_length=1, max_length=500)
+    # Zorluk seviyesi (1-5) -> ders başına üretilecek soru sayısı, örn. {"1": 2, "3": 5}
+    counts: Dict[int, int] = Field(..., min_length=1)
+    batch_size: int = Field(5, ge=1, le=20)
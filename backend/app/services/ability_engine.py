@@ -0,0 +1,132 @@
+"""
+Rasch (1PL IRT) modeline dayalı yetenek tahmini.
+
+P(doğru) = sigmoid(theta - b)
+  theta: öğrencinin (ders bazında ve genel) yeteneği
+  b:     sorunun zorluğu (ilk değer difficulty_level'dan gelir)
+
+Cevap başına güncelleme çevrimiçi Elo adımıdır (O(1), saf Python).
+Toplu yeniden uydurma ise tüm geçmiş üzerinde np.bincount ile vektörleştirilmiş
+köşegen Newton adımlarıdır; satır sayısıyla doğrusal ölçeklenir.
+"""
+import math
+import numpy as np
+
+# Yeni öğrenci Level 1'den başlar (eski varsayılanla aynı)
+THETA_START = -1.6
+# difficulty_level (1-5) -> başlangıç zorluğu: -1.6, -0.8, 0, 0.8, 1.6
+DIFFICULTY_STEP = 0.8
+
+K_USER = 0.4          # yetenek adımı (ilk cevaplarda büyük, zamanla küçülür)
+K_USER_MIN = 0.05
+K_QUESTION = 0.2      # soru zorluğu adımı
+K_QUESTION_MIN = 0.02
+K_DECAY = 20.0        # kaç denemeden sonra adım yarıya iner
+
+# Süre ağırlığı: referans sürenin altında doğru cevap biraz daha fazla, üstünde biraz daha az sayılır
+TIME_REFERENCE_SECONDS = 30.0
+TIME_WEIGHT_MIN = 0.75
+TIME_WEIGHT_MAX = 1.25
+
+LEVEL_MIN = 1
+LEVEL_MAX = 5
+
+
+def prior_difficulty(difficulty_level) -> float:
+    level = difficulty_level if difficulty_level else 3
+    return (level - 3) * DIFFICULTY_STEP
+
+
+def level_from_theta(theta: float) -> int:
+    """theta'yı soru zorluk ölçeğiyle aynı 1-5 seviyesine çevirir"""
+    level = int(math.floor((theta - THETA_START) / DIFFICULTY_STEP + 0.5)) + 1
+    return max(LEVEL_MIN, min(LEVEL_MAX, level))
+
+
+def theta_from_level(level) -> float:
+    """level_from_theta'nın tersi: seviyenin ortasındaki theta (yetenek kaydı olmayan eski öğrenciler için)"""
+    level = max(LEVEL_MIN, min(LEVEL_MAX, level or LEVEL_MIN))
+    return THETA_START + (level - 1) * DIFFICULTY_STEP
+
+
+def theta_from_score(score: int, total: int) -> float:
+    """Seviye testi puanından (karışık zorlukta, ortalama b=0) başlangıç yeteneği"""
+    score = max(0, min(score, total))
+    return math.log((score + 0.5) / (total - score + 0.5))
+
+
+def probability(theta: float, difficulty: float) -> float:
+    return 1.0 / (1.0 + math.exp(difficulty - theta))
+
+
+def step_size(base: float, floor: float, attempts: int) -> float:
+    return max(floor, base / (1.0 + attempts / K_DECAY))
+
+
+def time_weight(is_correct: bool, time_spent_seconds) -> float:
+    if not is_correct or not time_spent_seconds:
+        return 1.0
+    weight = 1.25 - 0.5 * (time_spent_seconds / TIME_REFERENCE_SECONDS)
+    return max(TIME_WEIGHT_MIN, min(TIME_WEIGHT_MAX, weight))
+
+
+def elo_update(theta: float, difficulty: float, is_correct: bool, time_spent_seconds,
+               user_attempts: int, question_attempts: int):
+    """Tek cevap için (yeni theta, yeni b) döner"""
+    surprise = (1.0 if is_correct else 0.0) - probability(theta, difficulty)
+    weight = time_weight(is_correct, time_spent_seconds)
+    new_theta = theta + step_size(K_USER, K_USER_MIN, user_attempts) * weight * surprise
+    new_difficulty = difficulty - step_size(K_QUESTION, K_QUESTION_MIN, question_attempts) * surprise
+    return new_theta, new_difficulty
+
+
+# --- VEKTÖRLEŞTİRİLMİŞ ÇEKİRDEKLER ---
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def time_weights(correct: np.ndarray, time_spent: np.ndarray) -> np.ndarray:
+    weights = np.clip(1.25 - 0.5 * (time_spent / TIME_REFERENCE_SECONDS), TIME_WEIGHT_MIN, TIME_WEIGHT_MAX)
+    return np.where(correct > 0, weights, 1.0)
+
+
+def fit_rasch(group_idx: np.ndarray, item_idx: np.ndarray, correct: np.ndarray, weights: np.ndarray,
+              n_groups: int, prior_b: np.ndarray, theta_init: np.ndarray = None,
+              epochs: int = 30, l2: float = 0.1, fit_items: bool = True):
+    """
+    Tüm cevaplar üzerinde (grup yeteneği, soru zorluğu) parametrelerini uydurur.
+    group_idx: her cevabın yetenek grubunun (örn. öğrenci x ders) yoğun indeksi
+    item_idx:  her cevabın sorusunun yoğun indeksi
+    prior_b:   soruların başlangıç zorlukları (ayrıca L2 düzenlemesinin merkezi)
+    Her epoch O(satır) bincount işlemleridir, Python döngüsü yoktur.
+    """
+    n_items = len(prior_b)
+    theta = np.full(n_groups, THETA_START, dtype=np.float64) if theta_init is None else theta_init.astype(np.float64)
+    b = prior_b.astype(np.float64).copy()
+    y = correct.astype(np.float64)
+    w = weights.astype(np.float64)
+
+    for _ in range(epochs):
+        p = _sigmoid(theta[group_idx] - b[item_idx])
+        residual = w * (y - p)
+        info = w * p * (1.0 - p)
+
+        # Köşegen Newton adımı (log-olabilirlik + L2)
+        grad_theta = np.bincount(group_idx, residual, minlength=n_groups) - l2 * (theta - THETA_START)
+        hess_theta = np.bincount(group_idx, info, minlength=n_groups) + l2
+        theta += np.clip(grad_theta / hess_theta, -1.0, 1.0)
+
+        if fit_items:
+            p = _sigmoid(theta[group_idx] - b[item_idx])
+            residual = w * (y - p)
+            info = w * p * (1.0 - p)
+            grad_b = -np.bincount(item_idx, residual, minlength=n_items) - l2 * (b - prior_b)
+            hess_b = np.bincount(item_idx, info, minlength=n_items) + l2
+            b += np.clip(grad_b / hess_b, -1.0, 1.0)
+
+    return theta, b
+
+
+def levels_from_theta(theta: np.ndarray) -> np.ndarray:
+    levels = np.floor((theta - THETA_START) / DIFFICULTY_STEP + 0.5).astype(np.int64) + 1
+    return np.clip(levels, LEVEL_MIN, LEVEL_MAX)
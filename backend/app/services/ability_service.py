@@ -0,0 +1,223 @@
+from itertools import chain
+import numpy as np
+from sqlalchemy import select, insert, delete, update, func, case
+from sqlalchemy.orm import Session
+from app.models.ability import UserAbility, UserLessonAbility, QuestionCalibration
+from app.models.history import History
+from app.models.questions import Question
+from app.models.user import User
+from app.repositories.ability_repository import AbilityRepository
+from app.services import ability_engine as engine
+from app.services.question_index import question_index
+
+WRITE_CHUNK = 5000
+# load_history_arrays sütun sayısı
+HISTORY_COLUMNS = 6
+
+class AbilityService:
+    def __init__(self):
+        self.ability_repo = AbilityRepository()
+
+    # --- CEVAP BAŞINA ÇEVRİMİÇİ GÜNCELLEME (O(1)) ---
+    def record_answer(self, db: Session, user_id: int, question: Question, is_correct: bool, time_spent_seconds: int):
+        """
+        Öğrencinin genel ve ders yeteneğini, sorunun zorluğunu tek Elo adımıyla günceller.
+        Commit etmez; (yeni seviye, sorunun yeni zorluğu) döner.
+        """
+        new_level, difficulties = self.record_answers(db, user_id, [(question, is_correct, time_spent_seconds)])
+        return new_level, difficulties[question.id]
+
+    def record_answers(self, db: Session, user_id: int, answers):
+        """
+        answers: (soru, doğru mu, süre) listesi, cevaplanma sırasıyla.
+        Öğrencinin satırları IN sorgularıyla bir kez kilitlenip okunur, Elo adımları sırayla bellekte uygulanır.
+        Soru zorlukları kilitsiz okunur ve göreli UPDATE ile yazılır.
+        Commit etmez; (yeni seviye, {soru id: yeni zorluk}) döner.
+        """
+        # Eksik satırlar önce upsert ile eklenir, sonra kilitlenip taze okunur. Aynı transaction'daki
+        # önceki öğrencilerin değişiklikleri önce yazılır (taze okuma onları ezmesin).
+        # Kilitler her zaman aynı sırayla alınır: genel yetenek, ders yetenekleri
+        db.flush()
+        user_ability = self._lock_user(db, user_id)
+
+        lesson_ids = sorted({question.lesson_id for question, _, _ in answers})
+        # Yeni derse genel yetenekten başlanır
+        self.ability_repo.insert_missing(db, UserLessonAbility, [
+            {"user_id": user_id, "lesson_id": lesson_id, "theta": user_ability.theta, "attempts": 0}
+            for lesson_id in self.ability_repo.missing_lessons(db, user_id, lesson_ids)
+        ])
+        lessons = {a.lesson_id: a for a in self.ability_repo.get_user_lessons(db, user_id, lesson_ids, for_update=True)}
+
+        # Soru satırı sınav anında tüm öğrencilerin ortak sıcak noktasıdır; kilitlenmez.
+        # Elo adımı okunan zorlukla hesaplanır, fark (delta) mevcut değere eklenir: aynı anda gelen
+        # cevapların adımları kaybolmaz, yalnızca birbirini görmeden hesaplanmış olur.
+        questions = {question.id: question for question, _, _ in answers}
+        question_ids = sorted(questions)
+        read = self.ability_repo.get_calibrations(db, question_ids)
+        start = {
+            question_id: read.get(question_id, (engine.prior_difficulty(questions[question_id].difficulty_level), 0))
+            for question_id in question_ids
+        }
+        calibrations = {question_id: list(values) for question_id, values in start.items()}
+
+        for question, is_correct, time_spent_seconds in answers:
+            lesson_ability = lessons[question.lesson_id]
+            calibration = calibrations[question.id]
+            difficulty, item_attempts = calibration
+            lesson_ability.theta, calibration[0] = engine.elo_update(
+                lesson_ability.theta, difficulty, is_correct, time_spent_seconds,
+                lesson_ability.attempts, item_attempts
+            )
+            user_ability.theta, _ = engine.elo_update(
+                user_ability.theta, difficulty, is_correct, time_spent_seconds,
+                user_ability.attempts, item_attempts
+            )
+            lesson_ability.attempts += 1
+            user_ability.attempts += 1
+            calibration[1] += 1
+
+        self.ability_repo.add_to_questions(db, [
+            {"question_id": question_id, "difficulty": difficulty, "attempts": attempts - start[question_id][1],
+             "delta": difficulty - start[question_id][0]}
+            for question_id, (difficulty, attempts) in calibrations.items()
+        ])
+        difficulties = {question_id: difficulty for question_id, (difficulty, _) in calibrations.items()}
+        return engine.level_from_theta(user_ability.theta), difficulties
+
+    def _lock_user(self, db: Session, user_id: int):
+        """
+        Genel yetenek satırını kilitleyerek okur; yoksa önce ekler. Kaydı olmayan (yetenek motorundan
+        önceki) öğrenci mevcut seviyesinden başlar, ilk cevabında seviyesi düşürülmez.
+        """
+        if not self.ability_repo.has_user(db, user_id):
+            level = self.ability_repo.get_levels(db, [user_id]).get(user_id)
+            self.ability_repo.insert_missing(db, UserAbility, [
+                {"user_id": user_id, "theta": engine.theta_from_level(level), "attempts": 0}
+            ])
+        return self.ability_repo.get_user(db, user_id, for_update=True)
+
+    def get_thetas(self, db: Session, user_ids):
+        """{user_id: genel yetenek}; kaydı olmayan öğrenci mevcut seviyesinin theta'sında sayılır"""
+        user_ids = list(user_ids)
+        thetas = {a.user_id: a.theta for a in self.ability_repo.get_users(db, user_ids)}
+        missing = [user_id for user_id in user_ids if user_id not in thetas]
+        for user_id, level in self.ability_repo.get_levels(db, missing).items():
+            thetas[user_id] = engine.theta_from_level(level)
+        return {user_id: thetas.get(user_id, engine.THETA_START) for user_id in user_ids}
+
+    # --- SEVİYE TESTİ ---
+    def apply_placement(self, db: Session, user_id: int, score: int, total: int):
+        """Seviye testi puanından başlangıç yeteneğini yazar (commit etmez), seviyeyi döner"""
+        theta = engine.theta_from_score(score, total)
+        self._lock_user(db, user_id).theta = theta
+        return engine.level_from_theta(theta)
+
+    def get_user_abilities(self, db: Session, user_id: int):
+        user_ability = self.ability_repo.get_user(db, user_id)
+        theta = user_ability.theta if user_ability else self.get_thetas(db, [user_id])[user_id]
+        return {
+            "theta": round(theta, 3),
+            "level": engine.level_from_theta(theta),
+            "attempts": user_ability.attempts if user_ability else 0,
+            "lessons": {
+                a.lesson_id: {"theta": round(a.theta, 3), "level": engine.level_from_theta(a.theta), "attempts": a.attempts}
+                for a in self.ability_repo.get_user_lessons(db, user_id)
+            },
+        }
+
+    # --- TOPLU YENİDEN UYDURMA ---
+    def load_history_arrays(self, db: Session, chunk_size: int = 100000):
+        """
+        histories ⨝ questions tablosunu sunucu taraflı imleçle parça parça okuyup NumPy dizilerine çevirir.
+        Sütunlar: user_id, question_id, lesson_id, difficulty_level, is_correct, time_spent_seconds
+        NULL varsayılanları SQL'de verilir; her parça satır başına Python nesnesi kurulmadan
+        np.fromiter ile tek int64 dizisine dökülür.
+        """
+        stmt = (
+            select(History.user_id, History.question_id, Question.lesson_id,
+                   func.coalesce(Question.difficulty_level, 3),
+                   case((History.is_correct == True, 1), else_=0),
+                   func.coalesce(History.time_spent_seconds, 0))
+            .join(Question, Question.id == History.question_id)
+            .order_by(History.id)
+        )
+        chunks = []
+        result = db.connection().execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        for partition in result.partitions():
+            chunks.append(np.fromiter(
+                chain.from_iterable(partition), dtype=np.int64, count=len(partition) * HISTORY_COLUMNS
+            ).reshape(-1, HISTORY_COLUMNS))
+        if not chunks:
+            return np.empty((0, HISTORY_COLUMNS), dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def refit_all(self, db: Session, epochs: int = 30, chunk_size: int = 100000):
+        """Tüm geçmiş üzerinde yetenek ve zorluk parametrelerini tek geçişte yeniden hesaplar"""
+        data = self.load_history_arrays(db, chunk_size)
+        if len(data) == 0:
+            return {"rows": 0, "users": 0, "lessons": 0, "questions": 0}
+
+        user_ids, question_ids, lesson_ids, levels, correct, time_spent = data.T
+        weights = engine.time_weights(correct, time_spent.astype(np.float64))
+
+        uniq_users, user_idx = np.unique(user_ids, return_inverse=True)
+        uniq_questions, item_first, item_idx = np.unique(question_ids, return_index=True, return_inverse=True)
+        uniq_lessons, lesson_idx = np.unique(lesson_ids, return_inverse=True)
+        prior_b = (levels[item_first] - 3) * engine.DIFFICULTY_STEP
+
+        # 1) Öğrenci x ders yetenekleri ve soru zorlukları birlikte
+        pair_keys = user_idx * len(uniq_lessons) + lesson_idx
+        uniq_pairs, pair_idx = np.unique(pair_keys, return_inverse=True)
+        pair_theta, difficulty = engine.fit_rasch(
+            pair_idx, item_idx, correct, weights, len(uniq_pairs), prior_b, epochs=epochs
+        )
+
+        # 2) Genel yetenek: zorluklar sabit
+        user_theta, _ = engine.fit_rasch(
+            user_idx, item_idx, correct, weights, len(uniq_users), difficulty, epochs=epochs, fit_items=False
+        )
+
+        pair_attempts = np.bincount(pair_idx, minlength=len(uniq_pairs))
+        user_attempts = np.bincount(user_idx, minlength=len(uniq_users))
+        item_attempts = np.bincount(item_idx, minlength=len(uniq_questions))
+        user_levels = engine.levels_from_theta(user_theta)
+
+        # 3) Yaz: geçmişten türetilen tablolar tamamen, genel yetenek sadece geçmişi olanlar için yenilenir
+        db.execute(delete(UserLessonAbility))
+        db.execute(delete(QuestionCalibration))
+        for start in range(0, len(uniq_users), WRITE_CHUNK):
+            db.execute(delete(UserAbility).where(UserAbility.user_id.in_(uniq_users[start:start + WRITE_CHUNK].tolist())))
+
+        self._write_chunks(db, UserAbility, [
+            {"user_id": int(u), "theta": float(t), "attempts": int(a)}
+            for u, t, a in zip(uniq_users, user_theta, user_attempts)
+        ])
+        pair_users = uniq_users[uniq_pairs // len(uniq_lessons)]
+        pair_lessons = uniq_lessons[uniq_pairs % len(uniq_lessons)]
+        self._write_chunks(db, UserLessonAbility, [
+            {"user_id": int(u), "lesson_id": int(l), "theta": float(t), "attempts": int(a)}
+            for u, l, t, a in zip(pair_users, pair_lessons, pair_theta, pair_attempts)
+        ])
+        self._write_chunks(db, QuestionCalibration, [
+            {"question_id": int(q), "difficulty": float(b), "attempts": int(a)}
+            for q, b, a in zip(uniq_questions, difficulty, item_attempts)
+        ])
+        # Seviyeler birincil anahtarla toplu UPDATE
+        self._write_chunks(db, User, [
+            {"id": int(u), "current_level": int(lvl)} for u, lvl in zip(uniq_users, user_levels)
+        ], statement=update(User))
+        db.commit()
+        # Sıralı ders listeleri yeni zorluklarla yeniden yüklenir
+        question_index.invalidate()
+
+        return {
+            "rows": int(len(data)),
+            "users": int(len(uniq_users)),
+            "lessons": int(len(uniq_lessons)),
+            "questions": int(len(uniq_questions)),
+        }
+
+    def _write_chunks(self, db: Session, model, rows, statement=None):
+        statement = statement if statement is not None else insert(model)
+        for start in range(0, len(rows), WRITE_CHUNK):
+            db.execute(statement, rows[start:start + WRITE_CHUNK])
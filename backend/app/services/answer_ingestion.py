@@ -0,0 +1,434 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError, DataError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.ingestion_repository import IngestionRepository
+from app.services.history_service import HistoryService
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_STOP = object()
+# Geçici hatalarda iki deneme arası en fazla bekleme (saniye)
+MAX_BACKOFF_SECONDS = 5.0
+
+
+def _try_lock(path: str):
+    """Dosyayı özel ve beklemeden kilitler; başka bir süreç (veya açık dosya) tutuyorsa None"""
+    handle = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+class IngestionOverloaded(Exception):
+    """Arabellek dolu; istemci biraz sonra tekrar denemeli (503)"""
+
+
+class AnswerIngestionBuffer:
+    """
+    Değerlendirilmiş cevaplar için yazma arabelleği (write-behind).
+
+    submit(): cevap önce kayıt dosyasına (JSONL) eklenir, sonra kuyruğa alınır ve hemen onaylanır.
+    Arka plandaki tek yazıcı iş parçacığı kuyruğu batch_size dolunca veya ilk bekleyen cevap
+    flush_interval kadar beklediğinde toplu olarak yazar. Yazılan son sıra numarası cevaplarla
+    aynı transaction'da ingestion_checkpoints tablosuna işlenir; böylece çökme sonrası
+    start() sadece işlenmemiş kayıtları tekrar oynatır (tekrar yazım olmaz).
+
+    Birden fazla worker süreci aynı klasörü paylaşabilir: her süreç start()'ta özel dosya kilidiyle
+    bir dilim alır (<name>-<n>.jsonl, checkpoint adı <name>-<n>) ve sadece ona yazar. Kilidi
+    tutulmayan diğer dilimler (kapanmış / çökmüş worker'lar) açılışta tekrar oynatılır.
+    """
+
+    def __init__(self, persist, session_factory=SessionLocal, name: str = "answers",
+                 max_queue: int = None, batch_size: int = None, flush_interval_ms: int = None,
+                 enqueue_timeout_ms: int = None, spill_dir: str = None, fsync: bool = None,
+                 worker_id: str = None, max_retries: int = None):
+        self.persist = persist  # persist(db, records, before_commit)
+        self.session_factory = session_factory
+        self.base_name = name
+        self.name = name  # start()'ta alınan dilimin adı
+        self.worker_id = worker_id if worker_id is not None else settings.INGESTION_WORKER_ID
+        self.max_retries = max_retries or settings.INGESTION_MAX_RETRIES
+        self.max_queue = max_queue or settings.INGESTION_QUEUE_SIZE
+        self.batch_size = batch_size or settings.INGESTION_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.INGESTION_FLUSH_INTERVAL_MS) / 1000
+        self.enqueue_timeout = (enqueue_timeout_ms if enqueue_timeout_ms is not None
+                                else settings.INGESTION_ENQUEUE_TIMEOUT_MS) / 1000
+        self.spill_dir = os.path.abspath(spill_dir or settings.INGESTION_SPILL_DIR)
+        self.fsync = settings.INGESTION_FSYNC if fsync is None else fsync
+        self.checkpoint_repo = IngestionRepository()
+
+        self._queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.max_queue)  # kuyruk kapasitesi
+        self._log_lock = threading.Lock()
+        self._log = None
+        self._slot_lock = None
+        self._seq = 0
+        self._thread = None
+        self._abandoned = False
+        self.running = False
+
+        # Metrikler
+        self._accepted = 0
+        self._written = 0
+        self._batches = 0
+        self._overloaded = 0
+        self._failed_batches = 0
+        self._rejected = 0
+        self._replayed = 0
+        self._max_batch = 0
+        self._last_error = None
+        self._latencies = deque(maxlen=256)   # flush süresi (ms)
+        self._batch_sizes = deque(maxlen=256)
+
+    def _log_path(self, name: str):
+        return os.path.join(self.spill_dir, f"{name}.jsonl")
+
+    def _rejected_path(self, name: str):
+        return os.path.join(self.spill_dir, f"{name}.rejected.jsonl")
+
+    @property
+    def log_path(self):
+        return self._log_path(self.name)
+
+    @property
+    def rejected_path(self):
+        return self._rejected_path(self.name)
+
+    # --- YAŞAM DÖNGÜSÜ ---
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._claim_slot()
+        try:
+            self._recover_orphans()
+            self._seq = self._recover(self.name)
+        except BaseException:
+            self._release_slot()
+            raise
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name=f"ingest-{self.name}", daemon=True)
+        self.running = True
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        """Yeni cevap kabulünü durdurur, kuyruktakileri yazar (drain)"""
+        if not self.running:
+            return
+        self.running = False
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        with self._log_lock:
+            self._log.close()
+            self._log = None
+        self._release_slot()
+
+    # --- DİLİMLER ---
+    def _claim_slot(self):
+        """Süreç ömrü boyunca kilitli tutulan dilimi alır (INGESTION_WORKER_ID verildiyse o dilim)"""
+        if self.worker_id is not None:
+            name = f"{self.base_name}-{self.worker_id}"
+            handle = _try_lock(os.path.join(self.spill_dir, f"{name}.lock"))
+            if handle is None:
+                raise RuntimeError(f"Ingestion slot {name} is held by another process")
+        else:
+            slot = 0
+            while True:
+                name = f"{self.base_name}-{slot}"
+                handle = _try_lock(os.path.join(self.spill_dir, f"{name}.lock"))
+                if handle is not None:
+                    break
+                slot += 1
+        self.name = name
+        self._slot_lock = handle
+
+    def _release_slot(self):
+        if self._slot_lock is not None:
+            self._slot_lock.close()
+            self._slot_lock = None
+
+    def _recover_orphans(self):
+        """Kilidi tutulmayan diğer dilimlerin (ve eski tek dosyalı <name>.jsonl'ün) bekleyen kayıtları"""
+        pattern = re.compile(rf"^{re.escape(self.base_name)}(-[^.]+)?\.jsonl$")
+        for filename in sorted(os.listdir(self.spill_dir)):
+            name = filename[:-len(".jsonl")]
+            if not pattern.match(filename) or name == self.name:
+                continue
+            handle = _try_lock(os.path.join(self.spill_dir, f"{name}.lock"))
+            if handle is None:
+                continue  # çalışan bir worker'ın dilimi
+            try:
+                self._recover(name)
+            finally:
+                handle.close()
+
+    def _recover(self, name: str) -> int:
+        """
+        Dilimin önceki çalışmadan kalan, checkpoint'ten sonraki kayıtlarını doğrudan yazar.
+        Reddedilenler dosyasındaki kayıtlar işlenmiş sayılır. Dilimin son sıra numarasını döner.
+        """
+        db = self.session_factory()
+        try:
+            last_seq = self.checkpoint_repo.get_last_seq(db, name)
+        finally:
+            db.close()
+        seq = last_seq
+
+        rejected = set()
+        if os.path.exists(self._rejected_path(name)):
+            with open(self._rejected_path(name), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rejected.add(json.loads(line)["seq"])
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+            seq = max([seq, *rejected])
+
+        log_path = self._log_path(name)
+        pending = []
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # çökme anında yarım kalmış son satır
+                    seq = max(seq, entry["seq"])
+                    if entry["seq"] > last_seq and entry["seq"] not in rejected:
+                        pending.append((entry["seq"], entry["answer"]))
+
+        for start in range(0, len(pending), self.batch_size):
+            if not self._write(pending[start:start + self.batch_size], name):
+                raise RuntimeError(f"Could not replay pending answers from {log_path}: {self._last_error}")
+        self._replayed += len(pending)
+        if pending:
+            print(f"🔁 Ingestion: replayed {len(pending)} answers from {log_path}")
+        # Tümü işlendi; kayıt dosyası sıfırdan başlar
+        if os.path.exists(log_path):
+            open(log_path, "w").close()
+        return seq
+
+    # --- KABUL ---
+    def submit(self, record: dict):
+        if not self.running:
+            raise IngestionOverloaded("Ingestion buffer is not running")
+        if not self._slots.acquire(timeout=self.enqueue_timeout):
+            self._overloaded += 1
+            raise IngestionOverloaded("Answer queue is full, try again shortly")
+        return self._enqueue(record)
+
+    async def submit_async(self, record: dict):
+        """Async rotalar için: yer varsa hemen kabul eder, kuyruk doluysa beklemeyi iş parçacığına bırakır"""
+        if self.running and self._slots.acquire(blocking=False):
+            return self._enqueue(record)
+        return await run_in_threadpool(self.submit, record)
+
+    def _enqueue(self, record: dict):
+        """Kuyrukta yer ayrılmış cevabı kayıt dosyasına ekler ve kuyruğa alır"""
+        answer = {**record, "solved_at": record["solved_at"].isoformat()}
+        with self._log_lock:
+            if self._log is None:
+                self._slots.release()
+                raise IngestionOverloaded("Ingestion buffer is not running")
+            self._seq += 1
+            seq = self._seq
+            self._log.write(json.dumps({"seq": seq, "answer": answer}) + "\n")
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            # Sıra numarası ile kuyruk sırası aynı kalsın diye kilit içinde
+            self._queue.put((seq, answer, time.monotonic()))
+            self._accepted += 1
+        return seq
+
+    # --- YAZICI ---
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            # İlk cevap flush_interval kadar bekledikten sonra veya batch dolunca yazılır
+            deadline = item[2] + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    # Kapanış: bu batch yazılır ve döngü biter
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush([(seq, answer) for seq, answer, _ in batch])
+            for _ in batch:
+                self._slots.release()
+
+        # _STOP'tan sonra kuyrukta kalan olmaz (submit durduruldu) ama yine de boşaltılır
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append((item[0], item[1]))
+                self._slots.release()
+        for start in range(0, len(leftover), self.batch_size):
+            self._flush(leftover[start:start + self.batch_size])
+
+    def _flush(self, batch):
+        if self._abandoned:
+            return
+        start = time.perf_counter()
+        if not self._write(batch):
+            # Kapanışta veritabanına ulaşılamadı: kalanlar kayıt dosyasında bir sonraki açılışa kalır
+            self._abandoned = True
+            print(f"⚠️ Ingestion: database unavailable, pending answers kept in {self.log_path}")
+            return
+        self._latencies.append((time.perf_counter() - start) * 1000)
+        self._batch_sizes.append(len(batch))
+        self._max_batch = max(self._max_batch, len(batch))
+
+        with self._log_lock:
+            # Yazılmamış kayıt kalmadıysa kayıt dosyası kısaltılır (büyümesin)
+            if self._log is not None and batch[-1][0] == self._seq:
+                self._log.truncate(0)
+                self._log.seek(0)
+
+    def _write(self, batch, name: str = None, shutdown_retries: int = 3):
+        """
+        Batch'i tek transaction'da yazar. Geçici hatalarda (bağlantı, deadlock) artan aralıklarla en fazla
+        max_retries kez dener, sonra batch'i reddedilenler dosyasına taşır (yazıcı takılı kalmaz);
+        veri hatasında (örn. silinmiş soru) kayıtları tek tek yazıp bozuk olanı ayıklar.
+        False: kapanış sırasında yazılamadı.
+        """
+        name = name or self.name
+        last_seq = batch[-1][0]
+        records = [self._to_record(answer) for _, answer in batch]
+
+        attempt = 0
+        while True:
+            db = self.session_factory()
+            try:
+                self.persist(db, records, before_commit=lambda s: self.checkpoint_repo.save_checkpoint(s, name, last_seq))
+                self._written += len(records)
+                self._batches += 1
+                return True
+            except (IntegrityError, DataError, KeyError) as e:
+                db.rollback()
+                self._last_error = str(e)
+                break
+            except Exception as e:
+                db.rollback()
+                self._last_error = str(e)
+                attempt += 1
+                if not self.running and attempt >= shutdown_retries:
+                    return False
+                if attempt >= self.max_retries:
+                    self._failed_batches += 1
+                    for seq, answer in batch:
+                        self._reject(seq, answer, e, name)
+                    self._save_checkpoint(name, last_seq)
+                    return True
+                time.sleep(min(0.05 * 2 ** attempt, MAX_BACKOFF_SECONDS))
+            finally:
+                db.close()
+
+        self._failed_batches += 1
+        for seq, answer in batch:
+            db = self.session_factory()
+            try:
+                self.persist(db, [self._to_record(answer)],
+                             before_commit=lambda s, seq=seq: self.checkpoint_repo.save_checkpoint(s, name, seq))
+                self._written += 1
+            except Exception as e:
+                db.rollback()
+                self._reject(seq, answer, e, name)
+            finally:
+                db.close()
+
+        # Son kayıt ayıklandıysa checkpoint ayrıca ilerletilir
+        self._save_checkpoint(name, last_seq)
+        self._batches += 1
+        return True
+
+    def _save_checkpoint(self, name: str, last_seq: int):
+        """
+        Reddedilen kayıtlardan sonra checkpoint'i ilerletir. Yazılamazsa sorun olmaz:
+        reddedilenler dosyasındaki sıra numaraları tekrar oynatmada atlanır.
+        """
+        db = self.session_factory()
+        try:
+            self.checkpoint_repo.save_checkpoint(db, name, last_seq)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self._last_error = str(e)
+        finally:
+            db.close()
+
+    def _reject(self, seq, answer, error, name: str = None):
+        self._rejected += 1
+        error = f"{type(error).__name__}: {error}"
+        self._last_error = error
+        print(f"❌ Ingestion: answer {seq} rejected: {error}")
+        with open(self._rejected_path(name or self.name), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": seq, "answer": answer, "error": error}) + "\n")
+
+    @staticmethod
+    def _to_record(answer: dict):
+        return {**answer, "solved_at": datetime.fromisoformat(answer["solved_at"])}
+
+    # --- METRİKLER ---
+    def stats(self):
+        latencies = sorted(self._latencies)
+        sizes = list(self._batch_sizes)
+        return {
+            "mode": "buffered" if self.running else "stopped",
+            "slot": self.name,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.max_queue,
+            "accepted": self._accepted,
+            "written": self._written,
+            "batches": self._batches,
+            "avg_batch_size": round(sum(sizes) / len(sizes), 1) if sizes else 0,
+            "max_batch_size": self._max_batch,
+            "flush_latency_ms": {
+                "last": round(self._latencies[-1], 2) if latencies else None,
+                "p50": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+            "overloaded": self._overloaded,
+            "failed_batches": self._failed_batches,
+            "rejected": self._rejected,
+            "replayed": self._replayed,
+            "last_error": self._last_error,
+        }
+
+
+answer_buffer = AnswerIngestionBuffer(HistoryService().persist_answers)
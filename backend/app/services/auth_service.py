@@ -1,12 +1,18 @@
 from sqlalchemy.orm import Session
-from app.repositories.user_repository import UserRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.user_repository import UserRepository, AsyncUserRepository
 from app.models.user import User
 from app.core.security import hash_password, verify_password
+from app.core.password_hashing import password_hasher
 from app.core.jwt import create_access_token
+from app.core.cache import result_cache
+from app.services.ability_service import AbilityService
 
 class AuthService:
     def __init__(self):
         self.user_repository = UserRepository()
+        self.async_user_repository = AsyncUserRepository()
+        self.ability_service = AbilityService()
 
     # ======================
     # REGISTER (password hashed)
@@ -37,6 +43,41 @@ class AuthService:
         if not verify_password(password, user.hashed_password):
             return None
 
+        return self._token_response(user)
+
+    # ======================
+    # REGISTER / LOGIN (async rotalar: bcrypt süreç havuzunda)
+    # ======================
+    async def register_async(self, db: AsyncSession, username, email, password, role):
+        # Havuz doluysa PasswordHashingOverloaded (503) yükselir, kayıt oluşturulmaz
+        user = User(
+            username=username,
+            email=email,
+            hashed_password=await password_hasher.hash(password),
+            role=role,
+            is_placement_completed=False,
+            current_level=1
+        )
+        return await self.async_user_repository.create(db, user)
+
+    async def login_async(self, db: AsyncSession, email: str, password: str):
+        user = await self.async_user_repository.get_by_email(db, email)
+
+        if not user:
+            return None
+
+        ok, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+        if not ok:
+            return None
+
+        # BCRYPT_ROUNDS değiştiyse parola doğrulanmışken yeni cost ile saklanır
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+
+        return self._token_response(user)
+
+    def _token_response(self, user: User):
         access_token = create_access_token(
             data={
                 "sub": user.email,
@@ -53,12 +94,13 @@ class AuthService:
     # ======================
     # UPDATE PLACEMENT STATUS
     # ======================
-    def update_placement_status(self, db: Session, user_id: int, level: int):
-        """Updates the student's level and marks the diagnostic test as completed."""
+    def update_placement_status(self, db: Session, user_id: int, score: int, total: int):
+        """Sets the starting ability from the placement score and marks the diagnostic test as completed."""
         user = db.query(User).filter(User.id == user_id).first()
         if user:
             user.is_placement_completed = True
-            user.current_level = level
+            user.current_level = self.ability_service.apply_placement(db, user_id, score, total)
             db.commit()
             db.refresh(user)
-        return user
\ No newline at end of file
+            result_cache.invalidate_user(user_id, identity=True)
+        return user
@@ -0,0 +1,131 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.questions import Question
+from app.services.question_index import question_index
+from app.services.catalogue_cache import catalogue_cache
+from app.services.question_parser import QuestionStreamParser
+
+
+class GenerationBatch:
+    def __init__(self, lesson_id: int, topic: str, difficulty_level: int, count: int):
+        self.lesson_id = lesson_id
+        self.topic = topic
+        self.difficulty_level = difficulty_level
+        self.count = count
+
+
+class BulkGenerationService:
+    """
+    Çok sayıda ders için soru üretimini batch'lere böler, sınırlı eşzamanlılıkla çalıştırır
+    ve her batch bittiğinde sonucu (üretilen + kaydedilen sorular) sırayla verir.
+    """
+
+    def __init__(self, job_queue, session_factory=SessionLocal, concurrency: int = None, max_in_flight: int = None):
+        self.job_queue = job_queue  # sağlayıcı ve sağlayıcı limitleri tek yerden gelir
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.BULK_GENERATION_CONCURRENCY
+        self.max_in_flight = max_in_flight or settings.BULK_GENERATION_MAX_IN_FLIGHT
+
+    @staticmethod
+    def plan_batches(lessons, counts: dict, batch_size: int):
+        """lessons: (id, başlık) listesi, counts: {zorluk: ders başına adet}"""
+        batches = []
+        for lesson_id, title in lessons:
+            for level, total in sorted(counts.items()):
+                remaining = total
+                while remaining > 0:
+                    size = min(batch_size, remaining)
+                    batches.append(GenerationBatch(lesson_id, title, level, size))
+                    remaining -= size
+        return batches
+
+    def _run_batch(self, batch: GenerationBatch):
+        provider = self.job_queue.provider
+        start = time.perf_counter()
+        parser = QuestionStreamParser(lesson_id=batch.lesson_id, difficulty_level=batch.difficulty_level)
+        inserted = 0
+
+        db = self.session_factory()
+        try:
+            with self.job_queue.provider_slot(provider.provider_name):
+                questions = provider.stream_questions(
+                    topic=batch.topic,
+                    difficulty=f"level {batch.difficulty_level} of 5",
+                    count=batch.count,
+                    parser=parser
+                )
+                # Model cevabı bitmeden, doğrulanan sorular geldikçe kaydedilir
+                for group in questions:
+                    db.execute(insert(Question), group)
+                    db.commit()
+                    question_index.refresh_lesson(db, batch.lesson_id)
+                    catalogue_cache.lesson_questions_changed(batch.lesson_id)
+                    inserted += len(group)
+        finally:
+            db.close()
+
+        return {
+            "type": "batch",
+            "lesson_id": batch.lesson_id,
+            "difficulty_level": batch.difficulty_level,
+            "requested": batch.count,
+            "inserted": inserted,
+            "rejected": parser.rejected,
+            "questions": parser.accepted,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def stream(self, batches):
+        """
+        Batch sonuçlarını bittikleri sırayla üretir.
+        Aynı anda en fazla max_in_flight batch kuyruğa alınır; istemci okumayı bırakırsa
+        yeni batch gönderilmez (backpressure).
+        """
+        total_inserted = 0
+        failed = 0
+        pending = set()
+        batch_iter = iter(batches)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-gen") as executor:
+            def fill():
+                while len(pending) < self.max_in_flight:
+                    batch = next(batch_iter, None)
+                    if batch is None:
+                        return
+                    future = executor.submit(self._run_batch, batch)
+                    future.batch = batch
+                    pending.add(future)
+
+            try:
+                fill()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.discard(future)
+                        try:
+                            result = future.result()
+                            total_inserted += result["inserted"]
+                        except Exception as e:
+                            failed += 1
+                            result = {
+                                "type": "error",
+                                "lesson_id": future.batch.lesson_id,
+                                "difficulty_level": future.batch.difficulty_level,
+                                "error": str(e),
+                            }
+                        yield result
+                    fill()
+            finally:
+                # İstemci bağlantıyı kapatırsa henüz başlamamış batch'ler iptal edilir
+                for future in pending:
+                    future.cancel()
+
+        yield {
+            "type": "summary",
+            "batches": len(batches),
+            "failed_batches": failed,
+            "inserted": total_inserted,
+        }
@@ -0,0 +1,189 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List
+from pydantic import TypeAdapter
+from starlette.responses import Response
+from app.core.config import settings
+
+# Önbellekteki sayfaların türü; değişiklikler sadece aynı türdeki sayfaları etkiler
+LESSON = "lesson"
+QUESTION = "question"
+# Cursor verilip limit verilmezse sayfa boyu. İkisi de verilmezse eski istemciler için tüm liste döner
+DEFAULT_PAGE_LIMIT = 100
+
+
+def page_limit(after: int, limit: int):
+    """Eski rotalar (limit ve cursor yok): None, yani sınırsız tek sayfa"""
+    if limit is None and after is not None:
+        return DEFAULT_PAGE_LIMIT
+    return limit
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema):
+    return TypeAdapter(List[schema])
+
+
+class CatalogueEntry:
+    """
+    Serileştirilmiş JSON cevabı ve içerikten üretilen ETag (tüm worker'larda aynı).
+    Sayfa (after, last_id] id aralığını kapsar; has_more=False ise son sayfadır.
+    """
+    __slots__ = ("body", "etag", "kind", "after", "last_id", "has_more", "loaded_at")
+
+    def __init__(self, body: bytes, kind: str, after: int, last_id: int, has_more: bool):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.kind = kind
+        self.after = after
+        self.last_id = last_id
+        self.has_more = has_more
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def page(cls, kind: str, schema, rows, after: int, limit: int):
+        """
+        rows: limit + 1 satır okunmuş keyset sorgusu (fazlası sonraki sayfa olduğunu gösterir).
+        limit None: sınırsız sorgu, tek (son) sayfa.
+        """
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit]
+        adapter = _list_adapter(schema)
+        body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        after = after or 0
+        return cls(body, kind, after, rows[-1].id if rows else after, has_more)
+
+    @classmethod
+    def item(cls, kind: str, schema, obj):
+        """Tek kayıt (detay); sadece kendi id'sini kapsar"""
+        body = schema.model_validate(obj).model_dump_json().encode()
+        return cls(body, kind, obj.id - 1, obj.id, True)
+
+    @property
+    def next_cursor(self):
+        return self.last_id if self.has_more else None
+
+    def covers(self, item_id: int) -> bool:
+        """Bu id'deki değişiklik sayfanın içeriğini etkileyebilir mi (yeni id'ler son sayfaya düşer)"""
+        return self.after < item_id and (item_id <= self.last_id or not self.has_more)
+
+
+class CatalogueCache:
+    """
+    Ders ve soru listeleri / detayları için hazır cevap önbelleği.
+
+    Her sayfa (filtre + cursor + limit) ilk istekte veritabanından okunup bir kez serileştirilir;
+    sonraki istekler aynı baytları ve ETag'i alır, If-None-Match eşleşirse gövdesiz 304 döner.
+    Öğretmen değişiklikleri (ekleme / güncelleme / silme, AI üretimi) servislerden çağrılan
+    *_changed / *_deleted metotlarıyla sadece değişen id'yi kapsayan sayfaları düşürür.
+    Her değişiklik version'ı artırır; değişiklikle yarışan bir yükleme eski veriyi saklamaz.
+    Değişiklikler sadece bu süreçte görünür; birden fazla worker için TTL gecikmeyi sınırlar.
+    """
+
+    def __init__(self, enabled: bool = True, ttl: int = 300, max_entries: int = 2048):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries = OrderedDict()  # anahtar -> CatalogueEntry (LRU)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    # --- OKUMA ---
+    async def get(self, key: str, load):
+        """load: CatalogueEntry (veya kayıt yoksa None) dönen async fonksiyon"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.enabled and time.monotonic() - entry.loaded_at < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            version = self.version
+
+        entry = await load()
+        with self._lock:
+            self.loads += 1
+            if entry is not None and self.enabled and self.version == version:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return entry
+
+    # --- DEĞİŞİKLİKLER (commit sonrası servislerden çağrılır) ---
+    def lesson_changed(self, lesson):
+        """Ders eklendi veya güncellendi"""
+        self._invalidate(LESSON, lambda e: e.covers(lesson.id))
+
+    def lesson_deleted(self, lesson_id: int):
+        """Ders silindi; soruları da cascade ile silindiği için tüm soru sayfaları düşer"""
+        self._invalidate(LESSON, lambda e: e.covers(lesson_id))
+        self._invalidate(QUESTION, lambda e: True)
+
+    def question_changed(self, question):
+        """Soru eklendi veya güncellendi (başka derse taşınmış olabilir)"""
+        self._invalidate(QUESTION, lambda e: e.covers(question.id))
+
+    def question_deleted(self, question_id: int):
+        self._invalidate(QUESTION, lambda e: e.covers(question_id))
+
+    def lesson_questions_changed(self, lesson_id: int):
+        """Toplu ekleme sonrası (yeni id'ler bilinmiyor, hepsi mevcutlardan büyük): son sayfalar düşer"""
+        self._invalidate(QUESTION, lambda e: not e.has_more)
+
+    def _invalidate(self, kind: str, affected):
+        with self._lock:
+            self.version += 1
+            stale = [key for key, entry in self._entries.items() if entry.kind == kind and affected(entry)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    # --- HTTP ---
+    def to_response(self, entry: CatalogueEntry, if_none_match: str = None) -> Response:
+        """İstemcinin ETag'i güncelse gövdesiz 304, değilse hazır JSON baytları"""
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if entry.next_cursor is not None:
+            headers["X-Next-Cursor"] = str(entry.next_cursor)
+        if if_none_match and (if_none_match.strip() == "*" or entry.etag in
+                              (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "loads": self.loads,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+catalogue_cache = CatalogueCache(
+    enabled=settings.CATALOGUE_CACHE_ENABLED,
+    ttl=settings.CATALOGUE_CACHE_TTL_SECONDS,
+    max_entries=settings.CATALOGUE_CACHE_MAX_ENTRIES,
+)
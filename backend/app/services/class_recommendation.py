@@ -0,0 +1,113 @@
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.lessons import Lesson
+from app.repositories.history_repository import HistoryRepository
+from app.repositories.user_repository import UserRepository
+from app.services.recommendation_service import (
+    RecommendationService, WELCOME, REVIEW, SLOW_DOWN, REINFORCE, LEVEL_UP,
+    CRITICAL_RATE, MASTERY_RATE, FAST_ANSWER_SECONDS,
+)
+
+# Tek GROUP BY sorgusuna giren öğrenci sayısı
+CHUNK_SIZE = 500
+
+
+class ClassRecommendationService:
+    """
+    Bir sınıfın / seviyenin tüm öğrencileri için sonraki adım önerisi.
+    Öğrenciler parça parça (keyset) okunur; her parça için öğrenci x ders matrisi tek sorguyla
+    yüklenir, en zayıf ders ve koç kuralları NumPy ile tüm matris üzerinde seçilir.
+    Sonuçlar tek öğrencilik RecommendationService.build_recommendation ile aynıdır.
+    """
+
+    def __init__(self):
+        self.history_repo = HistoryRepository()
+        self.user_repo = UserRepository()
+
+    def iter_recommendations(self, db: Session, level: int = None, after_id: int = 0, limit: int = None,
+                             chunk_size: int = CHUNK_SIZE):
+        """Öğrenci id sırasıyla {"user_id", "username", ...öneri} sözlükleri üretir"""
+        titles = self._lesson_titles(db)
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            students = self.user_repo.get_students_page(db, after_id, size, level)
+            if not students:
+                return
+            user_ids = [user_id for user_id, _ in students]
+            rows = self.history_repo.get_lesson_matrix(db, user_ids)
+            for (user_id, username), recommendation in zip(students, self.recommend(user_ids, rows, titles)):
+                yield {"user_id": user_id, "username": username, **recommendation}
+            after_id = user_ids[-1]
+            if remaining is not None:
+                remaining -= len(students)
+            if len(students) < size:
+                return
+
+    @staticmethod
+    def _lesson_titles(db: Session):
+        return dict(db.query(Lesson.id, Lesson.title).all())
+
+    def recommend(self, user_ids, rows, titles: dict):
+        """
+        rows: get_lesson_matrix satırları. user_ids sırasıyla öneri listesi döner.
+        Aynı başlıklı dersler tek sütunda birleşir (öğrenci özetindeki gibi).
+        """
+        rules, weakest_titles, rates = self.choose(user_ids, rows, titles)
+        return [
+            RecommendationService.render(rule, title, rate)
+            for rule, title, rate in zip(rules, weakest_titles, rates)
+        ]
+
+    @staticmethod
+    def choose(user_ids, rows, titles: dict):
+        """(kural kodları, en zayıf ders başlıkları, başarı oranları) dizileri"""
+        n_users = len(user_ids)
+        title_names = list(dict.fromkeys(titles.values()))
+        title_index = {title: i for i, title in enumerate(title_names)}
+        rows = [row for row in rows if row[1] in titles]
+        if not rows:
+            return [WELCOME] * n_users, [None] * n_users, [0.0] * n_users
+
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        order = np.argsort(user_ids)
+        row_users, row_lessons, attempts, correct, time_spent, first_ids = (
+            np.asarray(column) for column in zip(*rows)
+        )
+        user_pos = order[np.searchsorted(user_ids, row_users.astype(np.int64), sorter=order)]
+        title_pos = np.asarray([title_index[titles[lesson_id]] for lesson_id in row_lessons.tolist()], dtype=np.int64)
+        n_titles = len(title_names)
+        flat = user_pos * n_titles + title_pos
+
+        # Öğrenci x ders başlığı matrisleri
+        size = n_users * n_titles
+        total = np.bincount(flat, weights=attempts.astype(np.float64), minlength=size).reshape(n_users, n_titles)
+        right = np.bincount(flat, weights=correct.astype(np.float64), minlength=size).reshape(n_users, n_titles)
+        first = np.full(size, np.inf)
+        np.minimum.at(first, flat, first_ids.astype(np.float64))
+        first = first.reshape(n_users, n_titles)
+
+        answered = total > 0
+        accuracy = np.full((n_users, n_titles), np.inf)
+        np.divide(right, total, out=accuracy, where=answered)
+        accuracy[answered] *= 100
+
+        # En zayıf ders; eşitlikte öğrencinin önce cevapladığı ders (özet sözlüğündeki sıra)
+        lowest = accuracy.min(axis=1, keepdims=True)
+        weakest = np.where(accuracy == lowest, first, np.inf).argmin(axis=1)
+        rate = accuracy[np.arange(n_users), weakest]
+
+        solved = total.sum(axis=1)
+        time_total = np.bincount(user_pos, weights=time_spent.astype(np.float64), minlength=n_users)
+        avg_time = np.divide(time_total, solved, out=np.zeros(n_users), where=solved > 0)
+
+        has_data = answered.any(axis=1)
+        rules = np.select(
+            [~has_data, rate < CRITICAL_RATE, (rate < MASTERY_RATE) & (avg_time < FAST_ANSWER_SECONDS),
+             rate < MASTERY_RATE],
+            [WELCOME, REVIEW, SLOW_DOWN, REINFORCE],
+            LEVEL_UP,
+        )
+        weakest_titles = [title_names[i] if ok else None for i, ok in zip(weakest.tolist(), has_data.tolist())]
+        rates = np.where(has_data, rate, 0.0)
+        return rules.tolist(), weakest_titles, rates.tolist()
@@ -0,0 +1,175 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.questions import Question
+from app.services.question_index import question_index
+from app.services.catalogue_cache import catalogue_cache
+
+# İş durumları
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class GenerationJob:
+    def __init__(self, lesson_id: int, topic: str, difficulty: str, count: int):
+        self.id = uuid.uuid4().hex
+        self.lesson_id = lesson_id
+        self.topic = topic
+        self.difficulty = difficulty
+        self.count = count
+        self.status = QUEUED
+        self.stage = "waiting for a worker"
+        self.progress = 0.0
+        self.provider = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def key(self):
+        # Aynı ders + zorluk için gelen istekler tek işte birleştirilir
+        return (self.lesson_id, self.difficulty)
+
+    @property
+    def is_active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "lesson_id": self.lesson_id,
+            "difficulty": self.difficulty,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 2),
+            "provider": self.provider,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class GenerationJobQueue:
+    """
+    AI soru üretimini arka planda çalıştıran sınırlı iş havuzu.
+    provider: generate_questions(topic, difficulty, count) ve provider_name sunan nesne (AIService gibi).
+    """
+
+    def __init__(self, provider=None, session_factory=SessionLocal,
+                 max_workers: int = None, provider_limits: dict = None, history_limit: int = None):
+        self._provider = provider
+        self.session_factory = session_factory
+        self.provider_limits = provider_limits if provider_limits is not None else settings.AI_PROVIDER_CONCURRENCY
+        self.history_limit = history_limit or settings.GENERATION_JOB_HISTORY
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.GENERATION_WORKERS,
+            thread_name_prefix="question-gen"
+        )
+        self._jobs = OrderedDict()  # job_id -> GenerationJob
+        self._active = {}           # (lesson_id, difficulty) -> job_id
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    @property
+    def provider(self):
+        # Verilmediyse uygulama genelindeki AIService kullanılır
+        if self._provider is None:
+            from app.services.ai_service import get_ai_service
+            self._provider = get_ai_service()
+        return self._provider
+
+    def provider_slot(self, name: str):
+        """Sağlayıcının eşzamanlılık limitini uygulayan semafor (toplu üretim de aynı limiti paylaşır)"""
+        with self._lock:
+            if name not in self._semaphores:
+                limit = self.provider_limits.get(name, self.provider_limits.get("default", 1))
+                self._semaphores[name] = threading.BoundedSemaphore(max(1, limit))
+            return self._semaphores[name]
+
+    def submit(self, lesson_id: int, topic: str, difficulty: str, count: int = 3):
+        """(iş, yeni_mi) döner; aynı ders + zorluk için bekleyen iş varsa o döner"""
+        with self._lock:
+            active_id = self._active.get((lesson_id, difficulty))
+            if active_id is not None:
+                return self._jobs[active_id], False
+
+            job = GenerationJob(lesson_id, topic, difficulty, count)
+            self._jobs[job.id] = job
+            self._active[job.key] = job.id
+            self._trim_finished()
+
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def _trim_finished(self):
+        # Bitmiş işlerin sadece son N tanesi saklanır
+        finished = [j_id for j_id, j in self._jobs.items() if not j.is_active]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: GenerationJob):
+        job.status = RUNNING
+        try:
+            provider = self.provider
+            job.provider = provider.provider_name
+
+            job.stage = "waiting for provider slot"
+            with self.provider_slot(job.provider):
+                job.stage = "generating"
+                job.progress = 0.1
+                generated = provider.generate_questions(topic=job.topic, difficulty=job.difficulty, count=job.count)
+
+            job.stage = "saving"
+            job.progress = 0.7
+            rows = [{
+                "lesson_id": job.lesson_id,
+                "content": q["content"],
+                "option_a": q["option_a"],
+                "option_b": q["option_b"],
+                "option_c": q["option_c"],
+                "option_d": q["option_d"],
+                "correct_answer": q["correct_answer"],
+                "difficulty_level": q.get("difficulty_level", 3),
+            } for q in generated]
+
+            db = self.session_factory()
+            try:
+                if rows:
+                    # Tek executemany INSERT (satır başına db.add yerine)
+                    db.execute(insert(Question), rows)
+                db.commit()
+                question_index.refresh_lesson(db, job.lesson_id)
+                catalogue_cache.lesson_questions_changed(job.lesson_id)
+            finally:
+                db.close()
+
+            job.result = {"count": len(rows), "questions": rows}
+            job.stage = "done"
+            job.progress = 1.0
+            job.status = COMPLETED
+        except Exception as e:
+            print(f"❌ Generation job {job.id} failed: {e}")
+            job.error = str(e)
+            job.stage = "failed"
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.key) == job.id:
+                    del self._active[job.key]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+generation_queue = GenerationJobQueue()
@@ -1,16 +1,30 @@
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from app.models.history import History
 from app.models.user import User
-from app.models.lessons import Lesson
-from app.models.questions import Question
-from app.repositories.history_repository import HistoryRepository
-from app.repositories.questions_repository import QuestionRepository
+from app.repositories.history_repository import HistoryRepository, AsyncHistoryRepository
+from app.repositories.questions_repository import QuestionRepository, AsyncQuestionRepository
+from app.repositories.progress_repository import ProgressRepository
+from app.repositories.snapshot_repository import SnapshotHistoryRepository
+from app.services.ability_service import AbilityService
+from app.services.trend_service import TrendService
+from app.services.item_stats_service import ItemStatsService
 from app.schemas.history import HistoryCreate
+from app.core.cache import result_cache
+from app.services.question_index import question_index, answered_questions
 
 class HistoryService:
     def __init__(self):
         self.history_repo = HistoryRepository()
         self.question_repo = QuestionRepository()
+        self.progress_repo = ProgressRepository()
+        self.ability_service = AbilityService()
+        self.trend_service = TrendService()
+        self.item_stats_service = ItemStatsService()
+        self.async_history_repo = AsyncHistoryRepository()
+        self.async_question_repo = AsyncQuestionRepository()
+        # Öğretmen raporları için canlı tablolar yerine okunabilen sütunsal anlık görüntü
+        self.snapshot_repo = SnapshotHistoryRepository()
 
     # --- 1. ÖĞRENCİ CEVAP KAYDI VE LEVEL MANTIĞI ---
     def submit_answer(self, db: Session, user_id: int, history_data: HistoryCreate):
@@ -20,44 +34,186 @@ class HistoryService:
             raise Exception("Question not found!")
 
         # Doğruluk kontrolü
-        is_correct = question.correct_answer.strip().upper() == history_data.given_answer.strip().upper()
+        is_correct = self._is_correct(question, history_data.given_answer)
 
-        # Kayıt oluştur
+        # Kayıt oluştur (zaman burada verilir; trend rollup'ı aynı güne / haftaya yazılır)
+        solved_at = datetime.now(timezone.utc)
         db_history = History(
             user_id=user_id,
             question_id=history_data.question_id,
             given_answer=history_data.given_answer,
             is_correct=is_correct,
-            time_spent_seconds=history_data.time_spent_seconds
+            time_spent_seconds=history_data.time_spent_seconds,
+            solved_at=solved_at
         )
-        self.history_repo.create(db, db_history)
+        self.history_repo.add(db, db_history)
 
-        # LEVEL HESAPLAMA (DÜŞME ÖZELLİKLİ)
-        total_correct = db.query(History).filter(History.user_id == user_id, History.is_correct == True).count()
-        total_wrong = db.query(History).filter(History.user_id == user_id, History.is_correct == False).count()
-
-        # Net Skor: Her 5 net doğru = 1 Level
-        net_score = total_correct - total_wrong
-        new_level = max(1, 1 + (net_score // 5))
+        # Sayaçlar aynı transaction içinde artırılır, COUNT(*) sorgusuna gerek kalmaz
+        self.progress_repo.apply_answers(
+            db, user_id,
+            correct=1 if is_correct else 0,
+            wrong=0 if is_correct else 1,
+            time_spent=history_data.time_spent_seconds
+        )
+        self.trend_service.record_answers(
+            db, user_id, [(question.lesson_id, solved_at, is_correct, history_data.time_spent_seconds)]
+        )
 
-        user = db.query(User).filter(User.id == user_id).first()
-        if user and user.current_level != new_level:
-            user.current_level = new_level
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+        # LEVEL HESAPLAMA: sorunun zorluğu, süre ve ders bazlı yetenek dikkate alınır (Elo/IRT)
+        new_level, difficulty = self.ability_service.record_answer(
+            db, user_id, question, is_correct, history_data.time_spent_seconds
+        )
+        # Madde istatistikleri (ayırt edicilik için öğrencinin güncel genel yeteneğiyle)
+        theta = self.ability_service.get_thetas(db, [user_id])[user_id]
+        self.item_stats_service.record_answers(db, [
+            (question.id, history_data.given_answer, is_correct, history_data.time_spent_seconds, theta)
+        ])
+        level_changed = self._apply_level(db, user_id, new_level)
+        db.commit()
+        db.refresh(db_history)
 
+        self._after_commit(user_id, {question.id: difficulty}, level_changed)
         return db_history
 
+    # --- 1.1 TOPLU CEVAP KAYDI (BİR QUIZ DENEMESİ, TEK TRANSACTION) ---
+    def submit_answers(self, db: Session, user_id: int, answers):
+        # Sorular tek IN sorgusuyla
+        questions = {q.id: q for q in self.question_repo.get_by_ids(db, {a.question_id for a in answers})}
+        missing = {a.question_id for a in answers} - set(questions)
+        if missing:
+            raise Exception(f"Questions not found: {sorted(missing)}")
+
+        # Aynı denemenin cevapları aynı zamanı taşır
+        solved_at = datetime.now(timezone.utc)
+        records = [self._grade(questions[a.question_id], user_id, a, solved_at) for a in answers]
+        new_level = self.persist_answers(db, records, questions)[user_id]
+
+        correct_count = sum(1 for r in records if r["is_correct"])
+        return {
+            "results": [{
+                "question_id": r["question_id"],
+                "given_answer": r["given_answer"],
+                "correct_answer": questions[r["question_id"]].correct_answer,
+                "is_correct": r["is_correct"],
+            } for r in records],
+            "correct_count": correct_count,
+            "total": len(records),
+            "new_level": new_level,
+        }
+
+    # --- 1.2 ARABELLEKLİ KAYIT (SINAV YOĞUNLUĞU) ---
+    def queue_answer(self, db: Session, user_id: int, history_data: HistoryCreate, buffer):
+        """Cevabı değerlendirip yazma arabelleğine bırakır; veritabanına yazma arka planda yapılır"""
+        question = self.question_repo.get_by_id(db, history_data.question_id)
+        if not question:
+            raise Exception("Question not found!")
+
+        record = self._grade(question, user_id, history_data, datetime.now(timezone.utc))
+        buffer.submit(record)
+        return {**record, "id": None, "queued": True}
+
+    async def queue_answer_async(self, db, user_id: int, history_data: HistoryCreate, buffer):
+        """queue_answer'ın async hali; kuyruk doluysa bekleme olay döngüsü dışında yapılır"""
+        question = await self.async_question_repo.get_by_id(db, history_data.question_id)
+        if not question:
+            raise Exception("Question not found!")
+
+        record = self._grade(question, user_id, history_data, datetime.now(timezone.utc))
+        await buffer.submit_async(record)
+        return {**record, "id": None, "queued": True}
+
+    def persist_answers(self, db: Session, records, questions: dict = None, before_commit=None):
+        """
+        Değerlendirilmiş cevapları (bir veya birden çok öğrenci) tek transaction ile yazar:
+        tek INSERT, öğrenci başına bir sayaç/yetenek/seviye güncellemesi, tek commit.
+        before_commit(db) aynı transaction içinde çalışır. {user_id: yeni seviye} döner.
+        """
+        if questions is None:
+            questions = {q.id: q for q in self.question_repo.get_by_ids(db, {r["question_id"] for r in records})}
+
+        self.history_repo.add_many(db, records)
+
+        by_user = {}
+        for record in records:
+            by_user.setdefault(record["user_id"], []).append(record)
+
+        levels = {}
+        difficulties = {}
+        level_changed = set()
+        for user_id in sorted(by_user):
+            answers = by_user[user_id]
+            correct_count = sum(1 for r in answers if r["is_correct"])
+            self.progress_repo.apply_answers(
+                db, user_id,
+                correct=correct_count,
+                wrong=len(answers) - correct_count,
+                time_spent=sum(r["time_spent_seconds"] for r in answers)
+            )
+            self.trend_service.record_answers(db, user_id, [
+                (questions[r["question_id"]].lesson_id, r["solved_at"], r["is_correct"], r["time_spent_seconds"])
+                for r in answers
+            ])
+            levels[user_id], difficulties[user_id] = self.ability_service.record_answers(
+                db, user_id, [(questions[r["question_id"]], r["is_correct"], r["time_spent_seconds"]) for r in answers]
+            )
+            if self._apply_level(db, user_id, levels[user_id]):
+                level_changed.add(user_id)
+
+        # Madde istatistikleri tüm öğrencilerden sonra tek seferde: satır kilitleri soru id sırasıyla alınır
+        thetas = self.ability_service.get_thetas(db, sorted(by_user))
+        self.item_stats_service.record_answers(db, [
+            (r["question_id"], r["given_answer"], r["is_correct"], r["time_spent_seconds"], thetas[r["user_id"]])
+            for r in records
+        ])
+
+        if before_commit is not None:
+            before_commit(db)
+        db.commit()
+
+        for user_id, user_difficulties in difficulties.items():
+            self._after_commit(user_id, user_difficulties, user_id in level_changed)
+        return levels
+
+    def _grade(self, question, user_id: int, answer, solved_at: datetime):
+        return {
+            "user_id": user_id,
+            "question_id": question.id,
+            "given_answer": answer.given_answer,
+            "is_correct": self._is_correct(question, answer.given_answer),
+            "time_spent_seconds": answer.time_spent_seconds,
+            "solved_at": solved_at,
+        }
+
+    @staticmethod
+    def _is_correct(question, given_answer: str) -> bool:
+        return question.correct_answer.strip().upper() == given_answer.strip().upper()
+
+    def _apply_level(self, db: Session, user_id: int, new_level: int) -> bool:
+        # User satırını tekrar okumadan, sadece seviye değiştiyse güncelle (değiştiyse True)
+        return db.query(User).filter(User.id == user_id, User.current_level != new_level).update(
+            {User.current_level: new_level}, synchronize_session=False
+        ) > 0
+
+    def _after_commit(self, user_id: int, difficulties: dict, level_changed: bool = False):
+        # Bu öğrencinin önbellekteki istatistik/özet/öneri sonuçları artık eski (seviye değiştiyse kimlik de)
+        result_cache.invalidate_user(user_id, identity=level_changed)
+        # Sıradaki soru seçimi için bellek içi indeksler
+        for question_id, difficulty in difficulties.items():
+            answered_questions.mark(user_id, question_id)
+            question_index.set_difficulty(question_id, difficulty)
+
     # --- 2. TEKİL ÖĞRENCİ İSTATİSTİKLERİ ---
     def get_user_stats(self, db: Session, user_id: int):
-        histories = self.history_repo.get_user_history(db, user_id)
-        
-        total_questions = len(histories)
+        return result_cache.get_or_compute(user_id, "stats", lambda: self._compute_user_stats(db, user_id))
+
+    def _compute_user_stats(self, db: Session, user_id: int):
+        # user_progress sayaçları her cevapla aynı transaction'da artırılır; geçmiş satırları okunmaz
+        progress = self.progress_repo.get_by_user(db, user_id)
+        total_questions = progress.total_count if progress else 0
         if total_questions == 0:
             return {"accuracy": 0, "total_correct": 0, "total_questions": 0}
 
-        correct_count = sum(1 for h in histories if h.is_correct)
+        correct_count = progress.correct_count
         accuracy = (correct_count / total_questions) * 100
         
         return {
@@ -67,79 +223,121 @@ class HistoryService:
         }
 
     # --- 3. ÖĞRENCİ DETAYLI ÖZET (AI İÇİN) ---
-    def get_user_summary(self, db: Session, user_id: int):
-        histories = self.history_repo.get_user_history(db, user_id)
+    def get_user_summary(self, db: Session, user_id: int, source: str = "live"):
+        if source == "snapshot":
+            # Görüntü kendi içinde önbellekli; canlı özet önbelleğine karışmaz
+            return self._summarize(self.snapshot_repo.get_lesson_breakdown(db, user_id))
+        return result_cache.get_or_compute(user_id, "summary", lambda: self._compute_user_summary(db, user_id))
+
+    async def get_user_summary_async(self, db, user_id: int):
+        async def compute():
+            return self._summarize(await self.async_history_repo.get_lesson_breakdown(db, user_id))
+        return await result_cache.aget_or_compute(user_id, "summary", compute)
+
+    def _compute_user_summary(self, db: Session, user_id: int):
+        return self._summarize(self.history_repo.get_lesson_breakdown(db, user_id))
+
+    def _summarize(self, breakdown_rows):
+        # Satır satır soru/ders yüklemek yerine ders bazında tek bir GROUP BY sorgusunun sonucu
         lesson_breakdown = {}
-        
-        for h in histories:
-            q = db.query(Question).filter(Question.id == h.question_id).first()
-            if q and q.lesson:
-                lesson_title = q.lesson.title
-                if lesson_title not in lesson_breakdown:
-                    lesson_breakdown[lesson_title] = {"correct": 0, "total": 0}
-                
-                lesson_breakdown[lesson_title]["total"] += 1
-                if h.is_correct:
-                    lesson_breakdown[lesson_title]["correct"] += 1
-        
+        total_solved = 0
+        total_time = 0
+
+        for _, lesson_title, total, correct, time_sum in breakdown_rows:
+            # Aynı başlıklı dersler eskiden olduğu gibi tek kalemde birleşir
+            if lesson_title not in lesson_breakdown:
+                lesson_breakdown[lesson_title] = {"correct": 0, "total": 0}
+            lesson_breakdown[lesson_title]["total"] += int(total or 0)
+            lesson_breakdown[lesson_title]["correct"] += int(correct or 0)
+            total_solved += int(total or 0)
+            total_time += int(time_sum or 0)
+
         final_breakdown = {}
         for title, data in lesson_breakdown.items():
             final_breakdown[title] = (data["correct"] / data["total"]) * 100 if data["total"] > 0 else 0
 
-        total_time = sum(h.time_spent_seconds for h in histories)
-        avg_time = total_time / len(histories) if histories else 0
+        avg_time = total_time / total_solved if total_solved else 0
 
         return {
             "lesson_breakdown": final_breakdown,
-            "total_stats": {"avg_time": avg_time, "total_solved": len(histories)}
+            "total_stats": {"avg_time": avg_time, "total_solved": total_solved}
         }
 
-    # --- 4. ÖĞRETMEN ANALİTİKLERİ (EKSİK OLAN KISIM BURASIYDI) ---
-    def get_class_analytics(self, db: Session):
-        # A. Öğrenci Listesi ve Performansları
-        students = db.query(User).filter(User.role == "student").all()
+    # --- 3.1 ÖĞRENME EĞİLİMİ (GÜN / HAFTA ROLLUP'LARI) ---
+    def get_user_trend(self, db: Session, user_id: int, period: str = "week", days: int = 365, lesson_id: int = None):
+        return self.trend_service.get_user_trend(db, user_id, period, days, lesson_id)
+
+    # --- 3.2 ADAPTİF ÖNERİ (SON DÖNEM EĞİLİMİYLE) ---
+    # --- 4. ÖĞRETMEN ANALİTİKLERİ (GROUP BY TABANLI) ---
+    def _analytics_repo(self, source: str):
+        return self.snapshot_repo if source == "snapshot" else self.history_repo
+
+    def get_class_analytics(self, db: Session, skip: int = 0, limit: int = None,
+                            sort_by: str = "id", order: str = "asc", source: str = "live"):
+        repo = self._analytics_repo(source)
+        # A. Öğrenci Listesi ve Performansları (tek GROUP BY user_id sorgusu, sayfalı)
+        student_rows = repo.get_student_aggregates(
+            db, skip=skip, limit=limit, sort_by=sort_by, descending=(order == "desc")
+        )
         student_performance = []
 
-        for s in students:
-            stats = self.get_user_stats(db, s.id)
+        for user_id, username, email, correct_count, total_questions in student_rows:
+            correct_count = int(correct_count or 0)
+            total_questions = int(total_questions or 0)
+            accuracy = round((correct_count / total_questions) * 100, 1) if total_questions else 0
             student_performance.append({
-                "id": s.id,
-                "username": s.username,
-                "email": s.email,
-                "accuracy": int(stats["accuracy"]),
-                "total_xp": stats["total_correct"] * 10,
-                "total_solved": stats["total_questions"]
+                "id": user_id,
+                "username": username,
+                "email": email,
+                "accuracy": int(accuracy),
+                "total_xp": correct_count * 10,
+                "total_solved": total_questions
             })
 
-        # B. Ders Bazlı Başarı Oranları
-        lessons = db.query(Lesson).all()
+        # B. Ders Bazlı Başarı Oranları (questions ⨝ histories, GROUP BY lesson_id)
         lesson_performance = []
-
-        for l in lessons:
-            # Bu derse ait tüm soruları bul
-            questions = db.query(Question).filter(Question.lesson_id == l.id).all()
-            q_ids = [q.id for q in questions]
-
-            if not q_ids:
-                pass_rate = 0
-            else:
-                # Bu sorulara verilmiş tüm cevapları bul
-                attempts = db.query(History).filter(History.question_id.in_(q_ids)).all()
-                if not attempts:
-                    pass_rate = 0
-                else:
-                    correct_count = sum(1 for a in attempts if a.is_correct)
-                    pass_rate = int((correct_count / len(attempts)) * 100)
-            
+        for lesson_id, title, question_count, attempts, correct_count in repo.get_lesson_aggregates(db):
+            attempts = int(attempts or 0)
+            pass_rate = int((int(correct_count or 0) / attempts) * 100) if attempts else 0
             lesson_performance.append({
-                "id": l.id,
-                "name": l.title,
+                "id": lesson_id,
+                "name": title,
                 "passRate": pass_rate,
-                "total_questions": len(q_ids)
+                "total_questions": int(question_count or 0)
             })
 
-        return {
+        report = {
             "students": student_performance,
             "lessons": lesson_performance,
-            "total_students": len(students)
-        }
\ No newline at end of file
+            "total_students": repo.count_students(db)
+        }
+        if source == "snapshot":
+            report["snapshot"] = self.snapshot_repo.info()
+        return report
+
+    def get_lesson_report(self, db: Session, lesson_id: int, source: str = "live"):
+        """Dersin soru bazlı cevap sayısı, doğruluk (%) ve ortalama süresi"""
+        repo = self._analytics_repo(source)
+        questions = []
+        total_attempts = total_correct = 0
+        for question_id, difficulty, attempts, correct, time_sum in repo.get_question_aggregates(db, lesson_id):
+            attempts, correct, time_sum = int(attempts or 0), int(correct or 0), int(time_sum or 0)
+            total_attempts += attempts
+            total_correct += correct
+            questions.append({
+                "id": question_id,
+                "difficulty_level": difficulty,
+                "attempts": attempts,
+                "accuracy": round(correct / attempts * 100, 1) if attempts else None,
+                "avg_time": round(time_sum / attempts, 1) if attempts else None,
+            })
+
+        report = {
+            "lesson_id": lesson_id,
+            "attempts": total_attempts,
+            "accuracy": round(total_correct / total_attempts * 100, 1) if total_attempts else None,
+            "questions": questions,
+        }
+        if source == "snapshot":
+            report["snapshot"] = self.snapshot_repo.info()
+        return report
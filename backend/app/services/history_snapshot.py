@@ -0,0 +1,329 @@
+"""
+Analitik için histories / questions / lessons / users tablolarının sütunsal (NumPy) anlık görüntüsü.
+
+Yerleşim (ANALYTICS_SNAPSHOT_DIR):
+  manifest.json                      -> geçerli dosyalar, son aktarılan history id, satır sayıları
+  histories/<nesil>-<sıra>/<sütun>.npy -> cevap parçaları (sıkıştırılmamış, mmap ile okunur)
+                                        parça bir id aralığını kapsar, satırları (user_id, id) sıralıdır
+  dimensions-<no>.npz                -> küçük tablolar (sıkıştırılmış, her aktarımda yeniden yazılır)
+
+Aktarım sunucu taraflı imleçle parça parça okur; bellekte en fazla bir parça tutulur.
+Artımlı aktarım sadece manifestteki last_history_id'den büyük id'leri ekler. Manifest en son,
+atomik olarak değiştirilir; okuyucular her zaman tutarlı bir görüntü görür.
+Artımlı aktarımlar küçük parçalar biriktirir; küçük (CHUNK_ROWS'tan az satırlı) parça sayısı
+ANALYTICS_SNAPSHOT_MAX_SEGMENTS'i aşınca ardışık küçük parçalar (veritabanına gitmeden) birleştirilir.
+
+Not: id'si watermark'tan küçük olup aktarımdan sonra commit edilen (uzun süren) bir transaction'ın
+satırları artımlı aktarımda atlanır; full=True ile tam aktarım bunları da toplar.
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.history import History
+from app.models.questions import Question
+from app.models.lessons import Lesson
+from app.models.user import User
+
+FORMAT_VERSION = 2
+MANIFEST = "manifest.json"
+
+# Cevap sütunları ve tipleri (solved_at: UTC epoch saniyesi)
+HISTORY_COLUMNS = {
+    "id": np.int64,
+    "user_id": np.int32,
+    "question_id": np.int32,
+    "is_correct": np.bool_,
+    "time_spent_seconds": np.int32,
+    "solved_at": np.int64,
+}
+
+
+class SnapshotUnavailable(Exception):
+    """Henüz anlık görüntü alınmamış (scripts/export_snapshot.py çalıştırılmalı)"""
+
+
+def _epoch(value):
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def read_manifest(directory: str):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(directory: str, manifest: dict):
+    tmp = os.path.join(directory, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+
+
+class HistorySnapshotExporter:
+    def __init__(self, directory: str = None, chunk_size: int = None, max_segments: int = None):
+        self.directory = directory or settings.ANALYTICS_SNAPSHOT_DIR
+        self.chunk_size = chunk_size or settings.ANALYTICS_SNAPSHOT_CHUNK_ROWS
+        self.max_segments = max_segments or settings.ANALYTICS_SNAPSHOT_MAX_SEGMENTS
+
+    def export(self, db: Session, full: bool = False):
+        """
+        Yeni cevapları (full=True ise tüm tabloyu) ekler; {"appended", "rows", "segments", "compacted", ...} döner
+        """
+        os.makedirs(os.path.join(self.directory, "histories"), exist_ok=True)
+        previous = read_manifest(self.directory)
+        if previous is not None and previous.get("format") != FORMAT_VERSION:
+            full = True
+
+        if full or previous is None:
+            generation = (previous or {}).get("generation", 0) + 1
+            segments, last_id = [], 0
+        else:
+            generation = previous["generation"]
+            segments, last_id = list(previous["segments"]), previous["last_history_id"]
+
+        appended = 0
+        for partition in self._stream_histories(db, last_id):
+            name = f"{generation:04d}-{len(segments) + 1:06d}"
+            segments.append(self._write_segment(name, self._to_columns(partition)))
+            last_id = segments[-1]["last_id"]
+            appended += len(partition)
+
+        compacted = sum(1 for s in segments if s["rows"] < self.chunk_size) > self.max_segments
+        if compacted:
+            generation += 1
+            segments = self._compact(segments, generation)
+
+        export_no = (previous or {}).get("export_no", 0) + 1
+        dimensions = f"dimensions-{export_no:06d}.npz"
+        self._write_dimensions(db, dimensions)
+
+        manifest = {
+            "format": FORMAT_VERSION,
+            "generation": generation,
+            "export_no": export_no,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "last_history_id": last_id,
+            "rows": sum(s["rows"] for s in segments),
+            "segments": segments,
+            "dimensions": dimensions,
+        }
+        _write_manifest(self.directory, manifest)
+        self._remove_unreferenced(manifest)
+        return {"appended": appended, "rows": manifest["rows"], "segments": len(segments),
+                "last_history_id": last_id, "full": full or previous is None, "compacted": compacted}
+
+    def _stream_histories(self, db: Session, after_id: int):
+        stmt = (
+            select(History.id, History.user_id, History.question_id, History.is_correct,
+                   History.time_spent_seconds, History.solved_at)
+            .where(History.id > after_id)
+            .order_by(History.id)
+        )
+        result = db.connection().execution_options(stream_results=True, yield_per=self.chunk_size).execute(stmt)
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+    @staticmethod
+    def _to_columns(rows):
+        ids, user_ids, question_ids, correct, time_spent, solved_at = zip(*rows)
+        columns = {
+            "id": ids,
+            "user_id": user_ids,
+            "question_id": question_ids,
+            "is_correct": [bool(c) for c in correct],
+            "time_spent_seconds": [t or 0 for t in time_spent],
+            "solved_at": [_epoch(s) for s in solved_at],
+        }
+        return {column: np.asarray(columns[column], dtype=dtype) for column, dtype in HISTORY_COLUMNS.items()}
+
+    def _write_segment(self, name: str, columns: dict):
+        """columns: HISTORY_COLUMNS dizileri (id sıralı). Manifest kaydını döner"""
+        ids = columns["id"]
+        record = {"name": name, "rows": len(ids), "first_id": int(ids[0]), "last_id": int(ids[-1])}
+        # Satırlar (user_id, id) sırasıyla yazılır: öğrenci bazlı okumalar (özet) parçayı taramaz,
+        # user_id üzerinde ikili arama yapıp bitişik bir dilim okur
+        order = np.lexsort((ids, columns["user_id"]))
+        # Önce geçici klasöre yazılır; yarım kalan parça manifestte hiç görünmez
+        final = os.path.join(self.directory, "histories", name)
+        tmp = final + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for column in HISTORY_COLUMNS:
+            np.save(os.path.join(tmp, f"{column}.npy"), columns[column][order])
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+        return record
+
+    def _compact(self, segments, generation: int):
+        """
+        Ardışık küçük parçaları (id sırası korunarak) chunk_size satırlık yeni parçalara böler; her ardışık
+        grubun sonunda en fazla bir küçük parça kalır, dolu parçalar olduğu gibi kalır.
+        Bellekte en fazla iki parça boyu satır tutulur; eski parçalar manifest değişince silinir.
+        """
+        compacted, run = [], []
+
+        def load(segment):
+            # Parça içi (user_id, id) sırası id sırasına çevrilir; ardışık parçaların id aralıkları ardışıktır
+            path = os.path.join(self.directory, "histories", segment["name"])
+            columns = {column: np.load(os.path.join(path, f"{column}.npy")) for column in HISTORY_COLUMNS}
+            order = np.argsort(columns["id"])
+            return {column: values[order] for column, values in columns.items()}
+
+        def write(columns):
+            name = f"{generation:04d}-{len(compacted) + 1:06d}"
+            compacted.append(self._write_segment(name, columns))
+
+        def flush():
+            if len(run) == 1:
+                # Birleşecek komşusu olmayan parça yeniden yazılmaz
+                compacted.append(run[0])
+            elif run:
+                buffered = None
+                for segment in run:
+                    columns = load(segment)
+                    buffered = columns if buffered is None else {
+                        column: np.concatenate([buffered[column], columns[column]]) for column in HISTORY_COLUMNS
+                    }
+                    while len(buffered["id"]) >= self.chunk_size:
+                        write({column: values[:self.chunk_size] for column, values in buffered.items()})
+                        buffered = {column: values[self.chunk_size:] for column, values in buffered.items()}
+                if len(buffered["id"]):
+                    write(buffered)
+            run.clear()
+
+        for segment in segments:
+            if segment["rows"] < self.chunk_size:
+                run.append(segment)
+            else:
+                flush()
+                compacted.append(segment)
+        flush()
+        return compacted
+
+    def _write_dimensions(self, db: Session, name: str):
+        users = db.execute(select(User.id, User.username, User.email, User.role).order_by(User.id)).all()
+        questions = db.execute(select(Question.id, Question.lesson_id, Question.difficulty_level)
+                               .order_by(Question.id)).all()
+        lessons = db.execute(select(Lesson.id, Lesson.title).order_by(Lesson.id)).all()
+
+        def column(rows, index, dtype):
+            return np.asarray([row[index] for row in rows], dtype=dtype)
+
+        np.savez_compressed(
+            os.path.join(self.directory, name),
+            user_id=column(users, 0, np.int32),
+            user_username=column(users, 1, str),
+            user_email=column(users, 2, str),
+            user_role=column(users, 3, str),
+            question_id=column(questions, 0, np.int32),
+            question_lesson_id=column(questions, 1, np.int32),
+            question_difficulty=np.asarray([row[2] or 1 for row in questions], dtype=np.int8),
+            lesson_id=column(lessons, 0, np.int32),
+            lesson_title=np.asarray([row[1] or "" for row in lessons], dtype=str),
+        )
+
+    def _remove_unreferenced(self, manifest: dict):
+        """Önceki nesil parçalar ve eski boyut dosyaları (açık mmap'ler Linux'ta geçerli kalır)"""
+        keep = {s["name"] for s in manifest["segments"]}
+        histories = os.path.join(self.directory, "histories")
+        for name in os.listdir(histories):
+            if name not in keep:
+                shutil.rmtree(os.path.join(histories, name), ignore_errors=True)
+        for name in os.listdir(self.directory):
+            if name.startswith("dimensions-") and name != manifest["dimensions"]:
+                os.remove(os.path.join(self.directory, name))
+
+
+class LoadedSnapshot:
+    """Bir manifestin okunmuş hali: cevap parçaları mmap, boyut tabloları bellekte"""
+
+    def __init__(self, directory: str, manifest: dict):
+        self.manifest = manifest
+        self.segments = [
+            {column: np.load(os.path.join(directory, "histories", s["name"], f"{column}.npy"), mmap_mode="r")
+             for column in HISTORY_COLUMNS}
+            for s in manifest["segments"] if s["rows"]
+        ]
+        with np.load(os.path.join(directory, manifest["dimensions"])) as dims:
+            self.dims = {key: dims[key] for key in dims.files}
+        self._memo = {}
+
+    @property
+    def rows(self):
+        return self.manifest["rows"]
+
+    def memo(self, key: str, compute):
+        """Görüntü değişmez; tablo geneli toplamlar bir kez hesaplanır"""
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def columns(self, *names):
+        """Parça parça (mmap) sütun demetleri; raporlar parçalar üzerinde birikimli hesaplanır"""
+        for segment in self.segments:
+            yield tuple(segment[name] for name in names)
+
+    def user_columns(self, user_id: int, *names):
+        """
+        Parça parça sadece öğrencinin satırları (id sırasıyla). Parça user_id sıralı olduğundan ikili arama
+        ile bulunan bitişik dilimdir; mmap'ten yalnızca bu sayfalar okunur.
+        """
+        for segment in self.segments:
+            user_ids = segment["user_id"]
+            start = int(np.searchsorted(user_ids, user_id, side="left"))
+            end = int(np.searchsorted(user_ids, user_id, side="right"))
+            if start < end:
+                yield tuple(segment[name][start:end] for name in names)
+
+
+class HistorySnapshot:
+    """Manifest değiştiğinde (yeni aktarım) görüntüyü yeniden yükleyen okuyucu"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or settings.ANALYTICS_SNAPSHOT_DIR
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._mtime = None
+
+    def get(self) -> LoadedSnapshot:
+        path = os.path.join(self.directory, MANIFEST)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise SnapshotUnavailable("Analytics snapshot not found; run scripts/export_snapshot.py")
+        with self._lock:
+            if self._loaded is None or mtime != self._mtime:
+                manifest = read_manifest(self.directory)
+                self._loaded = LoadedSnapshot(self.directory, manifest)
+                self._mtime = mtime
+            return self._loaded
+
+    def status(self):
+        manifest = read_manifest(self.directory)
+        if manifest is None:
+            return {"available": False, "directory": self.directory}
+        return {
+            "available": True,
+            "directory": self.directory,
+            "exported_at": manifest["exported_at"],
+            "last_history_id": manifest["last_history_id"],
+            "rows": manifest["rows"],
+            "segments": len(manifest["segments"]),
+        }
+
+
+history_snapshot = HistorySnapshot()
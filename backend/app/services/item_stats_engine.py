@@ -0,0 +1,120 @@
+"""
+Soru bazlı madde istatistikleri için çevrimiçi (akış) algoritmalar; cevap başına O(1), saf Python.
+
+  Süre ortalaması / varyansı : Welford yürüyen momentleri (sayı, ortalama, M2)
+  Süre yüzdelikleri          : P² (Jain & Chlamtac) — yüzdelik başına 5 işaretçi, örnek saklanmaz
+  Ayırt edicilik             : nokta-çift serili korelasyon (doğru/yanlış ile öğrencinin genel
+                               yeteneği); sadece toplamlar tutulur
+
+Durumlar JSON'a yazılabilen sade listeler / sözlüklerdir (question_item_stats satırında saklanır).
+"""
+import math
+
+# Takip edilen süre yüzdelikleri
+QUANTILES = (0.5, 0.9)
+OPTIONS = ("A", "B", "C", "D")
+
+
+# --- WELFORD ---
+def welford_update(count: int, mean: float, m2: float, value: float):
+    """count: bu değer DAHİL gözlem sayısı; (yeni ortalama, yeni M2) döner"""
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    return mean, m2
+
+
+def std_dev(count: int, m2: float):
+    return math.sqrt(m2 / (count - 1)) if count > 1 else None
+
+
+# --- P² YÜZDELİK TAHMİNİ ---
+def p2_update(state: dict, value: float, p: float) -> dict:
+    """
+    state: {"q": işaretçi yükseklikleri, "n": işaretçi konumları}. İlk 5 gözlemde q sıralı örneklerdir.
+    Yeni durum döner (girdi değiştirilmez).
+    """
+    q = list(state["q"]) if state else []
+    n = list(state["n"]) if state else []
+    if len(q) < 5:
+        q.append(float(value))
+        q.sort()
+        return {"q": q, "n": [1, 2, 3, 4, 5] if len(q) == 5 else []}
+
+    if value < q[0]:
+        q[0] = float(value)
+        k = 0
+    elif value >= q[4]:
+        q[4] = float(value)
+        k = 3
+    else:
+        k = max(i for i in range(4) if q[i] <= value)
+    for i in range(k + 1, 5):
+        n[i] += 1
+
+    count = n[4]
+    increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+    for i in (1, 2, 3):
+        desired = 1 + (count - 1) * increments[i]
+        d = desired - n[i]
+        if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+            d = 1 if d > 0 else -1
+            # Parabolik tahmin; sıralamayı bozarsa doğrusal
+            candidate = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+            )
+            if not q[i - 1] < candidate < q[i + 1]:
+                candidate = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+            q[i] = candidate
+            n[i] += d
+    return {"q": q, "n": n}
+
+
+def p2_value(state: dict, p: float):
+    """Tahmini yüzdelik; 5'ten az gözlemde örneklerden (en yakın sıra) hesaplanır"""
+    if not state or not state["q"]:
+        return None
+    q = state["q"]
+    if len(q) < 5 or not state["n"]:
+        return q[min(len(q) - 1, max(0, math.ceil(p * len(q)) - 1))]
+    return q[2]
+
+
+def sketch_update(sketch: dict, value: float) -> dict:
+    """Tüm QUANTILES için P² durumlarını günceller; {"0.5": durum, "0.9": durum}"""
+    sketch = sketch or {}
+    return {str(p): p2_update(sketch.get(str(p)), value, p) for p in QUANTILES}
+
+
+def sketch_values(sketch: dict):
+    sketch = sketch or {}
+    return {p: p2_value(sketch.get(str(p)), p) for p in QUANTILES}
+
+
+# --- AYIRT EDİCİLİK ---
+def point_biserial(attempts: int, correct: int, ability_sum: float, ability_sq_sum: float,
+                   ability_correct_sum: float):
+    """
+    r_pb = (M1 - M0) / s * sqrt(p * q)
+    M1 / M0: doğru / yanlış cevaplayanların ortalama yeteneği, s: yeteneklerin (popülasyon) std sapması.
+    Tanımsızsa (hepsi doğru / yanlış, yetenekler aynı) None.
+    """
+    wrong = attempts - correct
+    if correct == 0 or wrong == 0:
+        return None
+    mean = ability_sum / attempts
+    variance = ability_sq_sum / attempts - mean * mean
+    if variance <= 1e-12:
+        return None
+    mean_correct = ability_correct_sum / correct
+    mean_wrong = (ability_sum - ability_correct_sum) / wrong
+    p = correct / attempts
+    r = (mean_correct - mean_wrong) / math.sqrt(variance) * math.sqrt(p * (1 - p))
+    return max(-1.0, min(1.0, r))
+
+
+def option_of(given_answer: str):
+    """Verilen cevabın şık harfi (A-D); başka bir şeyse None"""
+    option = (given_answer or "").strip().upper()
+    return option if option in OPTIONS else None
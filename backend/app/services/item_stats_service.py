@@ -0,0 +1,210 @@
+from sqlalchemy.orm import Session
+from app.models.item_stats import QuestionItemStats
+from app.repositories.item_stats_repository import ItemStatsRepository
+from app.services import item_stats_engine as engine
+
+WRITE_CHUNK = 5000
+# Bekleyen cevaplar bu kadar soruluk transaction'larda işlenir
+FOLD_BATCH = 500
+# Uyarılar bu kadar cevaptan sonra verilir (az cevapla oranlar gürültülü)
+MIN_ATTEMPTS = 30
+TOO_HARD = 0.2            # p-değeri altı
+TOO_EASY = 0.95           # p-değeri üstü
+LOW_DISCRIMINATION = 0.15
+
+OPTION_COLUMNS = {"A": "count_a", "B": "count_b", "C": "count_c", "D": "count_d"}
+SORT_KEYS = {
+    "id": lambda item: item["question_id"],
+    "attempts": lambda item: item["attempts"],
+    "p_value": lambda item: item["p_value"],
+    # Tanımsız ayırt edicilik en sona
+    "discrimination": lambda item: (item["discrimination"] is None, item["discrimination"] or 0.0),
+}
+
+
+class ItemStatsService:
+    """
+    Soru bazlı madde analizi: p-değeri, süre ortalaması / yüzdelikleri, şık dağılımı, ayırt edicilik.
+    Cevap yolu satırı kilitlemez: cevap, aynı transaction'da question_item_events tablosuna eklenir.
+    Bekleyen cevaplar rapor okunurken (fold) satır kilidi altında O(1) işlenir; öğretmen raporu
+    sadece question_item_stats satırlarını okur.
+    """
+
+    def __init__(self):
+        self.item_stats_repo = ItemStatsRepository()
+
+    # --- CEVAP BAŞINA EKLEME ---
+    def record_answers(self, db: Session, answers):
+        """
+        answers: (soru id, verilen cevap, doğru mu, süre, öğrencinin genel yeteneği) listesi, cevap sırasıyla.
+        Bekleyen cevap olarak eklenir; kilit alınmaz, aynı sorunun eşzamanlı cevapları birbirini beklemez (commit etmez).
+        """
+        if not answers:
+            return
+        self.item_stats_repo.append_events(db, [
+            {"question_id": question_id, "given_answer": given_answer, "is_correct": bool(is_correct),
+             "time_spent_seconds": time_spent, "theta": theta}
+            for question_id, given_answer, is_correct, time_spent, theta in answers
+        ])
+
+    # --- BEKLEYEN CEVAPLARI İŞLEME ---
+    def fold(self, db: Session, question_ids=None):
+        """
+        Bekleyen cevapları istatistik satırlarına işleyip siler (question_ids verilmezse hepsi).
+        FOLD_BATCH soruluk parçalar halinde, her parça kendi transaction'ında. İşlenen cevap sayısını döner.
+        """
+        pending = self.item_stats_repo.pending_question_ids(db, question_ids)
+        # Okuma anlık görüntüsü bırakılır; cevaplar satır kilidi alındıktan sonra okunur. Aynı anda
+        # çalışan başka bir fold önce commit ettiyse onun sildiği cevaplar bu yüzden tekrar işlenmez.
+        db.commit()
+        folded = 0
+        for start in range(0, len(pending), FOLD_BATCH):
+            batch = pending[start:start + FOLD_BATCH]
+            rows = self._lock_rows(db, batch)
+            events = self.item_stats_repo.get_events(db, batch)
+            for event in events:
+                self._apply(rows[event.question_id], event.given_answer, event.is_correct,
+                            event.time_spent_seconds, event.theta)
+            self.item_stats_repo.delete_events(db, [event.id for event in events])
+            db.commit()
+            folded += len(events)
+        return folded
+
+    def _lock_rows(self, db: Session, question_ids):
+        """Eksik satırları upsert ile ekleyip hepsini soru id sırasıyla kilitler; {soru id: satır}"""
+        self.item_stats_repo.insert_missing(db, [self._new_values(question_id) for question_id in question_ids])
+        return {row.question_id: row for row in self.item_stats_repo.get_for_update(db, question_ids)}
+
+    @staticmethod
+    def _new_values(question_id: int):
+        return dict(
+            question_id=question_id, attempts=0, correct_count=0,
+            count_a=0, count_b=0, count_c=0, count_d=0, count_other=0,
+            time_mean=0.0, time_m2=0.0, time_sketch=None,
+            ability_sum=0.0, ability_sq_sum=0.0, ability_correct_sum=0.0,
+        )
+
+    @classmethod
+    def _new_row(cls, question_id: int):
+        return QuestionItemStats(**cls._new_values(question_id))
+
+    @staticmethod
+    def _apply(row, given_answer, is_correct: bool, time_spent, theta: float):
+        row.attempts += 1
+        option = engine.option_of(given_answer)
+        column = OPTION_COLUMNS.get(option, "count_other")
+        setattr(row, column, getattr(row, column) + 1)
+
+        time_spent = float(time_spent or 0)
+        row.time_mean, row.time_m2 = engine.welford_update(row.attempts, row.time_mean, row.time_m2, time_spent)
+        # JSON sütunu yerinde değiştirilmez; yeni sözlük atanır (değişiklik takibi için)
+        row.time_sketch = engine.sketch_update(row.time_sketch, time_spent)
+
+        row.ability_sum += theta
+        row.ability_sq_sum += theta * theta
+        if is_correct:
+            row.correct_count += 1
+            row.ability_correct_sum += theta
+
+    # --- OKUMA ---
+    def get_item_stats(self, db: Session, lesson_id: int = None, flagged: bool = False, min_attempts: int = 0,
+                       sort_by: str = "id", order: str = "asc", skip: int = 0, limit: int = None):
+        """Soruların madde istatistikleri ve uyarıları; flagged=True ise sadece uyarı alanlar"""
+        self.fold(db)
+        items = [
+            self._to_item(question_id, lesson, key, stats)
+            for question_id, lesson, key, stats in self.item_stats_repo.get_report_rows(
+                db, lesson_id=lesson_id, min_attempts=min_attempts)
+        ]
+        if flagged:
+            items = [item for item in items if item["flags"]]
+        items.sort(key=SORT_KEYS.get(sort_by, SORT_KEYS["id"]), reverse=(order == "desc"))
+        page = items[skip:] if limit is None else items[skip:skip + limit]
+        return {"total": len(items), "items": page}
+
+    def get_question_item_stats(self, db: Session, question_id: int):
+        self.fold(db, [question_id])
+        rows = self.item_stats_repo.get_report_rows(db, question_id=question_id)
+        return self._to_item(*rows[0]) if rows else None
+
+    @staticmethod
+    def _to_item(question_id: int, lesson_id: int, correct_answer: str, stats):
+        attempts = stats.attempts
+        p_value = stats.correct_count / attempts if attempts else None
+        discrimination = engine.point_biserial(
+            attempts, stats.correct_count, stats.ability_sum, stats.ability_sq_sum, stats.ability_correct_sum
+        )
+        options = {option: getattr(stats, column) for option, column in OPTION_COLUMNS.items()}
+        quantiles = engine.sketch_values(stats.time_sketch)
+        sd = engine.std_dev(attempts, stats.time_m2)
+        key = engine.option_of(correct_answer)
+
+        flags = []
+        if attempts >= MIN_ATTEMPTS:
+            distractors = [count for option, count in options.items() if option != key]
+            # En çok seçilen şık cevap anahtarı değilse anahtar yanlış girilmiş olabilir
+            if key is None or (distractors and max(distractors) > options[key]):
+                flags.append("possible_miskey")
+            if discrimination is not None and discrimination < 0:
+                flags.append("negative_discrimination")
+            elif discrimination is not None and discrimination < LOW_DISCRIMINATION:
+                flags.append("low_discrimination")
+            if p_value < TOO_HARD:
+                flags.append("too_hard")
+            elif p_value > TOO_EASY:
+                flags.append("too_easy")
+
+        return {
+            "question_id": question_id,
+            "lesson_id": lesson_id,
+            "correct_answer": correct_answer,
+            "attempts": attempts,
+            "p_value": round(p_value, 3) if p_value is not None else None,
+            "discrimination": round(discrimination, 3) if discrimination is not None else None,
+            "time": {
+                "mean": round(stats.time_mean, 1) if attempts else None,
+                "sd": round(sd, 1) if sd is not None else None,
+                "p50": round(quantiles[0.5], 1) if quantiles[0.5] is not None else None,
+                "p90": round(quantiles[0.9], 1) if quantiles[0.9] is not None else None,
+            },
+            "options": {**options, "other": stats.count_other},
+            "flags": flags,
+        }
+
+    # --- YENİDEN OLUŞTURMA ---
+    def rebuild(self, db: Session, question_ids=None, chunk_size: int = 100000):
+        """
+        İstatistikleri histories tablosundan cevap sırasıyla yeniden hesaplar (question_ids verilmezse hepsi).
+        Doğruluk sorunun GÜNCEL anahtarına göre yeniden değerlendirilir (anahtar düzeltmesinden sonra
+        kullanılır); ayırt edicilikte öğrencinin güncel genel yeteneği kullanılır. Commit eder.
+
+        Satırlar silinmez: önce kilitlenir, geçmiş ve bekleyen cevaplar kilitten sonra aynı anlık görüntüden
+        okunur, satırlar yerinde güncellenir. Görüntüdeki bekleyen cevaplar geçmişe zaten dahil olduğu için
+        silinir; sonra commit edilen cevaplar bekleyen olarak kalır ve sonraki fold'da işlenir.
+        """
+        scope = None if question_ids is None else sorted(set(question_ids))
+        locked_ids = self.item_stats_repo.answered_question_ids(db, scope)
+        db.commit()
+
+        rows = {question_id: self._new_row(question_id) for question_id in self._lock_rows(db, locked_ids)}
+        # Kilitlenmemiş (yeniden oluşturma başladıktan sonra eklenen) soruların cevapları bekler
+        event_ids = [event_id for event_id, question_id in self.item_stats_repo.get_event_keys(db, scope)
+                     if question_id in rows]
+        answers = 0
+        for partition in self.item_stats_repo.stream_history(db, scope, chunk_size):
+            for question_id, correct_answer, given_answer, time_spent, theta in partition:
+                row = rows.get(question_id)
+                if row is None:
+                    continue
+                is_correct = (correct_answer or "").strip().upper() == (given_answer or "").strip().upper()
+                self._apply(row, given_answer, is_correct, time_spent, theta)
+                answers += 1
+
+        columns = [c.name for c in QuestionItemStats.__table__.columns]
+        records = [{name: getattr(row, name) for name in columns} for row in rows.values()]
+        for start in range(0, len(records), WRITE_CHUNK):
+            self.item_stats_repo.update_rows(db, records[start:start + WRITE_CHUNK])
+        for start in range(0, len(event_ids), WRITE_CHUNK):
+            self.item_stats_repo.delete_events(db, event_ids[start:start + WRITE_CHUNK])
+        db.commit()
+        return {"rows": answers, "questions": sum(1 for row in rows.values() if row.attempts)}
@@ -1,11 +1,17 @@
 from sqlalchemy.orm import Session
-from app.models.lessons import Lesson
-from app.repositories.lessons_repository import LessonRepository
-from app.schemas.lessons import LessonCreate
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.repositories.lessons_repository import LessonRepository, AsyncLessonRepository
+from app.schemas.lessons import LessonCreate, LessonSummary, LessonResponse
+from app.services.question_index import question_index
+from app.services.catalogue_cache import catalogue_cache, CatalogueEntry, LESSON, page_limit
+from app.services.progress_service import ProgressService
 
 class LessonService:
     def __init__(self):
         self.lesson_repo = LessonRepository()
+        self.async_lesson_repo = AsyncLessonRepository()
+        self.progress_service = ProgressService()
 
     def create_lesson(self, db: Session, lesson_data: LessonCreate):
         db_lesson = Lesson(
@@ -15,18 +21,51 @@ class LessonService:
             attachment_url=lesson_data.attachment_url,
             difficulty=lesson_data.difficulty
         )
-        return self.lesson_repo.create(db, db_lesson)
+        lesson = self.lesson_repo.create(db, db_lesson)
+        catalogue_cache.lesson_changed(lesson)
+        return lesson
 
     def get_all_lessons(self, db: Session):
         return self.lesson_repo.get_all(db)
 
+    async def get_lessons_page(self, db, after: int = None, limit: int = None, difficulty: str = None):
+        # Özet görünüm, id cursor'lı sayfa; katalog önbelleğinden hazır JSON + ETag
+        # (limit ve cursor yoksa tüm liste: sayfalamayı bilmeyen istemciler)
+        limit = page_limit(after, limit)
+
+        async def load():
+            rows = await self.async_lesson_repo.list_summaries(
+                db, after, None if limit is None else limit + 1, DifficultyType(difficulty) if difficulty else None)
+            return CatalogueEntry.page(LESSON, LessonSummary, rows, after, limit)
+        return await catalogue_cache.get(f"lessons?difficulty={difficulty}&after={after}&limit={limit}", load)
+
+    async def get_lesson_detail(self, db, lesson_id: int):
+        # Tam ders (content_text dahil); ders yoksa None
+        async def load():
+            lesson = await self.async_lesson_repo.get_by_id(db, lesson_id)
+            return CatalogueEntry.item(LESSON, LessonResponse, lesson) if lesson else None
+        return await catalogue_cache.get(f"lesson:{lesson_id}", load)
+
     def update_lesson(self, db: Session, lesson_id: int, lesson_data: LessonCreate):
         update_map = lesson_data.dict()
-        return self.lesson_repo.update(db, lesson_id, update_map)
+        lesson = self.lesson_repo.update(db, lesson_id, update_map)
+        if lesson:
+            catalogue_cache.lesson_changed(lesson)
+        return lesson
 
     def get_lesson_by_id(self, db: Session, lesson_id: int):
         return self.lesson_repo.get_by_id(db, lesson_id)
 
     # --- EKSİK OLAN KISIM BURASIYDI ---
     def delete_lesson(self, db: Session, lesson_id: int):
-        return self.lesson_repo.delete(db, lesson_id)
\ No newline at end of file
+        # Ders silinince soruları da (cascade) silinir, indeksten de çıkarılmalı
+        question_ids = [q_id for (q_id,) in db.query(Question.id).filter(Question.lesson_id == lesson_id).all()]
+        # Silinen cevapların öğrencileri (sayaçları silmeden sonra yeniden yazılır)
+        user_ids = self.progress_service.users_who_answered(db, question_ids)
+        lesson = self.lesson_repo.delete(db, lesson_id)
+        if lesson:
+            for question_id in question_ids:
+                question_index.remove(question_id)
+            catalogue_cache.lesson_deleted(lesson_id)
+            self.progress_service.questions_removed(db, user_ids)
+        return lesson
\ No newline at end of file
@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.progress import UserProgress
+from app.repositories.progress_repository import ProgressRepository
+from app.services.trend_service import TrendService
+from app.core.cache import result_cache
+
+class ProgressService:
+    def __init__(self):
+        self.progress_repo = ProgressRepository()
+        self.trend_service = TrendService()
+
+    # --- BACKFILL / REBUILD ---
+    def rebuild_all(self, db: Session):
+        """Tüm user_progress satırlarını histories tablosundan tek bir GROUP BY ile yeniden oluşturur"""
+        aggregates = {row[0]: row for row in self.progress_repo.aggregate_from_history(db)}
+        existing = {p.user_id: p for p in self.progress_repo.get_all(db)}
+
+        user_ids = [u_id for (u_id,) in db.query(User.id).all()]
+        for user_id in user_ids:
+            progress = existing.get(user_id)
+            if progress is None:
+                progress = UserProgress(user_id=user_id)
+                db.add(progress)
+
+            _, correct, wrong, total, total_time, last_at = aggregates.get(user_id, (user_id, 0, 0, 0, 0, None))
+            progress.correct_count = int(correct or 0)
+            progress.wrong_count = int(wrong or 0)
+            progress.total_count = int(total or 0)
+            progress.total_time_seconds = int(total_time or 0)
+            progress.last_answered_at = last_at
+
+        db.commit()
+        return len(user_ids)
+
+    def users_who_answered(self, db: Session, question_ids):
+        return self.progress_repo.users_who_answered(db, question_ids)
+
+    def questions_removed(self, db: Session, user_ids):
+        """
+        Soru / ders silinince cevapları cascade ile silinen öğrencilerin sayaçlarını ve gün / hafta
+        rollup'larını yeniden yazar. user_ids silmeden ÖNCE users_who_answered ile alınmalıdır. Commit eder.
+        """
+        # Sayaç satırları kilitlenir; rollup'lar aynı kilit altında yeniden yazılır
+        self.progress_repo.rebuild_users(db, user_ids)
+        self.trend_service.rebuild_users(db, user_ids)
+        db.commit()
+        for user_id in user_ids:
+            result_cache.invalidate_user(user_id)
+
+    # --- TUTARLILIK KONTROLÜ ---
+    def check_consistency(self, db: Session):
+        """
+        Sayaçları histories tablosuyla karşılaştırır.
+        Uyuşmayan her kullanıcı için {"user_id", "expected", "actual"} döner.
+        """
+        aggregates = {row[0]: row for row in self.progress_repo.aggregate_from_history(db)}
+        existing = {p.user_id: p for p in self.progress_repo.get_all(db)}
+
+        mismatches = []
+        for user_id in sorted(set(aggregates) | set(existing)):
+            _, correct, wrong, total, total_time, _ = aggregates.get(user_id, (user_id, 0, 0, 0, 0, None))
+            expected = {
+                "correct_count": int(correct or 0),
+                "wrong_count": int(wrong or 0),
+                "total_count": int(total or 0),
+                "total_time_seconds": int(total_time or 0),
+            }
+            progress = existing.get(user_id)
+            actual = None
+            if progress is not None:
+                actual = {
+                    "correct_count": progress.correct_count,
+                    "wrong_count": progress.wrong_count,
+                    "total_count": progress.total_count,
+                    "total_time_seconds": progress.total_time_seconds,
+                }
+            if actual != expected:
+                mismatches.append({"user_id": user_id, "expected": expected, "actual": actual})
+        return mismatches
@@ -0,0 +1,349 @@
+import random
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.questions import Question
+from app.models.history import History
+from app.models.ability import QuestionCalibration
+from app.repositories.ability_repository import AbilityRepository
+from app.services.ability_engine import prior_difficulty, theta_from_level, DIFFICULTY_STEP
+
+DIFFICULTY_LEVELS = range(1, 6)
+# Sıradaki soru seçiminde bellekte atlanacak en fazla cevaplanmış soru; aşılırsa veritabanına sorulur
+MAX_ANSWERED_SCAN = 256
+# Seçilen soru bellekteki kümeye rağmen cevaplanmış çıkarsa küme yeniden yüklenip seçim en fazla bu kadar tekrarlanır
+MAX_STALE_RETRIES = 2
+
+
+class ScanLimitReached(Exception):
+    """nearest_unanswered sınırı aştı (öğrenci dersin çoğunu cevaplamış)"""
+
+
+class QuestionIndex:
+    """
+    Soru id'lerinin bellek içi indeksi:
+      - zorluk seviyesine göre (seviye testi örneklemesi için)
+      - ders bazında, kalibre edilmiş zorluğa (b) göre sıralı (sıradaki soru seçimi için)
+    İlk kullanımda tek sorguyla yüklenir, sonra soru ekleme / güncelleme / silme
+    işlemlerinde artımlı olarak güncellenir.
+    """
+
+    def __init__(self):
+        self._by_level = {}   # seviye -> [soru id]
+        self._position = {}   # soru id -> (seviye, listedeki konum)
+        self._by_lesson = {}  # ders id -> [(b, soru id)] b'ye göre sıralı
+        self._lesson_of = {}  # soru id -> (ders id, b)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _query(self, db: Session):
+        return db.query(
+            Question.id, Question.difficulty_level, Question.lesson_id, QuestionCalibration.difficulty
+        ).outerjoin(QuestionCalibration, QuestionCalibration.question_id == Question.id)
+
+    def ensure_loaded(self, db: Session):
+        # Sorgu kilit altında çalışır: sorgu ile yükleme arasında gelen bir ekleme / silme
+        # eski görüntüyle ezilmez (bekleyen güncellemeler yüklemeden sonra uygulanır).
+        # Tam yükleme süreç başına bir kez (ve invalidate sonrası) yapılır.
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = self._query(db).all()
+            self._by_level = {}
+            self._position = {}
+            self._by_lesson = {}
+            self._lesson_of = {}
+            for question_id, level, lesson_id, difficulty in rows:
+                self._add(question_id, level, lesson_id, difficulty)
+            self._loaded = True
+
+    def refresh_lesson(self, db: Session, lesson_id: int):
+        """Toplu INSERT sonrası (yeni id'ler bilinmediğinde) sadece o dersin sorularını yeniden okur"""
+        if not self._loaded:
+            return self.ensure_loaded(db)
+        with self._lock:
+            # ensure_loaded'daki gibi: tek dersin (indeksli) sorgusu kilit altında
+            rows = self._query(db).filter(Question.lesson_id == lesson_id).all()
+            for question_id, level, lesson_id, difficulty in rows:
+                entry = self._position.get(question_id)
+                if entry is None or entry[0] != level:
+                    self._add(question_id, level, lesson_id, difficulty)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    # --- ARTIMLI GÜNCELLEMELER ---
+    def add(self, question_id: int, level: int, lesson_id: int):
+        with self._lock:
+            if self._loaded:
+                self._add(question_id, level, lesson_id)
+
+    def update(self, question_id: int, level: int, lesson_id: int):
+        with self._lock:
+            if self._loaded:
+                # Seviye değişmediyse öğrenilmiş zorluk korunur
+                old_level = self._position.get(question_id, (None,))[0]
+                difficulty = self._lesson_of[question_id][1] if old_level == level else None
+                self._remove(question_id)
+                self._add(question_id, level, lesson_id, difficulty)
+
+    def remove(self, question_id: int):
+        with self._lock:
+            if self._loaded:
+                self._remove(question_id)
+
+    def set_difficulty(self, question_id: int, difficulty: float):
+        """Cevap sonrası güncellenen zorluğa göre soruyu ders listesinde yeniden konumlandırır"""
+        with self._lock:
+            entry = self._lesson_of.get(question_id)
+            if entry is None:
+                return
+            lesson_id, old_difficulty = entry
+            keys = self._by_lesson[lesson_id]
+            del keys[bisect_left(keys, (old_difficulty, question_id))]
+            insort(keys, (difficulty, question_id))
+            self._lesson_of[question_id] = (lesson_id, difficulty)
+
+    def _add(self, question_id: int, level: int, lesson_id: int, difficulty: float = None):
+        if question_id in self._position:
+            self._remove(question_id)
+        bucket = self._by_level.setdefault(level, [])
+        self._position[question_id] = (level, len(bucket))
+        bucket.append(question_id)
+
+        if difficulty is None:
+            difficulty = prior_difficulty(level)
+        insort(self._by_lesson.setdefault(lesson_id, []), (difficulty, question_id))
+        self._lesson_of[question_id] = (lesson_id, difficulty)
+
+    def _remove(self, question_id: int):
+        entry = self._position.pop(question_id, None)
+        if entry is None:
+            return
+        level, index = entry
+        bucket = self._by_level[level]
+        # O(1) silme: son elemanı silinenin yerine taşı
+        last = bucket.pop()
+        if last != question_id:
+            bucket[index] = last
+            self._position[last] = (level, index)
+
+        lesson_id, difficulty = self._lesson_of.pop(question_id)
+        keys = self._by_lesson[lesson_id]
+        del keys[bisect_left(keys, (difficulty, question_id))]
+
+    # --- ÖRNEKLEME ---
+    def sample(self, level: int, k: int, rng: random.Random):
+        with self._lock:
+            bucket = self._by_level.get(level, [])
+            return rng.sample(bucket, min(k, len(bucket)))
+
+    def count(self, level: int):
+        return len(self._by_level.get(level, []))
+
+    def nearest_unanswered(self, lesson_id: int, theta: float, answered: "AnsweredBitset",
+                           max_scan: int = None):
+        """
+        Zorluğu theta'ya en yakın (en bilgilendirici) cevaplanmamış soru; hiç yoksa None.
+        bisect ile O(log n) konumlanır, iki yöne doğru sadece cevaplanmışlar atlanır.
+        max_scan'den fazla cevaplanmış soru atlanırsa ScanLimitReached (yürüme O(n)'e dönmesin).
+        """
+        with self._lock:
+            keys = self._by_lesson.get(lesson_id, [])
+            right = bisect_left(keys, (theta,))
+            left = right - 1
+            scanned = 0
+            while left >= 0 or right < len(keys):
+                if max_scan is not None and scanned >= max_scan:
+                    raise ScanLimitReached()
+                scanned += 1
+                if right >= len(keys) or (left >= 0 and theta - keys[left][0] <= keys[right][0] - theta):
+                    candidate = keys[left][1]
+                    left -= 1
+                else:
+                    candidate = keys[right][1]
+                    right += 1
+                if candidate not in answered:
+                    return candidate
+            return None
+
+    def lesson_count(self, lesson_id: int):
+        return len(self._by_lesson.get(lesson_id, []))
+
+
+question_index = QuestionIndex()
+
+
+class AnsweredBitset:
+    """Soru id'si başına 1 bit (bytearray); üyelik kontrolü O(1)"""
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, question_ids=()):
+        question_ids = list(question_ids)
+        self._bits = bytearray((max(question_ids) >> 3) + 1 if question_ids else 0)
+        for question_id in question_ids:
+            self._bits[question_id >> 3] |= 1 << (question_id & 7)
+
+    def add(self, question_id: int):
+        byte = question_id >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte - len(self._bits) + 1))
+        self._bits[byte] |= 1 << (question_id & 7)
+
+    def __contains__(self, question_id: int):
+        byte = question_id >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (question_id & 7)))
+
+    def __len__(self):
+        return sum(bin(b).count("1") for b in self._bits)
+
+
+class AnsweredQuestions:
+    """
+    Öğrenci başına cevaplanmış soruların bit kümesi.
+    İlk istekte tek sorguyla yüklenir, her cevapta işaretlenir; en son kullanılan
+    max_users öğrenci bellekte tutulur (LRU). Küme ttl_seconds sonunda veritabanından yeniden okunur:
+    mark() sadece bu süreçte verilen cevapları görür (diğer worker'lar, yükleme sırasında commit edilenler).
+    """
+
+    def __init__(self, max_users: int = 10000, ttl_seconds: float = None):
+        self.max_users = max_users
+        self.ttl = settings.ANSWERED_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._users = OrderedDict()  # user_id -> (AnsweredBitset, yüklenme zamanı)
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> AnsweredBitset:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._users.move_to_end(user_id)
+                return entry[0]
+        return self.reload(db, user_id)
+
+    def reload(self, db: Session, user_id: int) -> AnsweredBitset:
+        """Öğrencinin kümesini veritabanından yeniden okur (süresi dolduğunda / eski olduğu anlaşıldığında)"""
+        loaded_at = time.monotonic()
+        rows = db.query(History.question_id).filter(History.user_id == user_id).distinct().all()
+        bits = AnsweredBitset(question_id for (question_id,) in rows)
+        with self._lock:
+            # Yükleme sırasında başka bir istek daha yeni bir küme yüklediyse onunki kullanılır
+            existing = self._users.get(user_id)
+            if existing is not None and existing[1] > loaded_at:
+                return existing[0]
+            self._users[user_id] = (bits, loaded_at)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return bits
+
+    def mark(self, user_id: int, question_id: int):
+        """Sadece bellekteki kümeyi günceller; yüklenmemişse ilk get() veritabanından okur"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                entry[0].add(question_id)
+
+    def invalidate(self, user_id: int = None):
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+
+answered_questions = AnsweredQuestions()
+
+
+class PlacementSampler:
+    """Seviye testi: her zorluk seviyesinden rastgele soru seçer, hepsini tek IN sorgusuyla getirir"""
+
+    def __init__(self, index: QuestionIndex = question_index, per_level: int = 2):
+        self.index = index
+        self.per_level = per_level
+
+    def sample(self, db: Session, seed: int = None):
+        self.index.ensure_loaded(db)
+        rng = random.Random(seed)
+
+        selected = []
+        for level in DIFFICULTY_LEVELS:
+            selected.extend(self.index.sample(level, self.per_level, rng))
+        if not selected:
+            return []
+
+        questions = {q.id: q for q in db.query(Question).filter(Question.id.in_(selected)).all()}
+        # Seçim sırası (kolaydan zora) korunur
+        return [questions[q_id] for q_id in selected if q_id in questions]
+
+
+class NextQuestionSelector:
+    """
+    Öğrencinin ders yeteneğine (yoksa genel yeteneğine) zorluğu en yakın, henüz
+    cevaplamadığı soruyu seçer. Ders listesi çekilmez; sadece seçilen soru okunur.
+    """
+
+    def __init__(self, index: QuestionIndex = question_index, answered: AnsweredQuestions = answered_questions):
+        self.index = index
+        self.answered = answered
+        self.ability_repo = AbilityRepository()
+
+    def target_theta(self, db: Session, user_id: int, lesson_id: int):
+        lesson_ability = self.ability_repo.get_user_lesson(db, user_id, lesson_id)
+        if lesson_ability is not None:
+            return lesson_ability.theta
+        user_ability = self.ability_repo.get_user(db, user_id)
+        if user_ability is not None:
+            return user_ability.theta
+        return theta_from_level(self.ability_repo.get_levels(db, [user_id]).get(user_id))
+
+    def select(self, db: Session, user_id: int, lesson_id: int):
+        self.index.ensure_loaded(db)
+        theta = self.target_theta(db, user_id, lesson_id)
+        answered = self.answered.get(db, user_id)
+        for _ in range(MAX_STALE_RETRIES):
+            try:
+                question_id = self.index.nearest_unanswered(lesson_id, theta, answered, max_scan=MAX_ANSWERED_SCAN)
+            except ScanLimitReached:
+                return self._nearest_from_db(db, user_id, lesson_id, theta)
+            if question_id is None:
+                return None
+            # Bellekteki küme eski olabilir (başka worker'da / yüklemeden sonra verilen cevap):
+            # seçilen soru (user_id, question_id) indeksiyle tekrar kontrol edilir
+            if not self._is_answered(db, user_id, question_id):
+                return db.query(Question).filter(Question.id == question_id).first()
+            answered = self.answered.reload(db, user_id)
+            answered.add(question_id)
+        return self._nearest_from_db(db, user_id, lesson_id, theta)
+
+    @staticmethod
+    def _is_answered(db: Session, user_id: int, question_id: int):
+        return db.query(
+            select(History.id).where(History.user_id == user_id, History.question_id == question_id).exists()
+        ).scalar()
+
+    @staticmethod
+    def _nearest_from_db(db: Session, user_id: int, lesson_id: int, theta: float):
+        """
+        Dersin çoğunu cevaplamış öğrenci için: cevaplanmamış sorular arasından zorluğu theta'ya
+        en yakın olan tek sorguyla (ders indeksi + öğrencinin cevap indeksi üzerinden) seçilir.
+        """
+        difficulty = func.coalesce(
+            QuestionCalibration.difficulty,
+            (func.coalesce(Question.difficulty_level, 3) - 3) * DIFFICULTY_STEP,
+        )
+        answered = select(History.question_id).where(History.user_id == user_id)
+        return (
+            db.query(Question)
+            .outerjoin(QuestionCalibration, QuestionCalibration.question_id == Question.id)
+            .filter(Question.lesson_id == lesson_id, Question.id.not_in(answered))
+            .order_by(func.abs(difficulty - theta), difficulty, Question.id)
+            .first()
+        )
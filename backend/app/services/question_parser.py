@@ -0,0 +1,137 @@
+import json
+import re
+from pydantic import ValidationError
+from app.schemas.questions import QuestionCreate
+
+# Sadece yapıyı etkileyen karakterlere atlamak için (karakter karakter dolaşmak yerine)
+_STRUCTURAL = re.compile(r'[{}"\\]')
+_VALID_ANSWERS = {"A", "B", "C", "D"}
+
+
+class QuestionStreamParser:
+    """
+    Model çıktısını parça parça okuyup tamamlanan her soru nesnesini tek tek çıkaran ayrıştırıcı.
+    Kod blokları (```json), dizi parantezleri ve açıklama metni yok sayılır; sadece en dıştaki
+    {...} nesneleri alınır. Her nesne QuestionCreate şemasına göre doğrulanır: geçerliler
+    `accepted`, hatalılar sebebiyle birlikte `rejected` listesinde tutulur.
+    """
+
+    def __init__(self, lesson_id: int = None, difficulty_level: int = None):
+        self.lesson_id = lesson_id
+        self.difficulty_level = difficulty_level
+        self.accepted = []
+        self.rejected = []
+        self._buffer = ""
+        self._pos = 0           # tamponda taranmış son konum
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = None      # açık nesnenin tampondaki başlangıcı
+
+    def feed(self, chunk: str):
+        """Yeni gelen metni işler, bu parçayla tamamlanan geçerli soruları döner"""
+        self._buffer += chunk
+        completed = []
+        buf = self._buffer
+        pos = self._pos
+
+        while True:
+            if self._escape:
+                # Kaçış karakterinden sonraki karakter (tek bir karakter) atlanır
+                if pos >= len(buf):
+                    break
+                self._escape = False
+                pos += 1
+                continue
+
+            match = _STRUCTURAL.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            ch = match.group()
+            pos = match.end()
+
+            if self._in_string:
+                if ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = pos - 1
+                self._depth += 1
+            elif ch == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    question = self._handle_object(buf[self._start:pos])
+                    if question is not None:
+                        completed.append(question)
+                    self._start = None
+
+        # Tamamlanmış kısımlar atılır, tampon sadece açık nesne kadar büyür
+        if self._start is not None:
+            self._buffer = buf[self._start:]
+            self._pos = pos - self._start
+            self._start = 0
+        else:
+            self._buffer = ""
+            self._pos = 0
+        return completed
+
+    def feed_all(self, text: str):
+        return self.feed(text) + self.close()
+
+    def close(self):
+        """Akış bittiğinde yarım kalan nesneyi reddedilenlere ekler"""
+        if self._start is not None and self._buffer.strip():
+            self.rejected.append({"raw": self._buffer, "error": "Incomplete object at end of stream"})
+        self._buffer = ""
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        return []
+
+    def _handle_object(self, raw: str):
+        try:
+            obj = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.rejected.append({"raw": raw, "error": f"Invalid JSON: {e}"})
+            return None
+        return self.accept_object(obj, raw)
+
+    def accept_object(self, obj, raw: str = None):
+        """Sözlüğü doğrular; geçerliyse normalize edilmiş soruyu döner, değilse None"""
+        if not isinstance(obj, dict):
+            self.rejected.append({"raw": raw or obj, "error": "Not an object"})
+            return None
+
+        data = dict(obj)
+        data["lesson_id"] = self.lesson_id if self.lesson_id is not None else 0
+        if self.difficulty_level is not None:
+            data["difficulty_level"] = self.difficulty_level
+        else:
+            data.setdefault("difficulty_level", 3)
+        if isinstance(data.get("correct_answer"), str):
+            data["correct_answer"] = data["correct_answer"].strip().upper()
+
+        try:
+            question = QuestionCreate(**data)
+        except ValidationError as e:
+            self.rejected.append({"raw": raw or obj, "error": str(e)})
+            return None
+        if question.correct_answer not in _VALID_ANSWERS:
+            self.rejected.append({"raw": raw or obj, "error": f"Invalid correct_answer: {question.correct_answer!r}"})
+            return None
+
+        result = question.model_dump()
+        if self.lesson_id is None:
+            del result["lesson_id"]
+        self.accepted.append(result)
+        return result
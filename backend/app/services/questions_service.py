@@ -1,11 +1,18 @@
 from sqlalchemy.orm import Session
 from app.models.questions import Question
-from app.repositories.questions_repository import QuestionRepository
-from app.schemas.questions import QuestionCreate
+from app.repositories.questions_repository import QuestionRepository, AsyncQuestionRepository
+from app.schemas.questions import QuestionCreate, QuestionResponse, QuestionSummary
+from app.services.question_index import question_index
+from app.services.catalogue_cache import catalogue_cache, CatalogueEntry, QUESTION, page_limit
+from app.services.item_stats_service import ItemStatsService
+from app.services.progress_service import ProgressService
 
 class QuestionService:
     def __init__(self):
         self.question_repo = QuestionRepository()
+        self.async_question_repo = AsyncQuestionRepository()
+        self.item_stats_service = ItemStatsService()
+        self.progress_service = ProgressService()
 
     def add_question_to_lesson(self, db: Session, question_data: QuestionCreate):
         db_question = Question(
@@ -18,18 +25,57 @@ class QuestionService:
             correct_answer=question_data.correct_answer,
             difficulty_level=question_data.difficulty_level
         )
-        return self.question_repo.create(db, db_question)
+        question = self.question_repo.create(db, db_question)
+        question_index.add(question.id, question.difficulty_level, question.lesson_id)
+        catalogue_cache.question_changed(question)
+        return question
 
     def get_lesson_questions(self, db: Session, lesson_id: int):
         return self.question_repo.get_questions_by_lesson(db, lesson_id)
 
+    async def get_questions_page(self, db, lesson_id: int = None, after: int = None, limit: int = None,
+                                 difficulty_level: int = None, summary: bool = True):
+        # id cursor'lı sayfa; katalog önbelleğinden hazır JSON + ETag
+        # (limit ve cursor yoksa tüm liste: sayfalamayı bilmeyen istemciler)
+        limit = page_limit(after, limit)
+
+        async def load():
+            rows = await self.async_question_repo.list_page(
+                db, lesson_id, after, None if limit is None else limit + 1, difficulty_level, summary=summary)
+            return CatalogueEntry.page(QUESTION, QuestionSummary if summary else QuestionResponse, rows, after, limit)
+        key = (f"questions?lesson={lesson_id}&difficulty={difficulty_level}&summary={summary}"
+               f"&after={after}&limit={limit}")
+        return await catalogue_cache.get(key, load)
+
+    async def get_question_detail(self, db, question_id: int):
+        async def load():
+            question = await self.async_question_repo.get_by_id(db, question_id)
+            return CatalogueEntry.item(QUESTION, QuestionResponse, question) if question else None
+        return await catalogue_cache.get(f"question:{question_id}", load)
+
     # --- EKSİK OLAN KISIMLAR EKLENDİ ---
     
     def update_question(self, db: Session, question_id: int, question_data: QuestionCreate):
         # Pydantic modelini dictionary'e çevirip repository'e yolla
         update_data = question_data.dict()
-        return self.question_repo.update(db, question_id, update_data)
+        previous = self.question_repo.get_by_id(db, question_id)
+        previous_key = previous.correct_answer if previous else None
+        question = self.question_repo.update(db, question_id, update_data)
+        if question:
+            question_index.update(question.id, question.difficulty_level, question.lesson_id)
+            catalogue_cache.question_changed(question)
+            if question.correct_answer != previous_key:
+                # Anahtar düzeltildi: p-değeri ve ayırt edicilik verilen cevaplardan yeniden hesaplanır
+                self.item_stats_service.rebuild(db, [question.id])
+        return question
 
     def remove_question(self, db: Session, question_id: int):
+        # Cevaplar cascade ile silinir; bu öğrencilerin sayaçları silmeden sonra yeniden yazılır
+        user_ids = self.progress_service.users_who_answered(db, [question_id])
         # Repository'deki delete metodunu çağır
-        return self.question_repo.delete(db, question_id)
\ No newline at end of file
+        question = self.question_repo.delete(db, question_id)
+        if question:
+            question_index.remove(question_id)
+            catalogue_cache.question_deleted(question_id)
+            self.progress_service.questions_removed(db, user_ids)
+        return question
\ No newline at end of file
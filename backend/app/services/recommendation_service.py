@@ -0,0 +1,122 @@
+from sqlalchemy.orm import Session
+from app.core.cache import result_cache
+from app.services.history_service import HistoryService
+
+# Koç kuralları (en zayıf dersin başarı oranına ve ortalama cevap süresine göre)
+WELCOME, REVIEW, SLOW_DOWN, REINFORCE, LEVEL_UP = "welcome", "review", "slow_down", "reinforce", "level_up"
+CRITICAL_RATE = 45        # altı: tekrar
+MASTERY_RATE = 75         # üstü: zorluk artır
+FAST_ANSWER_SECONDS = 15  # gelişen öğrencide bundan hızlı cevap: yavaşla
+
+
+def choose_rule(success_rate: float, avg_time: float) -> str:
+    if success_rate < CRITICAL_RATE:
+        return REVIEW
+    if success_rate < MASTERY_RATE:
+        return SLOW_DOWN if avg_time < FAST_ANSWER_SECONDS else REINFORCE
+    return LEVEL_UP
+
+class RecommendationService:
+    def __init__(self):
+        self.history_service = HistoryService()
+        self.trend_service = self.history_service.trend_service
+
+    def get_next_step(self, db: Session, user_id: int):
+        """Öğrencinin bir sonraki adımı (kullanıcı bazlı önbellekten)"""
+        return result_cache.get_or_compute(
+            user_id, "next_step",
+            lambda: self.build_recommendation(self.history_service.get_user_summary(db, user_id))
+        )
+
+    async def get_next_step_async(self, db, user_id: int):
+        """get_next_step'in async hali (AsyncSession ile)"""
+        async def compute():
+            return self.build_recommendation(await self.history_service.get_user_summary_async(db, user_id))
+        return await result_cache.aget_or_compute(user_id, "next_step", compute)
+
+    def get_adaptive_recommendation(self, db: Session, user_id: int):
+        """Sonraki adım + son haftanın eğilimi; belirgin düşüşte öneri kritik sayılır"""
+        recommendation = dict(self.get_next_step(db, user_id))
+        recent = self.trend_service.get_recent_change(db, user_id)
+        recommendation["recent_trend"] = recent
+        if recent["direction"] == "down":
+            recommendation["is_critical"] = True
+        # priority her zaman is_critical'dan türetilir (hoş geldin önerisi zaten "high")
+        if recommendation["is_critical"]:
+            recommendation["priority"] = "high"
+        return recommendation
+
+    def build_recommendation(self, summary: dict):
+        lesson_breakdown = summary.get("lesson_breakdown", {})
+        total_stats = summary.get("total_stats", {})
+
+        # --- SENARYO 1: YENİ KULLANICI (HİÇ VERİ YOK) ---
+        if not lesson_breakdown:
+            return self.render(WELCOME)
+
+        # En zayıf dersi bul
+        weakest_lesson = min(lesson_breakdown, key=lesson_breakdown.get)
+        success_rate = lesson_breakdown[weakest_lesson]
+
+        avg_time = total_stats.get("avg_time", 30) 
+        return self.render(choose_rule(success_rate, avg_time), weakest_lesson, success_rate)
+
+    @staticmethod
+    def render(rule: str, weakest_lesson: str = None, success_rate: float = 0):
+        """Kural kodundan (bkz. choose_rule) koç mesajı; sınıf toplu önerileri de bunu kullanır"""
+        if rule == WELCOME:
+            return {
+                "title": "Welcome, Future Expert! 🚀",
+                "message": "I'm your AI Coach. To build your personalized path, I need to see you in action!",
+                "recommended_action": "Start Diagnostic Test",
+                "reason": "We need to calibrate your learning map.",
+                "adaptive_tip": "Don't worry about mistakes. Just do your best!",
+                "priority": "high",
+                "is_critical": False,
+                "target_lesson": None
+            }
+
+        # --- MOTIVATIONAL AI LOGIC (COACH MODE) ---
+        is_critical = False
+
+        if rule == REVIEW:
+            # Durum: Kritik (Ama destekleyici dil)
+            is_critical = True
+            title = "We believe in you! 💪"
+            action = "Review & Retry"
+            reason = f"It seems '{weakest_lesson}' is a bit tricky right now ({int(success_rate)}%). That's totally normal!"
+            message = "Success isn't about never failing, it's about never quitting. Let's look at the materials again."
+            tip = "Take your time reading the PDF summary before the quiz. No rush!"
+
+        elif rule == SLOW_DOWN:
+            # Durum: Gelişiyor (Hız ve Dikkat analizi)
+            title = "Great progress! 🌟"
+            action = "Slow Down a Bit"
+            reason = "You have the speed of a cheetah, but let's sharpen the accuracy."
+            message = "You're answering very fast. If we slow down just a little, your score will skyrocket!"
+            tip = "Read the question twice. The answer is often hiding in the details."
+
+        elif rule == REINFORCE:
+            title = "Great progress! 🌟"
+            action = "Reinforce Knowledge"
+            reason = f"You're doing well in '{weakest_lesson}', just a few steps away from mastery."
+            message = "You are building a solid foundation. Keep pushing!"
+            tip = "Try solving similar questions to turn that 'Good' into 'Perfect'."
+        else:
+            # Durum: Usta (Challenge Modu)
+            title = "You're on Fire! 🔥"
+            action = "Level Up Challenge"
+            reason = f"You've dominated '{weakest_lesson}'. It's too easy for you now."
+            message = "Excellent work! I'm updating your curriculum to include more advanced challenges."
+            tip = "You're ready for the Hard mode. Let's test your limits!"
+
+        return {
+            "title": title,                 # UI Başlığı (Yeni)
+            "message": message,             # UI Motivasyon Mesajı (Yeni)
+            "recommended_action": action,   # Buton Metni
+            "reason": reason,               # Analiz Nedeni
+            "adaptive_tip": tip,            # İpucu
+            "priority": "high" if is_critical else "normal",
+            "is_critical": is_critical,
+            "target_lesson": weakest_lesson
+        }
@@ -0,0 +1,159 @@
+from datetime import datetime, date, timedelta, timezone
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.trend import LearningRollup, PERIODS
+from app.repositories.trend_repository import TrendRepository
+
+WRITE_CHUNK = 5000
+# Yeniden oluşturmada kilitli son transaction'da okunan en yeni cevap sayısı. id'ler commit'ten önce
+# verildiği için başlangıçta henüz commit edilmemiş bir cevabın id'si son commit edilen id'den küçük olabilir;
+# bu pay o cevapları da kilitli okumaya bırakır.
+REBUILD_TAIL_ROWS = 10000
+# Öneri için son dönem ve karşılaştırılan önceki dönem (gün)
+RECENT_DAYS = 7
+BASELINE_DAYS = 28
+# Doğruluk bu kadar puan değişmediyse eğilim "flat" sayılır
+TREND_THRESHOLD = 10
+
+
+def bucket_start(solved_at: datetime, period: str) -> date:
+    """Cevabın düştüğü günün / haftanın (Pazartesi) başlangıcı; saat dilimi yoksa UTC kabul edilir"""
+    if solved_at.tzinfo is not None:
+        solved_at = solved_at.astimezone(timezone.utc)
+    day = solved_at.date()
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+
+def _accuracy(correct, attempts):
+    return round(correct / attempts * 100, 1) if attempts else None
+
+
+class TrendService:
+    """
+    Öğrenme eğilimi: histories tablosu yerine gün / hafta rollup satırlarından okunur.
+    Rollup'lar her cevapla aynı transaction'da artırılır; rebuild_all tüm geçmişten yeniden yazar.
+    """
+
+    def __init__(self):
+        self.trend_repo = TrendRepository()
+
+    # --- CEVAP BAŞINA ARTIRIM ---
+    def record_answers(self, db: Session, user_id: int, answers):
+        """
+        answers: (ders id, solved_at, doğru mu, süre) listesi.
+        İlgili gün ve hafta satırları tek upsert ile artırılır, yoksa eklenir (commit etmez).
+        """
+        deltas = self._aggregate((user_id, lesson_id, solved_at, is_correct, time_spent)
+                                 for lesson_id, solved_at, is_correct, time_spent in answers)
+        self.trend_repo.increment(db, self._records(deltas))
+
+    @staticmethod
+    def _aggregate(rows, deltas: dict = None):
+        """(user, ders, solved_at, doğru, süre) satırlarını {(user, dönem, başlangıç, ders): [cevap, doğru, süre]} toplar"""
+        deltas = {} if deltas is None else deltas
+        for user_id, lesson_id, solved_at, is_correct, time_spent in rows:
+            if solved_at is None:
+                continue
+            for period in PERIODS:
+                key = (user_id, period, bucket_start(solved_at, period), lesson_id)
+                counts = deltas.get(key)
+                if counts is None:
+                    counts = deltas[key] = [0, 0, 0]
+                counts[0] += 1
+                counts[1] += 1 if is_correct else 0
+                counts[2] += time_spent or 0
+        return deltas
+
+    # --- OKUMA ---
+    def get_user_trend(self, db: Session, user_id: int, period: str = "week", days: int = 365, lesson_id: int = None):
+        """Son `days` gün için dönem başına cevap sayısı, doğruluk (%) ve ortalama süre; boş dönemler yer almaz"""
+        since = bucket_start(datetime.now(timezone.utc) - timedelta(days=days), period)
+        points = []
+        for start, attempts, correct, time_sum in self.trend_repo.get_series(db, user_id, period, since, lesson_id):
+            attempts, correct, time_sum = int(attempts or 0), int(correct or 0), int(time_sum or 0)
+            points.append({
+                "bucket_start": start.isoformat(),
+                "attempts": attempts,
+                "correct": correct,
+                "accuracy": _accuracy(correct, attempts),
+                "avg_time": round(time_sum / attempts, 1) if attempts else None,
+            })
+        return {"period": period, "since": since.isoformat(), "lesson_id": lesson_id, "points": points}
+
+    def get_recent_change(self, db: Session, user_id: int):
+        """Son RECENT_DAYS günün doğruluğu, önceki BASELINE_DAYS güne göre (günlük rollup'lardan)"""
+        today = datetime.now(timezone.utc).date()
+        recent_start = today - timedelta(days=RECENT_DAYS - 1)
+        totals = {"recent": [0, 0], "previous": [0, 0]}
+        for start, attempts, correct, _ in self.trend_repo.get_series(
+                db, user_id, "day", recent_start - timedelta(days=BASELINE_DAYS)):
+            bucket = totals["recent" if start >= recent_start else "previous"]
+            bucket[0] += int(attempts or 0)
+            bucket[1] += int(correct or 0)
+
+        recent = _accuracy(totals["recent"][1], totals["recent"][0])
+        previous = _accuracy(totals["previous"][1], totals["previous"][0])
+        direction = None
+        if recent is not None and previous is not None:
+            change = recent - previous
+            direction = "up" if change >= TREND_THRESHOLD else "down" if change <= -TREND_THRESHOLD else "flat"
+        return {
+            "recent_accuracy": recent,
+            "recent_attempts": totals["recent"][0],
+            "previous_accuracy": previous,
+            "direction": direction,
+        }
+
+    @staticmethod
+    def _records(deltas: dict):
+        return [
+            {"user_id": u, "period": p, "bucket_start": b, "lesson_id": l,
+             "attempts": a, "correct_count": c, "total_time_seconds": t}
+            for (u, p, b, l), (a, c, t) in deltas.items()
+        ]
+
+    # --- YENİDEN OLUŞTURMA ---
+    def rebuild_users(self, db: Session, user_ids, chunk_size: int = 100000):
+        """
+        Öğrencilerin rollup'larını histories tablosundan yeniden yazar (commit etmez).
+        Soru / ders silinince cascade ile silinen cevaplardan sonra, öğrencilerin user_progress satırları
+        kilitliyken çağrılır (ProgressService.questions_removed); aynı öğrencinin eşzamanlı cevabı önce o
+        satırı güncellediği için bu transaction bitene kadar bekler.
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+        deltas = {}
+        for partition in self.trend_repo.stream_history(db, chunk_size=chunk_size, user_ids=user_ids):
+            self._aggregate(partition, deltas)
+        self.trend_repo.delete_users(db, user_ids)
+        records = self._records(deltas)
+        for start in range(0, len(records), WRITE_CHUNK):
+            db.execute(insert(LearningRollup), records[start:start + WRITE_CHUNK])
+
+    def rebuild_all(self, db: Session, chunk_size: int = 100000):
+        """
+        Tüm rollup'ları histories ⨝ questions üzerinden yeniden yazar.
+        Uzun okuma kilitsizdir ve başlangıçtaki son cevap id'sinin REBUILD_TAIL_ROWS gerisine kadar olan
+        geçmişi kapsar; kalanı ve bu sırada gelen cevaplar kısa, kilitli son transaction'da okunur ve
+        silme + yazma ile aynı commit'e girer. Böylece yeniden oluşturma sırasında verilen cevaplar kaybolmaz.
+        """
+        watermark = max(self.trend_repo.max_history_id(db) - REBUILD_TAIL_ROWS, 0)
+        deltas = {}
+        rows = 0
+        for partition in self.trend_repo.stream_history(db, watermark, chunk_size):
+            self._aggregate(partition, deltas)
+            rows += len(partition)
+        # Okuma anlık görüntüsü bırakılır; kilitli okuma en güncel commit'leri görür
+        db.commit()
+
+        tail = self.trend_repo.history_after_for_update(db, watermark)
+        self._aggregate(tail, deltas)
+        rows += len(tail)
+
+        self.trend_repo.delete_all(db)
+        records = self._records(deltas)
+        for start in range(0, len(records), WRITE_CHUNK):
+            db.execute(insert(LearningRollup), records[start:start + WRITE_CHUNK])
+        db.commit()
+        return {"rows": rows, "rollups": len(records), "users": len({key[0] for key in deltas})}
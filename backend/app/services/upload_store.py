@@ -0,0 +1,197 @@
+"""
+Yüklenen dosyalar için içerik adresli depo ve akış halinde multipart okuyucu.
+
+İstek gövdesi olay döngüsünde parça parça okunur (tamamı belleğe / geçici dosyaya alınmaz);
+dosya baytları UPLOAD_CHUNK_BYTES'lık bloklar halinde thread havuzunda diske yazılır ve
+SHA-256'sı aynı anda hesaplanır. Boyut sınırı Content-Length'ten ve akış sırasında kontrol edilir.
+
+Yerleşim:
+  UPLOAD_DIR/<sha256[:2]>/<sha256><uzantı> -> kalıcı dosya; aynı içerik ikinci kez yazılmaz.
+                                              Uzantı küçük harfe çevrilir: "a.PDF" ile "a.pdf" aynı dosyadır
+  UPLOAD_STAGING_DIR/<uuid>                -> yazılmakta olan yüklemeler (varsayılan: UPLOAD_DIR'in yanındaki
+                                              .uploads-staging); /uploads altında sunulmaz,
+                                              tamamlanınca os.replace ile (aynı dosya sistemi) taşınır
+"""
+import hashlib
+import os
+import re
+import uuid
+from anyio import to_thread
+from python_multipart.multipart import MultipartParser, parse_options_header
+from app.core.config import settings
+
+# Multipart sınırları ve başlıkları için Content-Length'e tanınan pay
+MULTIPART_OVERHEAD = 16 * 1024
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidUpload(Exception):
+    pass
+
+
+def _extension(filename: str) -> str:
+    # Depo anahtarının parçası: büyük / küçük harf farkı aynı içeriği ikinci kez yazdırmaz
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if _EXTENSION.match(extension) else ""
+
+
+class MultipartFileReader:
+    """
+    python-multipart'ın itmeli (push) ayrıştırıcısıyla gövdeden tek bir dosya alanını okur.
+    feed() her gövde parçası için o alana ait yeni baytları döner.
+    """
+
+    def __init__(self, content_type: str, field_name: str = "file"):
+        kind, options = parse_options_header(content_type or "")
+        boundary = options.get(b"boundary")
+        if kind != b"multipart/form-data" or not boundary:
+            raise InvalidUpload("Expected multipart/form-data with a boundary")
+        self.field_name = field_name.encode()
+        self.filename = None
+        self.found = False
+        self.complete = False
+        self._pending = []
+        self._in_target = False
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, chunk: bytes) -> bytes:
+        self._parser.write(chunk)
+        data = b"".join(self._pending)
+        self._pending.clear()
+        return data
+
+    def finish(self):
+        self._parser.finalize()
+        if not self.found:
+            raise InvalidUpload(f"Missing file field '{self.field_name.decode()}'")
+        if not self.complete:
+            raise InvalidUpload("Upload ended before the file part was complete")
+
+    # --- AYRIŞTIRICI GERİ ÇAĞRILARI ---
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field, self._header_value = b"", b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        # Aynı adlı ikinci dosya alanı yok sayılır
+        self._in_target = (not self.found and options.get(b"name") == self.field_name
+                           and b"filename" in options)
+        if self._in_target:
+            self.found = True
+            self.filename = os.path.basename(options[b"filename"].decode("utf-8", "replace").replace("\\", "/"))
+
+    def _on_part_data(self, data, start, end):
+        if self._in_target:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_target:
+            self.complete = True
+            self._in_target = False
+
+
+class _PendingUpload:
+    """Geçici dosya + SHA-256; metotlar thread havuzunda çalışır"""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, uuid.uuid4().hex)
+        self.file = open(self.path, "wb")
+        self.hash = hashlib.sha256()
+
+    def write(self, data: bytes):
+        self.hash.update(data)
+        self.file.write(data)
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ContentAddressedStore:
+    def __init__(self, directory: str = None, max_bytes: int = None, chunk_bytes: int = None,
+                 staging_directory: str = None):
+        self.directory = directory or settings.UPLOAD_DIR
+        self.staging_directory = staging_directory or settings.UPLOAD_STAGING_DIR or os.path.join(
+            os.path.dirname(os.path.abspath(self.directory)), ".uploads-staging")
+        self.max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+        self.chunk_bytes = chunk_bytes or settings.UPLOAD_CHUNK_BYTES
+
+    def check_content_length(self, content_length):
+        """Gövde tamamen okunmadan, başlıktaki uzunluk sınırı açıkça aşıyorsa reddeder"""
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes + MULTIPART_OVERHEAD:
+            raise UploadTooLarge(f"File exceeds the {self.max_bytes} byte limit")
+
+    async def save_multipart(self, body, content_type: str, field_name: str = "file"):
+        """
+        body: gövde parçalarının async iterator'ı (request.stream()).
+        {"sha256", "size", "path" (UPLOAD_DIR'e göre saklanan ad), "original_filename" (istemcinin verdiği ad),
+        "deduplicated"} döner.
+        """
+        reader = MultipartFileReader(content_type, field_name)
+        pending = await to_thread.run_sync(_PendingUpload, self.staging_directory)
+        try:
+            size = 0
+            buffer = bytearray()
+            async for chunk in body:
+                data = reader.feed(chunk)
+                if not data:
+                    continue
+                size += len(data)
+                if size > self.max_bytes:
+                    raise UploadTooLarge(f"File exceeds the {self.max_bytes} byte limit")
+                buffer += data
+                if len(buffer) >= self.chunk_bytes:
+                    await to_thread.run_sync(pending.write, bytes(buffer))
+                    buffer.clear()
+            reader.finish()
+            if buffer:
+                await to_thread.run_sync(pending.write, bytes(buffer))
+            return await to_thread.run_sync(self._commit, pending, size, reader.filename)
+        except BaseException:
+            # İptal edilen istekte await yapılamayabilir; tek unlink doğrudan çalıştırılır
+            pending.discard()
+            raise
+
+    def _commit(self, pending: _PendingUpload, size: int, filename: str):
+        pending.file.close()
+        digest = pending.hash.hexdigest()
+        relative = f"{digest[:2]}/{digest}{_extension(filename)}"
+        final = os.path.join(self.directory, relative)
+        deduplicated = os.path.exists(final)
+        if deduplicated:
+            # Aynı içerik zaten depoda: yeni kopya yazılmaz
+            os.remove(pending.path)
+        else:
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(pending.path, final)
+        return {"sha256": digest, "size": size, "path": relative, "original_filename": filename,
+                "deduplicated": deduplicated}
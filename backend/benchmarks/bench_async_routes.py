@@ -0,0 +1,206 @@
+"""
+Sıcak rotalar için sync (thread havuzu) ve async (asyncio sürücü) yolların karşılaştırması.
+
+İki sunucu aynı veritabanına karşı ayağa kaldırılır:
+  sync   -> rotalar `def` + SessionLocal (eski yol, Starlette thread havuzunda çalışır)
+  async  -> uygulamanın kendi rotaları (`async def` + AsyncSessionLocal)
+Her rota için eşzamanlı istemcilerle saniyedeki istek sayısı ve gecikme ölçülür.
+
+Varsayılan olarak geçici bir SQLite dosyası (aiosqlite) kullanır; asıl fark ağ gecikmesi olan
+MySQL'de görülür, bunun için DATABASE_URL verin (DİKKAT: tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_async_routes.py --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import multiprocessing
+import time
+from contextlib import asynccontextmanager
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_async_routes.db')}"
+# Sonuç ve katalog önbellekleri kapalı: her istek veritabanına gitsin
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["CATALOGUE_CACHE_ENABLED"] = "false"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+import httpx
+import uvicorn
+from anyio import to_thread
+from fastapi import FastAPI, Depends
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.database import engine, Base, get_db
+from app.core.jwt import create_access_token
+from app.core.migrations import run_migrations
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.schemas.history import HistoryCreate
+from app.services.history_service import HistoryService
+from app.services.questions_service import QuestionService
+from app.services.recommendation_service import RecommendationService
+from app.api.routes import history, questions, recommendation
+
+STUDENTS = 500
+LESSONS = 20
+QUESTIONS_PER_LESSON = 30
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(STUDENTS)])
+        conn.execute(insert(Lesson), [{"title": f"Lesson {i}", "difficulty": DifficultyType.MEDIUM}
+                                      for i in range(LESSONS)])
+        conn.execute(insert(Question), [{
+            "lesson_id": l + 1, "content": "Q?", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1}
+            for l in range(LESSONS) for n in range(QUESTIONS_PER_LESSON)])
+
+
+def threadpool_lifespan(tokens: int):
+    @asynccontextmanager
+    async def lifespan(app):
+        # Thread havuzu sunucunun olay döngüsünde ayarlanır
+        to_thread.current_default_thread_limiter().total_tokens = tokens
+        yield
+    return lifespan
+
+
+def sync_app(threadpool: int):
+    """Dönüştürmeden önceki rotaların birebir sync karşılıkları"""
+    app = FastAPI(lifespan=threadpool_lifespan(threadpool))
+    history_service = HistoryService()
+    question_service = QuestionService()
+    recommendation_service = RecommendationService()
+
+    @app.post("/history/submit")
+    def submit_answer(history_data: HistoryCreate, user_id: int, db: Session = Depends(get_db)):
+        history_service.submit_answer(db, user_id, history_data)
+        return {"ok": True}
+
+    @app.get("/questions/lesson/{lesson_id}")
+    def get_questions_by_lesson(lesson_id: int, db: Session = Depends(get_db)):
+        return [q.id for q in question_service.get_lesson_questions(db, lesson_id)]
+
+    @app.get("/recommendation/next-step/{user_id}")
+    def get_ai_recommendation(user_id: int, db: Session = Depends(get_db)):
+        return recommendation_service.get_next_step(db, user_id)
+
+    return app
+
+
+def async_app(threadpool: int):
+    app = FastAPI(lifespan=threadpool_lifespan(threadpool))
+    app.include_router(history.router)
+    app.include_router(questions.router)
+    app.include_router(recommendation.router)
+    return app
+
+
+def run_server(mode: str, port: int, threadpool: int):
+    app = sync_app(threadpool) if mode == "sync" else async_app(threadpool)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve(mode: str, port: int, threadpool: int):
+    """Sunucu ayrı süreçte çalışır; yük üreten istemciyle aynı GIL'i paylaşmaz"""
+    process = multiprocessing.Process(target=run_server, args=(mode, port, threadpool), daemon=True)
+    process.start()
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+
+def make_request(client: httpx.AsyncClient, route: str, rng: random.Random, tokens: list):
+    user_id = rng.randint(1, STUDENTS)
+    # Uygulama rotaları öğrencinin kendi token'ını ister (sync kopyalar başlığı yok sayar)
+    headers = {"Authorization": f"Bearer {tokens[user_id - 1]}"}
+    if route == "submit":
+        return client.post(f"/history/submit?user_id={user_id}", headers=headers, json={
+            "question_id": rng.randint(1, LESSONS * QUESTIONS_PER_LESSON),
+            "given_answer": rng.choice("ABCD"), "time_spent_seconds": rng.randint(3, 60)})
+    if route == "lesson":
+        return client.get(f"/questions/lesson/{rng.randint(1, LESSONS)}")
+    return client.get(f"/recommendation/next-step/{user_id}", headers=headers)
+
+
+async def load(port: int, route: str, requests: int, concurrency: int):
+    rng = random.Random(11)
+    tokens = [create_access_token({"sub": f"student{i}@example.com", "role": "student", "id": i + 1})
+              for i in range(STUDENTS)]
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await make_request(client, route, rng, tokens)
+                    errors += response.status_code >= 400
+                except httpx.TransportError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--threadpool", type=int, default=40, help="Starlette thread havuzu boyutu (varsayılan 40)")
+    # SQLite eşzamanlı yazmaları kilitle sıraya koyar; submit karşılaştırması MySQL'de anlamlıdır
+    default_routes = "lesson,next_step" if engine.dialect.name == "sqlite" else "lesson,next_step,submit"
+    parser.add_argument("--routes", default=default_routes, help="lesson,next_step,submit")
+    args = parser.parse_args()
+    routes = args.routes.split(",")
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    seed()
+
+    results = {}
+    for mode, port in (("sync", 8765), ("async", 8766)):
+        process = serve(mode, port, args.threadpool)
+        for route in routes:
+            results[(mode, route)] = asyncio.run(load(port, route, args.requests, args.concurrency))
+        process.terminate()
+        process.join()
+
+    print(f"\n{'route':<12}{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for route in routes:
+        for mode in ("sync", "async"):
+            r = results[(mode, route)]
+            print(f"{route:<12}{mode:<8}{r['rps']:>10.0f}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['errors']:>8}")
+        print(f"{'':<12}{'gain':<8}{results[('async', route)]['rps'] / results[('sync', route)]['rps']:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
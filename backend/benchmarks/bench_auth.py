@@ -0,0 +1,99 @@
+"""
+Kimlik doğrulama maliyeti: her istekte JWT imza doğrulaması + kullanıcı satırı okuma (eski yol)
+ile token / kullanıcı önbelleği üzerinden get_current_user karşılaştırması.
+
+  decode      -> jwt.decode (HS256 imza + exp kontrolü)
+  decode+c    -> decode_token (TokenCache)
+  user        -> get_current_user, önbellekler kapalı (her seferinde jwt.decode + SELECT)
+  user+c      -> get_current_user, TokenCache + kısa süreli kullanıcı önbelleği
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; MySQL için DATABASE_URL verin
+(DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_auth.py --users 500 --calls 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_auth.db')}"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from jose import jwt
+from sqlalchemy import insert
+from app.core.database import engine, async_engine, Base
+from app.core.migrations import run_migrations
+from app.core.jwt import create_access_token, SECRET_KEY, ALGORITHM
+from app.core.cache import result_cache
+from app.core.security import token_cache, decode_token, get_current_user
+from app.models.user import User
+
+
+def seed(users: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(users)])
+
+
+async def timed(fn, tokens: list, calls: int):
+    rng = random.Random(5)
+    picks = [rng.choice(tokens) for _ in range(calls)]
+    start = time.perf_counter()
+    for token in picks:
+        result = fn(token)
+        if asyncio.iscoroutine(result):
+            await result
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def measure(tokens: list, calls: int):
+    def uncached(fn):
+        async def run(token):
+            token_cache._data.clear()
+            result_cache.enabled = False
+            try:
+                return await fn(token) if asyncio.iscoroutinefunction(fn) else fn(token)
+            finally:
+                result_cache.enabled = True
+        return run
+
+    results = {
+        "decode": await timed(lambda t: jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM]), tokens, calls),
+        "decode+c": await timed(decode_token, tokens, calls),
+        "user": await timed(uncached(get_current_user), tokens, calls),
+        "user+c": await timed(get_current_user, tokens, calls),
+    }
+    # aiosqlite bağlantı iş parçacıkları bu olay döngüsüyle birlikte kapanmalı
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}, {args.users} users")
+    seed(args.users)
+    tokens = [create_access_token({"sub": f"student{i}@example.com", "role": "student", "id": i + 1})
+              for i in range(args.users)]
+
+    print(f"\n{'mode':<10}{'us/call':>10}")
+    for mode, us in asyncio.run(measure(tokens, args.calls)).items():
+        print(f"{mode:<10}{us:>10.1f}")
+    print(f"\ntoken cache: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
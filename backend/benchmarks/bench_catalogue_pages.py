@@ -0,0 +1,104 @@
+"""
+Ders / soru listeleri: tüm satırlar + tüm sütunlar (eski /lessons/) ile keyset sayfa + özet projeksiyon.
+
+Katalog büyüdükçe (ders sayısı) cevap boyutu ve süresi ölçülür:
+  full     -> LessonRepository.get_all + LessonResponse (content_text dahil)
+  page     -> ilk sayfa, özet görünüm (list_summaries, limit 100)
+  deep     -> son sayfalardan biri (after = son id - 100); OFFSET olmadığı için ilk sayfayla aynı maliyette
+Önbellek devre dışıdır, her ölçüm veritabanına gider.
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; MySQL için DATABASE_URL verin
+(DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_catalogue_pages.py --sizes 1000,10000,30000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_catalogue_pages.db')}"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from app.core.database import engine, async_engine, Base, SessionLocal, AsyncSessionLocal
+from app.core.migrations import run_migrations
+from app.models.lessons import Lesson, DifficultyType
+from app.repositories.lessons_repository import LessonRepository, AsyncLessonRepository
+from app.schemas.lessons import LessonResponse, LessonSummary
+
+CONTENT_BYTES = 4000
+PAGE = 100
+
+
+def seed(lessons: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    difficulties = list(DifficultyType)
+    with engine.begin() as conn:
+        for start in range(0, lessons, 5000):
+            conn.execute(insert(Lesson), [{
+                "title": f"Lesson {i}", "description": "Short description " * 5,
+                "content_text": "x" * CONTENT_BYTES, "difficulty": difficulties[i % 3]}
+                for i in range(start, min(lessons, start + 5000))])
+
+
+async def timed(fn, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        body = await fn()
+    return (time.perf_counter() - start) / repeats * 1000, len(body)
+
+
+async def measure(lessons: int, repeats: int):
+    full_adapter = TypeAdapter(List[LessonResponse])
+    page_adapter = TypeAdapter(List[LessonSummary])
+    repo, async_repo = LessonRepository(), AsyncLessonRepository()
+
+    async def full():
+        db = SessionLocal()
+        try:
+            return full_adapter.dump_json(full_adapter.validate_python(repo.get_all(db), from_attributes=True))
+        finally:
+            db.close()
+
+    def page(after):
+        async def run():
+            async with AsyncSessionLocal() as db:
+                rows = await async_repo.list_summaries(db, after, PAGE + 1)
+                return page_adapter.dump_json(page_adapter.validate_python(rows[:PAGE], from_attributes=True))
+        return run
+
+    results = {
+        "full": await timed(full, repeats),
+        "page": await timed(page(None), repeats),
+        "deep": await timed(page(lessons - PAGE), repeats),
+    }
+    # aiosqlite bağlantı iş parçacıkları bu olay döngüsüyle birlikte kapanmalı
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,30000")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"\n{'lessons':>8}{'mode':>6}{'ms':>10}{'bytes':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        seed(size)
+        for mode, (ms, size_bytes) in asyncio.run(measure(size, args.repeats)).items():
+            print(f"{size:>8}{mode:>6}{ms:>10.2f}{size_bytes:>14,}")
+
+
+if __name__ == "__main__":
+    main()
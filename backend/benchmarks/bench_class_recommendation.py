@@ -0,0 +1,104 @@
+"""
+Tüm sınıf için sonraki adım önerisi: öğrenci başına özet + karar ağacı ile toplu (NumPy) motorun karşılaştırması.
+
+  per-student -> her öğrenci için get_user_summary (GROUP BY) + build_recommendation (önbelleksiz);
+                 /recommendation/next-step'i öğrenci sayısı kadar çağırmanın sunucu tarafı maliyeti
+  batch       -> ClassRecommendationService.iter_recommendations (500 öğrencilik parçalar, tek sorgu / parça)
+İki yolun sonuçlarının aynı olduğu da doğrulanır.
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; MySQL için DATABASE_URL verin
+(DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_class_recommendation.py --students 2000 --answers-per-student 150
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_class_recommendation.db')}"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert
+from app.core.database import engine, Base, SessionLocal
+from app.core.migrations import run_migrations
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.models.history import History
+from app.services.history_service import HistoryService
+from app.services.recommendation_service import RecommendationService
+from app.services.class_recommendation import ClassRecommendationService
+
+LESSONS = 12
+QUESTIONS_PER_LESSON = 50
+INSERT_CHUNK = 50000
+
+
+def seed(students: int, answers_per_student: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    rng = random.Random(8)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(students)])
+        conn.execute(insert(Lesson), [{"title": f"Lesson {i}", "difficulty": DifficultyType.MEDIUM}
+                                      for i in range(LESSONS)])
+        conn.execute(insert(Question), [{
+            "lesson_id": l + 1, "content": "Q?", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1}
+            for l in range(LESSONS) for n in range(QUESTIONS_PER_LESSON)])
+        rows = []
+        for user_id in range(1, students + 1):
+            skill = rng.random()
+            for _ in range(rng.randint(0, 2 * answers_per_student)):
+                rows.append({
+                    "user_id": user_id, "question_id": rng.randint(1, LESSONS * QUESTIONS_PER_LESSON),
+                    "given_answer": "A", "is_correct": rng.random() < skill, "time_spent_seconds": rng.randint(3, 60)})
+            if len(rows) >= INSERT_CHUNK:
+                conn.execute(insert(History), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(History), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--answers-per-student", type=int, default=150)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    seed(args.students, args.answers_per_student)
+    history_service = HistoryService()
+    recommendation_service = RecommendationService()
+    class_service = ClassRecommendationService()
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for (user_id,) in db.query(User.id).filter(User.role == "student").order_by(User.id)]
+
+        start = time.perf_counter()
+        single = [recommendation_service.build_recommendation(history_service._compute_user_summary(db, user_id))
+                  for user_id in user_ids]
+        single_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = list(class_service.iter_recommendations(db))
+        batch_s = time.perf_counter() - start
+
+        assert [{k: v for k, v in b.items() if k not in ("user_id", "username")} for b in batch] == single
+        print(f"\n{'mode':<14}{'students':>10}{'total s':>10}{'ms/student':>12}")
+        print(f"{'per-student':<14}{len(single):>10,}{single_s:>10.2f}{single_s / len(single) * 1000:>12.3f}")
+        print(f"{'batch':<14}{len(batch):>10,}{batch_s:>10.2f}{batch_s / len(batch) * 1000:>12.3f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
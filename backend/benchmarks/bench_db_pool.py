@@ -0,0 +1,108 @@
+"""
+Bağlantı havuzu ayarlarının eşzamanlı yük altındaki davranışı.
+
+Aynı iş yükü (checkout -> kısa sorgu -> iade) farklı havuz ayarlarıyla çok sayıda iş parçacığından
+çalıştırılır; saniyedeki istek, checkout bekleme süresi, zaman aşımı ve doluluk raporlanır.
+
+Varsayılan olarak geçici bir SQLite dosyası kullanılır ve her sorguya --latency-ms kadar gecikme
+eklenir; böylece ağ üzerinden MySQL'e gidiyormuş gibi bağlantılar meşgul kalır ve havuz dolar
+(ping de bir gidiş-dönüş sayılır). Gerçek MySQL için DATABASE_URL verin (gecikme eklenmez).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_db_pool.py --threads 64 --requests 4000 --latency-ms 2
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_db_pool.db')}"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import create_engine, text, exc
+from app.core.database import DATABASE_URL
+from app.core.db_pool import engine_options, install_pool_events, pool_stats
+
+# (ad, havuz ayarları)
+CONFIGS = [
+    ("sqlalchemy default (5+10, ping always)", {"pool_size": 5, "max_overflow": 10, "pre_ping": "always"}),
+    ("10+20, ping always", {"pool_size": 10, "max_overflow": 20, "pre_ping": "always"}),
+    ("10+20, ping idle", {"pool_size": 10, "max_overflow": 20, "pre_ping": "idle"}),
+    ("32+32, ping idle", {"pool_size": 32, "max_overflow": 32, "pre_ping": "idle"}),
+    ("4+0, ping never (undersized)", {"pool_size": 4, "max_overflow": 0, "pre_ping": "never"}),
+]
+
+
+def slow_sqlite(latency: float):
+    """Her execute'a ağ gecikmesi ekleyen sqlite3 bağlantı sınıfı"""
+    class SlowCursor(sqlite3.Cursor):
+        def execute(self, *args, **kwargs):
+            time.sleep(latency)
+            return super().execute(*args, **kwargs)
+
+    class SlowConnection(sqlite3.Connection):
+        def cursor(self, factory=SlowCursor):
+            return super().cursor(factory)
+
+    return SlowConnection
+
+
+def build_engine(config: dict, latency: float, timeout: float):
+    options = engine_options(DATABASE_URL, pool_timeout=timeout, **config)
+    if DATABASE_URL.startswith("sqlite"):
+        options["connect_args"] = {"factory": slow_sqlite(latency), "check_same_thread": False}
+    engine = create_engine(DATABASE_URL, **options)
+    install_pool_events(engine, pre_ping=config["pre_ping"])
+    return engine
+
+
+def run(engine, threads: int, requests: int, queries: int):
+    errors = 0
+
+    def job(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                for _ in range(queries):
+                    conn.execute(text("SELECT 1")).scalar()
+        except exc.TimeoutError:
+            errors += 1
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(job, range(requests)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, latencies[int(len(latencies) * 0.99)] * 1000, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--queries", type=int, default=3, help="istek başına sorgu sayısı")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="SQLite'ta sorgu başına eklenen gecikme")
+    parser.add_argument("--timeout", type=float, default=2.0, help="pool_timeout (saniye)")
+    args = parser.parse_args()
+
+    print(f"Database: {DATABASE_URL}, {args.threads} threads, {args.requests} requests x {args.queries} queries")
+    print(f"\n{'config':<40}{'req/s':>8}{'p99 ms':>9}{'wait p99':>10}{'wait max':>10}"
+          f"{'timeouts':>10}{'peak sat':>10}")
+    for name, config in CONFIGS:
+        engine = build_engine(config, args.latency_ms / 1000, args.timeout)
+        rps, p99, _ = run(engine, args.threads, args.requests, args.queries)
+        stats = pool_stats(engine)
+        print(f"{name:<40}{rps:>8.0f}{p99:>9.1f}{stats['checkout_wait_ms']['p99']:>10.1f}"
+              f"{stats['checkout_wait_ms']['max']:>10.1f}{stats['timeouts']:>10}"
+              f"{stats['peak_saturation']:>10.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
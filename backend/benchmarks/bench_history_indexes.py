@@ -0,0 +1,155 @@
+"""
+histories / questions sıcak erişim yolları için indeks benchmark'ı.
+
+Tabloyu milyonlarca satırla doldurur, 0002_hot_path_indexes migration'ından ÖNCE ve SONRA
+her sorgunun planını (EXPLAIN) ve süresini karşılaştırır.
+Varsayılan olarak geçici bir SQLite dosyası kullanır; MySQL için DATABASE_URL verin
+(DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_history_indexes.py --rows 2000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_history_indexes.db')}"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert, text
+from app.core.database import engine, Base
+from app.core.migrations import MIGRATIONS, HOT_PATH_INDEXES
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.models.history import History
+from app.models.progress import UserProgress
+
+CHUNK = 50000
+
+# (ad, SQL, parametreler) — servislerdeki sorguların karşılıkları
+QUERIES = [
+    ("count correct (submit_answer eski yolu)",
+     "SELECT COUNT(*) FROM histories WHERE user_id = :uid AND is_correct = 1", {}),
+    ("user history (get_user_history)",
+     "SELECT * FROM histories WHERE user_id = :uid", {}),
+    ("question stats (question_id, item stats rebuild)",
+     "SELECT COUNT(*), SUM(is_correct), AVG(time_spent_seconds) FROM histories WHERE question_id = :qid", {}),
+    ("user summary (histories ⨝ questions GROUP BY lesson)",
+     "SELECT q.lesson_id, COUNT(h.id), SUM(h.is_correct) FROM histories h "
+     "JOIN questions q ON q.id = h.question_id WHERE h.user_id = :uid GROUP BY q.lesson_id", {}),
+    ("user trend (solved_at aralığı)",
+     "SELECT COUNT(*) FROM histories WHERE user_id = :uid AND solved_at >= :since", {}),
+    ("recent answers (solved_at)",
+     "SELECT COUNT(*) FROM histories WHERE solved_at >= :recent", {}),
+    ("lesson questions by difficulty",
+     "SELECT id FROM questions WHERE lesson_id = :lid AND difficulty_level = 3", {}),
+]
+
+
+def seed(rows: int, users: int, lessons: int, questions_per_lesson: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    # Migration öncesi durumu taklit etmek için yeni indeksler kaldırılır
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in HOT_PATH_INDEXES:
+                    index.drop(bind=conn)
+
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(users)])
+        conn.execute(insert(Lesson), [{"title": f"Lesson {i}", "difficulty": DifficultyType.MEDIUM}
+                                      for i in range(lessons)])
+        conn.execute(insert(Question), [{
+            "lesson_id": l + 1, "content": "Q?", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1}
+            for l in range(lessons) for n in range(questions_per_lesson)])
+
+    rng = random.Random(7)
+    total_questions = lessons * questions_per_lesson
+    start_day = datetime(2025, 1, 1)
+    inserted = 0
+    while inserted < rows:
+        size = min(CHUNK, rows - inserted)
+        with engine.begin() as conn:
+            conn.execute(insert(History), [{
+                "user_id": rng.randint(1, users),
+                "question_id": rng.randint(1, total_questions),
+                "given_answer": "A",
+                "is_correct": rng.random() < 0.6,
+                "time_spent_seconds": rng.randint(3, 90),
+                "solved_at": start_day + timedelta(minutes=rng.randint(0, 525600)),
+            } for _ in range(size)])
+        inserted += size
+        print(f"\r  seeded {inserted:,}/{rows:,} history rows", end="", flush=True)
+    print()
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
+        else:
+            conn.execute(text("ANALYZE TABLE histories, questions, users"))
+
+
+def explain(conn, sql, params):
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + sql), params).fetchall()
+    if engine.dialect.name == "sqlite":
+        return "; ".join(str(r[-1]) for r in rows)
+    return "; ".join(f"{r._mapping.get('table')}:{r._mapping.get('type')}:{r._mapping.get('key')}" for r in rows)
+
+
+def measure(label, repeats, params):
+    print(f"\n=== {label} ===")
+    results = {}
+    with engine.connect() as conn:
+        for name, sql, extra in QUERIES:
+            p = {**params, **extra}
+            plan = explain(conn, sql, p)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                conn.execute(text(sql), p).fetchall()
+            elapsed = (time.perf_counter() - start) / repeats * 1000
+            results[name] = elapsed
+            print(f"{name:<55} {elapsed:>9.2f} ms   plan: {plan}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--lessons", type=int, default=200)
+    parser.add_argument("--questions-per-lesson", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    seed(args.rows, args.users, args.lessons, args.questions_per_lesson)
+    params = {"uid": args.users // 2, "qid": 17, "lid": 3,
+              "since": datetime(2025, 11, 1), "recent": datetime(2025, 12, 30)}
+
+    before = measure("BEFORE 0002_hot_path_indexes", args.repeats, params)
+
+    start = time.perf_counter()
+    step = dict(MIGRATIONS)["0002_hot_path_indexes"]
+    with engine.begin() as conn:
+        step(conn)
+    print(f"\nmigration 0002_hot_path_indexes took {time.perf_counter() - start:.1f} s")
+
+    after = measure("AFTER 0002_hot_path_indexes", args.repeats, params)
+
+    print("\n=== SPEEDUP ===")
+    for name in before:
+        print(f"{name:<55} {before[name] / max(after[name], 1e-6):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Öğretmen raporları: canlı GROUP BY sorguları ile sütunsal anlık görüntünün karşılaştırması.
+
+  live      -> HistoryService.get_class_analytics / get_lesson_report (canlı tablolar)
+  snapshot  -> aynı raporlar source="snapshot" ile (mmap'li NumPy dosyaları, veritabanına sorgu yok)
+Ayrıca tam ve artımlı aktarım süreleri ile görüntünün diskteki boyutu ölçülür.
+
+Varsayılan olarak geçici bir SQLite dosyası ve geçici bir görüntü klasörü kullanır; MySQL için
+DATABASE_URL verin (DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_history_snapshot.py --students 500 --answers 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_history_snapshot.db')}"
+os.environ.setdefault("ANALYTICS_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="bench_snapshot_"))
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.database import engine, Base, SessionLocal
+from app.core.migrations import run_migrations
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.models.history import History
+from app.services.history_service import HistoryService
+from app.services.history_snapshot import HistorySnapshotExporter
+
+LESSONS = 10
+QUESTIONS_PER_LESSON = 100
+INSERT_CHUNK = 50000
+
+
+def seed_answers(rng, students: int, count: int, first_day: int):
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        for start in range(0, count, INSERT_CHUNK):
+            conn.execute(insert(History), [{
+                "user_id": rng.randint(1, students), "question_id": rng.randint(1, LESSONS * QUESTIONS_PER_LESSON),
+                "given_answer": "A", "is_correct": rng.random() < 0.7, "time_spent_seconds": rng.randint(3, 60),
+                "solved_at": now - timedelta(days=first_day, seconds=rng.randint(0, 86399))}
+                for _ in range(min(INSERT_CHUNK, count - start))])
+
+
+def seed(students: int, answers: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(students)])
+        conn.execute(insert(Lesson), [{"title": f"Lesson {i}", "difficulty": DifficultyType.MEDIUM}
+                                      for i in range(LESSONS)])
+        conn.execute(insert(Question), [{
+            "lesson_id": l + 1, "content": "Q?", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1}
+            for l in range(LESSONS) for n in range(QUESTIONS_PER_LESSON)])
+    seed_answers(random.Random(5), students, answers, first_day=1)
+
+
+def timed(fn, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def directory_size(path: str):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--answers", type=int, default=500000)
+    parser.add_argument("--appended", type=int, default=20000, help="Artımlı aktarım için eklenecek cevap")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"Snapshot: {settings.ANALYTICS_SNAPSHOT_DIR}")
+    seed(args.students, args.answers)
+    history_service = HistoryService()
+    exporter = HistorySnapshotExporter()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = exporter.export(db, full=True)
+        print(f"full export: {result['rows']:,} rows, {result['segments']} segments in "
+              f"{time.perf_counter() - start:.1f} s ({directory_size(exporter.directory) / 1e6:.1f} MB)")
+
+        seed_answers(random.Random(6), args.students, args.appended, first_day=0)
+        start = time.perf_counter()
+        result = exporter.export(db)
+        print(f"incremental export: +{result['appended']:,} rows in {time.perf_counter() - start:.2f} s")
+
+        reports = {
+            "class": lambda source: history_service.get_class_analytics(
+                db, limit=50, sort_by="accuracy", order="desc", source=source),
+            "lesson": lambda source: history_service.get_lesson_report(db, 1, source),
+            # Canlı özet result_cache'i atlayarak (her seferinde GROUP BY) ölçülür
+            "student": lambda source: (history_service._compute_user_summary(db, 1) if source == "live"
+                                       else history_service.get_user_summary(db, 1, source)),
+        }
+        # İlk snapshot çağrısı görüntüyü yükler ve tablo geneli toplamları hesaplar
+        first_ms, _ = timed(lambda: reports["class"]("snapshot"), 1)
+        print(f"\nfirst snapshot report (load + totals): {first_ms:.1f} ms")
+
+        print(f"\n{'report':<10}{'live ms':>12}{'snapshot ms':>14}")
+        for name, report in reports.items():
+            live_ms, live = timed(lambda: report("live"), args.repeats)
+            snap_ms, snap = timed(lambda: report("snapshot"), args.repeats)
+            snap.pop("snapshot", None)
+            assert live == snap, f"{name} report differs between live and snapshot"
+            print(f"{name:<10}{live_ms:>12.2f}{snap_ms:>14.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
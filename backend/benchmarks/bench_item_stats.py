@@ -0,0 +1,152 @@
+"""
+Soru bazlı madde istatistikleri: ham geçmiş taraması ile çevrimiçi güncellenen question_item_stats tablosu.
+
+  raw      -> dersin her sorusu için tüm cevaplar okunup p-değeri, süre yüzdelikleri, şık dağılımı
+              ve ayırt edicilik Python'da hesaplanır (eski get_question_stats yolu)
+  online   -> ItemStatsService.get_item_stats (hazır satırlar, tek sorgu)
+Ayrıca submit_answer'ın madde istatistiği kaydıyla ve kayıtsız süresi, bekleyen cevapların
+işlenme (fold) süresi ölçülür.
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; MySQL için DATABASE_URL verin
+(DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_item_stats.py --answers 300000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_item_stats.db')}"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert
+from app.core.database import engine, Base, SessionLocal
+from app.core.migrations import run_migrations
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.models.history import History
+from app.models.ability import UserAbility
+from app.schemas.history import HistoryCreate
+from app.services.history_service import HistoryService
+from app.services import item_stats_engine
+
+LESSONS = 10
+QUESTIONS_PER_LESSON = 100
+INSERT_CHUNK = 50000
+
+
+def seed(students: int, answers: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    rng = random.Random(4)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(students)])
+        conn.execute(insert(UserAbility), [{"user_id": i + 1, "theta": rng.gauss(0, 1), "attempts": 0}
+                                           for i in range(students)])
+        conn.execute(insert(Lesson), [{"title": f"Lesson {i}", "difficulty": DifficultyType.MEDIUM}
+                                      for i in range(LESSONS)])
+        conn.execute(insert(Question), [{
+            "lesson_id": l + 1, "content": "Q?", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1}
+            for l in range(LESSONS) for n in range(QUESTIONS_PER_LESSON)])
+        for start in range(0, answers, INSERT_CHUNK):
+            conn.execute(insert(History), [{
+                "user_id": rng.randint(1, students), "question_id": rng.randint(1, LESSONS * QUESTIONS_PER_LESSON),
+                "given_answer": rng.choice("AABCD"), "is_correct": False, "time_spent_seconds": rng.randint(3, 60)}
+                for _ in range(min(INSERT_CHUNK, answers - start))])
+
+
+def raw_lesson_stats(db, lesson_id: int, thetas: dict):
+    """Tablo olmadan: dersin her sorusunun tüm cevapları okunur"""
+    report = []
+    question_ids = [q for (q,) in db.query(Question.id).filter(Question.lesson_id == lesson_id)]
+    for question_id in question_ids:
+        rows = db.query(History).filter(History.question_id == question_id).all()
+        if not rows:
+            continue
+        correct = [h.given_answer == "A" for h in rows]
+        times = sorted(h.time_spent_seconds for h in rows)
+        abilities = [thetas[h.user_id] for h in rows]
+        n, c = len(rows), sum(correct)
+        report.append({
+            "question_id": question_id,
+            "p_value": c / n,
+            "p50": times[len(times) // 2],
+            "p90": times[int(len(times) * 0.9)],
+            "mean": statistics.fmean(times),
+            "options": {o: sum(1 for h in rows if h.given_answer == o) for o in "ABCD"},
+            "discrimination": item_stats_engine.point_biserial(
+                n, c, sum(abilities), sum(a * a for a in abilities),
+                sum(a for a, ok in zip(abilities, correct) if ok)),
+        })
+    return report
+
+
+def timed(fn, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--answers", type=int, default=300000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--submits", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    seed(args.students, args.answers)
+    history_service = HistoryService()
+    item_stats_service = history_service.item_stats_service
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rebuilt = item_stats_service.rebuild(db)
+        print(f"rebuild: {rebuilt['rows']:,} answers -> {rebuilt['questions']:,} questions "
+              f"in {time.perf_counter() - start:.1f} s")
+
+        thetas = {a.user_id: a.theta for a in db.query(UserAbility)}
+        raw_ms, raw = timed(lambda: raw_lesson_stats(db, 1, thetas), max(1, args.repeats // 5))
+        online_ms, online = timed(lambda: item_stats_service.get_item_stats(db, lesson_id=1), args.repeats)
+        flagged_ms, flagged = timed(lambda: item_stats_service.get_item_stats(db, flagged=True), args.repeats)
+
+        print(f"\n{'mode':<24}{'questions':>10}{'ms':>10}")
+        print(f"{'raw (lesson)':<24}{len(raw):>10,}{raw_ms:>10.1f}")
+        print(f"{'online (lesson)':<24}{online['total']:>10,}{online_ms:>10.2f}")
+        print(f"{'online (all, flagged)':<24}{flagged['total']:>10,}{flagged_ms:>10.2f}")
+
+        # Cevap başına yazma maliyeti: madde istatistiği güncellemesi açık / kapalı
+        rng = random.Random(9)
+
+        def submit():
+            history_service.submit_answer(db, rng.randint(1, args.students), HistoryCreate(
+                question_id=rng.randint(1, LESSONS * QUESTIONS_PER_LESSON), given_answer="A", time_spent_seconds=10))
+
+        with_ms, _ = timed(submit, args.submits)
+        item_stats_service.record_answers = lambda *args, **kwargs: None
+        without_ms, _ = timed(submit, args.submits)
+        del item_stats_service.record_answers
+        print(f"\nsubmit_answer: {without_ms:.2f} ms without item stats, {with_ms:.2f} ms with item stats")
+
+        # Bekleyen cevaplar bir sonraki rapor okumasında işlenir
+        fold_ms, folded = timed(lambda: item_stats_service.fold(db), 1)
+        print(f"fold: {folded:,} pending answers in {fold_ms:.1f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Giriş yoğunluğunda (ders başı) diğer uç noktaların gecikmesi: bcrypt istek thread'inde (eski yol)
+ile ayrı, sınırlı süreç havuzunda (password_hasher) karşılaştırması.
+
+İki sunucu aynı veritabanına karşı ayağa kaldırılır:
+  inline -> /auth/login `def` + verify_password (Starlette thread havuzunda bcrypt)
+  pool   -> uygulamanın kendi /auth/login rotası (async, bcrypt süreç havuzunda, dolunca 503)
+Her ikisinde de /history/stats/{user_id} uygulamanın kendi `def` rotasıdır (thread havuzunu kullanır).
+Önce yük yokken, sonra --logins eşzamanlı giriş isteği sürerken stats isteklerinin p50/p99 gecikmesi ölçülür.
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır (DİKKAT: DATABASE_URL verilirse tablolar
+silinip yeniden oluşturulur).
+
+Hash ayarları ortam değişkenlerinden okunur (BCRYPT_ROUNDS varsayılan olarak 10'a düşürülür).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_password_hashing.py --logins 400 --login-concurrency 200
+    BCRYPT_ROUNDS=12 PASSWORD_HASH_WORKERS=4 python benchmarks/bench_password_hashing.py
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_password_hashing.db')}"
+os.environ.setdefault("BCRYPT_ROUNDS", "10")
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from contextlib import asynccontextmanager
+import httpx
+import uvicorn
+from fastapi import FastAPI, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import engine, Base, get_db
+from app.core.migrations import run_migrations
+from app.core.jwt import create_access_token
+from app.core.password_hashing import password_hasher, compute_hash
+from app.core.security import verify_password
+from app.models.user import User
+from app.api.routes import auth, history
+
+STUDENTS = 200
+
+
+def seed(rounds: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    hashed = compute_hash("secret", rounds)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": hashed, "role": "student"} for i in range(STUDENTS)])
+
+
+def build_app(mode: str):
+    @asynccontextmanager
+    async def lifespan(app):
+        if mode == "pool":
+            password_hasher.start()
+        yield
+        password_hasher.shutdown()
+
+    app = FastAPI(lifespan=lifespan)
+    if mode == "inline":
+        class UserLogin(BaseModel):
+            email: str
+            password: str
+
+        @app.post("/auth/login")
+        def login(user: UserLogin, db: Session = Depends(get_db)):
+            db_user = db.query(User).filter(User.email == user.email).first()
+            if not db_user or not verify_password(user.password, db_user.hashed_password):
+                raise HTTPException(status_code=401, detail="Invalid credentials")
+            return {"ok": True}
+    else:
+        app.include_router(auth.router)
+    app.include_router(history.router)
+    return app
+
+
+def run_server(mode: str, port: int):
+    uvicorn.run(build_app(mode), host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve(mode: str, port: int):
+    """Sunucu ayrı süreçte çalışır; yük üreten istemciyle aynı GIL'i paylaşmaz"""
+    # daemon değil: pool modunda sunucu kendi bcrypt işçi süreçlerini açar
+    process = multiprocessing.Process(target=run_server, args=(mode, port))
+    process.start()
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return process
+        except httpx.TransportError:
+            if not process.is_alive():
+                raise RuntimeError(f"{mode} server exited with code {process.exitcode}")
+            time.sleep(0.1)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0
+
+
+async def probe(client, tokens, stop: asyncio.Event, concurrency: int):
+    """stop ayarlanana kadar /history/stats isteklerinin gecikmeleri"""
+    rng = random.Random(3)
+    latencies = []
+
+    async def worker():
+        while not stop.is_set():
+            user_id = rng.randint(1, STUDENTS)
+            start = time.perf_counter()
+            await client.get(f"/history/stats/{user_id}",
+                             headers={"Authorization": f"Bearer {tokens[user_id - 1]}"})
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def measure(port: int, tokens: list, logins: int, login_concurrency: int, probes: int):
+    limits = httpx.Limits(max_connections=login_concurrency + probes)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        # Yük yokken
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, tokens, stop, probes))
+        await asyncio.sleep(2)
+        stop.set()
+        idle = await task
+
+        # Giriş yoğunluğu sürerken
+        statuses = []
+        semaphore = asyncio.Semaphore(login_concurrency)
+        rng = random.Random(7)
+
+        async def login():
+            async with semaphore:
+                try:
+                    response = await client.post("/auth/login", json={
+                        "email": f"student{rng.randrange(STUDENTS)}@example.com", "password": "secret"})
+                    statuses.append(response.status_code)
+                except httpx.TransportError:
+                    statuses.append(None)
+
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, tokens, stop, probes))
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        busy = await task
+
+    return {
+        "idle_p50": percentile(idle, 0.5), "idle_p99": percentile(idle, 0.99),
+        "burst_p50": percentile(busy, 0.5), "burst_p99": percentile(busy, 0.99),
+        "login_ok": statuses.count(200), "login_503": statuses.count(503),
+        "login_err": len(statuses) - statuses.count(200) - statuses.count(503), "login_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--login-concurrency", type=int, default=200)
+    parser.add_argument("--probes", type=int, default=4, help="eşzamanlı stats istemcisi")
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}, bcrypt cost {settings.BCRYPT_ROUNDS}, "
+          f"{settings.PASSWORD_HASH_WORKERS} workers + {settings.PASSWORD_HASH_MAX_PENDING} pending")
+    seed(settings.BCRYPT_ROUNDS)
+    tokens = [create_access_token({"sub": f"student{i}@example.com", "role": "student", "id": i + 1})
+              for i in range(STUDENTS)]
+
+    results = {}
+    for mode, port in (("inline", 8775), ("pool", 8776)):
+        process = serve(mode, port)
+        results[mode] = asyncio.run(measure(port, tokens, args.logins, args.login_concurrency, args.probes))
+        process.terminate()
+        process.join()
+
+    print(f"\n{'mode':<8}{'idle p50':>10}{'idle p99':>10}{'burst p50':>11}{'burst p99':>11}"
+          f"{'login ok':>10}{'login 503':>11}{'errors':>8}{'burst s':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['idle_p50']:>10.1f}{r['idle_p99']:>10.1f}{r['burst_p50']:>11.1f}{r['burst_p99']:>11.1f}"
+              f"{r['login_ok']:>10}{r['login_503']:>11}{r['login_err']:>8}{r['login_s']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
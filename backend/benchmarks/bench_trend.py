@@ -0,0 +1,134 @@
+"""
+Bir yıllık öğrenme eğilimi: ham histories taraması ile gün / hafta rollup tablosunun karşılaştırması.
+
+  raw      -> öğrencinin son 365 gündeki tüm cevapları okunup haftalara bölünür (rollup olmadan)
+  rollup   -> TrendService.get_user_trend (learning_rollups, haftalık)
+Ayrıca submit_answer'ın rollup artırımıyla ve artırımsız süresi (cevap başına yazma maliyeti) ölçülür.
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; MySQL için DATABASE_URL verin
+(DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_trend.py --answers-per-day 50 --students 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_trend.db')}"
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert, select, func
+from app.core.database import engine, Base, SessionLocal
+from app.core.migrations import run_migrations
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.models.history import History
+from app.models.trend import LearningRollup
+from app.schemas.history import HistoryCreate
+from app.services.history_service import HistoryService
+from app.services.trend_service import bucket_start
+
+LESSONS = 8
+QUESTIONS_PER_LESSON = 50
+DAYS = 365
+
+
+def seed(students: int, answers_per_day: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    rng = random.Random(3)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(students)])
+        conn.execute(insert(Lesson), [{"title": f"Lesson {i}", "difficulty": DifficultyType.MEDIUM}
+                                      for i in range(LESSONS)])
+        conn.execute(insert(Question), [{
+            "lesson_id": l + 1, "content": "Q?", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1}
+            for l in range(LESSONS) for n in range(QUESTIONS_PER_LESSON)])
+        for user_id in range(1, students + 1):
+            conn.execute(insert(History), [{
+                "user_id": user_id, "question_id": rng.randint(1, LESSONS * QUESTIONS_PER_LESSON),
+                "given_answer": "A", "is_correct": rng.random() < 0.7, "time_spent_seconds": rng.randint(3, 60),
+                "solved_at": now - timedelta(days=day, seconds=rng.randint(0, 86399))}
+                for day in range(DAYS) for _ in range(answers_per_day)])
+
+
+def raw_trend(db, user_id: int):
+    """Rollup olmadan: son 365 günün satırlarını okuyup haftalara böler"""
+    since = datetime.now(timezone.utc) - timedelta(days=DAYS)
+    weeks = {}
+    rows = db.execute(select(History.solved_at, History.is_correct, History.time_spent_seconds)
+                      .where(History.user_id == user_id, History.solved_at >= since))
+    for solved_at, is_correct, time_spent in rows:
+        counts = weeks.setdefault(bucket_start(solved_at, "week"), [0, 0, 0])
+        counts[0] += 1
+        counts[1] += 1 if is_correct else 0
+        counts[2] += time_spent
+    return sorted(weeks.items())
+
+
+def timed(fn, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--answers-per-day", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--submits", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    seed(args.students, args.answers_per_day)
+    history_service = HistoryService()
+    trend_service = history_service.trend_service
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rebuilt = trend_service.rebuild_all(db)
+        print(f"rebuild: {rebuilt['rows']:,} answers -> {rebuilt['rollups']:,} rollup rows "
+              f"in {time.perf_counter() - start:.1f} s")
+
+        user_rows = db.query(func.count(History.id)).filter(History.user_id == 1).scalar()
+        rollup_rows = db.query(func.count()).select_from(LearningRollup).filter(
+            LearningRollup.user_id == 1, LearningRollup.period == "week").scalar()
+        raw_ms, _ = timed(lambda: raw_trend(db, 1), args.repeats)
+        rollup_ms, trend = timed(lambda: trend_service.get_user_trend(db, 1, "week", DAYS), args.repeats)
+
+        print(f"\n{'mode':<8}{'rows read':>12}{'ms':>10}")
+        print(f"{'raw':<8}{user_rows:>12,}{raw_ms:>10.2f}")
+        print(f"{'rollup':<8}{rollup_rows:>12,}{rollup_ms:>10.2f}   ({len(trend['points'])} weekly points)")
+
+        # Cevap başına yazma maliyeti: rollup artırımı açık / kapalı
+        rng = random.Random(9)
+
+        def submit():
+            history_service.submit_answer(db, rng.randint(1, args.students), HistoryCreate(
+                question_id=rng.randint(1, LESSONS * QUESTIONS_PER_LESSON), given_answer="A", time_spent_seconds=10))
+
+        with_ms, _ = timed(submit, args.submits)
+        trend_service.record_answers = lambda *args, **kwargs: None
+        without_ms, _ = timed(submit, args.submits)
+        del trend_service.record_answers
+        print(f"\nsubmit_answer: {without_ms:.2f} ms without rollups, {with_ms:.2f} ms with rollups")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
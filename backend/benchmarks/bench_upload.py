@@ -0,0 +1,159 @@
+"""
+Büyük dosya yüklemeleri sürerken olay döngüsünün tepki süresi: eski yükleme yolu ile akış halinde
+içerik adresli yükleme yolunun karşılaştırması.
+
+İki sunucu ayrı süreçlerde ayağa kaldırılır:
+  legacy    -> eski /upload: `async def` + UploadFile + olay döngüsünde shutil.copyfileobj, zaman damgalı kopya
+  streaming -> uygulamanın /upload rotası (gövde parça parça okunur, diske thread'de yazılır, SHA-256 ile tekilleştirilir)
+Her ikisinde de /ping olay döngüsünde çalışan boş bir async rotadır; yüklemeler sürerken gecikmesi ölçülür.
+Yüklemelerin bir kısmı aynı içeriği taşır; diskte kalan dosya sayısı ve boyutu da raporlanır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_upload.py --uploads 24 --concurrency 8 --size-mb 20
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Rotalar paketi veritabanı modülünü yükler; bu ölçümde veritabanı kullanılmaz
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_upload.db')}"
+workdir = tempfile.mkdtemp(prefix="bench_upload_")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(workdir, "streaming"))
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, UploadFile, File
+from app.api.routes import upload
+
+LEGACY_DIR = os.path.join(workdir, "legacy")
+
+
+def build_app(mode: str):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if mode == "legacy":
+        os.makedirs(LEGACY_DIR, exist_ok=True)
+
+        @app.post("/upload")
+        async def upload_file(file: UploadFile = File(...)):
+            filename = f"{time.strftime('%Y%m%d%H%M%S')}_{time.perf_counter_ns()}_{file.filename}"
+            with open(os.path.join(LEGACY_DIR, filename), "wb+") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+            return {"filename": filename}
+    else:
+        app.include_router(upload.router)
+    return app
+
+
+def run_server(mode: str, port: int):
+    uvicorn.run(build_app(mode), host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve(mode: str, port: int):
+    """Sunucu ayrı süreçte çalışır; yük üreten istemciyle aynı GIL'i paylaşmaz"""
+    process = multiprocessing.Process(target=run_server, args=(mode, port), daemon=True)
+    process.start()
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/ping", timeout=1)
+            return process
+        except httpx.TransportError:
+            if not process.is_alive():
+                raise RuntimeError(f"{mode} server exited with code {process.exitcode}")
+            time.sleep(0.1)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0
+
+
+def directory_stats(path: str):
+    files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+
+def ping_loop(port: int, stop, results):
+    """Ayrı süreçte: yükleme istemcisinin kendi işi /ping ölçümüne karışmaz"""
+    latencies = []
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get("/ping")
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+    results.put(latencies)
+
+
+async def send_uploads(port: int, payloads, uploads: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        async def send(i: int):
+            async with semaphore:
+                response = await client.post("/upload", files={"file": (f"lesson{i}.pdf", payloads[i % len(payloads)],
+                                                                       "application/pdf")})
+                statuses.append(response.status_code)
+
+        await asyncio.gather(*(send(i) for i in range(uploads)))
+    return statuses
+
+
+def measure(port: int, payloads, uploads: int, concurrency: int):
+    stop, results = multiprocessing.Event(), multiprocessing.Queue()
+    pinger = multiprocessing.Process(target=ping_loop, args=(port, stop, results), daemon=True)
+    pinger.start()
+    time.sleep(0.5)
+    start = time.perf_counter()
+    statuses = asyncio.run(send_uploads(port, payloads, uploads, concurrency))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    latencies = results.get()
+    pinger.join()
+    return {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99),
+            "max": max(latencies) * 1000 if latencies else 0, "ok": statuses.count(200), "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--distinct", type=int, default=4, help="farklı içerik sayısı (kalanı tekrar)")
+    args = parser.parse_args()
+
+    payloads = [os.urandom(args.size_mb * 1024 * 1024) for _ in range(args.distinct)]
+    results = {}
+    try:
+        for mode, port, directory in (("legacy", 8785, LEGACY_DIR), ("streaming", 8786, os.environ["UPLOAD_DIR"])):
+            process = serve(mode, port)
+            results[mode] = measure(port, payloads, args.uploads, args.concurrency)
+            process.terminate()
+            process.join()
+            results[mode]["files"], results[mode]["bytes"] = directory_stats(directory)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.uploads} uploads x {args.size_mb} MB ({args.distinct} distinct), concurrency {args.concurrency}")
+    print(f"\n{'mode':<11}{'ping p50':>10}{'ping p99':>10}{'ping max':>10}{'ok':>5}{'total s':>9}"
+          f"{'files':>7}{'disk MB':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<11}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['max']:>10.1f}{r['ok']:>5}{r['seconds']:>9.1f}"
+              f"{r['files']:>7}{r['bytes'] / 1e6:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+get_user_summary regresyon benchmark'ı.
+
+Geçmiş büyüdükçe sorgu sayısının SABİT kaldığını doğrular ve süreyi ölçer.
+Varsayılan olarak bellek içi SQLite kullanır; gerçek veritabanı için DATABASE_URL verin.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_user_summary.py
+"""
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import event, insert
+from app.core.database import SessionLocal, engine, Base
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.models.history import History
+from app.services.history_service import HistoryService
+
+HISTORY_SIZES = [10, 100, 1000, 5000]
+LESSON_COUNT = 10
+QUESTIONS_PER_LESSON = 20
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed(db):
+    student = User(username="bench", email="bench@example.com", hashed_password="x", role="student")
+    db.add(student)
+    for i in range(LESSON_COUNT):
+        db.add(Lesson(title=f"Lesson {i}", difficulty=DifficultyType.MEDIUM))
+    db.commit()
+
+    rows = []
+    for lesson_id in range(1, LESSON_COUNT + 1):
+        for n in range(QUESTIONS_PER_LESSON):
+            rows.append({
+                "lesson_id": lesson_id, "content": "Q?", "option_a": "a", "option_b": "b",
+                "option_c": "c", "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1,
+            })
+    db.execute(insert(Question), rows)
+    db.commit()
+    return student.id
+
+
+def add_history(db, user_id, count, rng):
+    total_questions = LESSON_COUNT * QUESTIONS_PER_LESSON
+    db.execute(insert(History), [{
+        "user_id": user_id,
+        "question_id": rng.randint(1, total_questions),
+        "given_answer": "A",
+        "is_correct": rng.random() < 0.6,
+        "time_spent_seconds": rng.randint(3, 60),
+    } for _ in range(count)])
+    db.commit()
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    service = HistoryService()
+    rng = random.Random(42)
+    counter = QueryCounter()
+
+    db = SessionLocal()
+    try:
+        user_id = seed(db)
+        current = 0
+        query_counts = []
+        for size in HISTORY_SIZES:
+            add_history(db, user_id, size - current, rng)
+            current = size
+
+            counter.count = 0
+            event.listen(engine, "before_cursor_execute", counter)
+            start = time.perf_counter()
+            summary = service.get_user_summary(db, user_id)
+            elapsed = (time.perf_counter() - start) * 1000
+            event.remove(engine, "before_cursor_execute", counter)
+
+            assert summary["total_stats"]["total_solved"] == size
+            query_counts.append(counter.count)
+            print(f"history={size:>6}  queries={counter.count}  time={elapsed:.2f} ms")
+
+        assert len(set(query_counts)) == 1, f"Sorgu sayısı geçmişle birlikte artıyor: {query_counts}"
+        print("OK: sorgu sayısı geçmiş boyutundan bağımsız.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
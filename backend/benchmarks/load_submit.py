@@ -0,0 +1,166 @@
+"""
+Sınav anı yük testi: aynı anda çok sayıda öğrencinin cevap göndermesi.
+
+Aynı iş yükünü iki modda çalıştırır ve karşılaştırır:
+  sync      -> her cevap kendi transaction'ı ile yazılır (HistoryService.submit_answer)
+  buffered  -> cevap değerlendirilip arabelleğe alınır, arka planda toplu yazılır (answer_buffer)
+Onay süresi (istemcinin beklediği süre) ve tüm cevapların veritabanına yazılma süresi ölçülür.
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; MySQL için DATABASE_URL verin
+(DİKKAT: hedef veritabanındaki tablolar silinip yeniden oluşturulur).
+Çalışan bir sunucuya HTTP üzerinden yük vermek için --url kullanın (httpx gerekir).
+
+Kullanım (backend klasöründen):
+    python benchmarks/load_submit.py --students 300 --answers 10 --threads 32
+    python benchmarks/load_submit.py --url http://localhost:8000 --students 300
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'load_submit.db')}"
+os.environ.setdefault("INGESTION_SPILL_DIR", os.path.join(tempfile.gettempdir(), "load_submit_ingestion"))
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert, func
+from app.core.database import engine, Base, SessionLocal
+from app.core.migrations import run_migrations
+from app.models.user import User
+from app.models.lessons import Lesson, DifficultyType
+from app.models.questions import Question
+from app.models.history import History
+from app.schemas.history import HistoryCreate
+from app.services.history_service import HistoryService
+from app.services.answer_ingestion import answer_buffer
+
+QUESTIONS = 200
+
+
+def seed(students: int):
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "username": f"student{i}", "email": f"student{i}@example.com",
+            "hashed_password": "x", "role": "student"} for i in range(students)])
+        conn.execute(insert(Lesson), [{"title": "Exam", "difficulty": DifficultyType.MEDIUM}])
+        conn.execute(insert(Question), [{
+            "lesson_id": 1, "content": "Q?", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty_level": n % 5 + 1} for n in range(QUESTIONS)])
+
+
+def workload(students: int, answers: int):
+    rng = random.Random(3)
+    return [(user_id, HistoryCreate(
+        question_id=rng.randint(1, QUESTIONS),
+        given_answer=rng.choice("ABCD"),
+        time_spent_seconds=rng.randint(3, 60)))
+        for _ in range(answers) for user_id in range(1, students + 1)]
+
+
+def history_count():
+    db = SessionLocal()
+    try:
+        return db.query(func.count(History.id)).scalar()
+    finally:
+        db.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def run(mode: str, jobs, threads: int):
+    service = HistoryService()
+    before = history_count()
+
+    def submit(job):
+        user_id, data = job
+        db = SessionLocal()
+        start = time.perf_counter()
+        try:
+            for attempt in range(50):
+                try:
+                    if mode == "buffered":
+                        service.queue_answer(db, user_id, data, answer_buffer)
+                    else:
+                        service.submit_answer(db, user_id, data)
+                    break
+                except Exception:
+                    # SQLite kilit / kuyruk dolu: istemci gibi kısa bekleyip tekrar dener
+                    db.rollback()
+                    time.sleep(0.01 * (attempt + 1))
+        finally:
+            db.close()
+        return time.perf_counter() - start
+
+    if mode == "buffered":
+        answer_buffer.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(submit, jobs))
+    acked = time.perf_counter() - start
+    if mode == "buffered":
+        answer_buffer.stop()
+        stats = answer_buffer.stats()
+    durable = time.perf_counter() - start
+
+    written = history_count() - before
+    print(f"\n=== {mode} ===")
+    print(f"acknowledged {len(jobs):,} answers in {acked:.2f} s  ({len(jobs) / acked:,.0f} answers/s)")
+    print(f"ack latency  p50 {percentile(latencies, 0.5):.1f} ms   p99 {percentile(latencies, 0.99):.1f} ms")
+    print(f"all rows written after {durable:.2f} s  ({written:,} rows)")
+    if mode == "buffered":
+        print(f"batches {stats['batches']}, avg size {stats['avg_batch_size']}, "
+              f"flush p95 {stats['flush_latency_ms']['p95']} ms")
+    return len(jobs) / acked
+
+
+def run_http(url: str, jobs, threads: int):
+    import httpx
+
+    def submit(job):
+        user_id, data = job
+        start = time.perf_counter()
+        with httpx.Client(base_url=url) as client:
+            while client.post(f"/history/submit?user_id={user_id}", json=data.model_dump()).status_code == 503:
+                time.sleep(0.05)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(submit, jobs))
+    elapsed = time.perf_counter() - start
+    print(f"{len(jobs):,} answers in {elapsed:.2f} s ({len(jobs) / elapsed:,.0f} answers/s), "
+          f"p50 {percentile(latencies, 0.5):.1f} ms, p99 {percentile(latencies, 0.99):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--answers", type=int, default=10, help="öğrenci başına cevap")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--url", help="Çalışan sunucu adresi (verilirse HTTP üzerinden test edilir)")
+    args = parser.parse_args()
+
+    jobs = workload(args.students, args.answers)
+    if args.url:
+        return run_http(args.url, jobs, args.threads)
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    seed(args.students)
+    sync_rate = run("sync", jobs, args.threads)
+    seed(args.students)
+    buffered_rate = run("buffered", jobs, args.threads)
+    print(f"\nthroughput gain: {buffered_rate / sync_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Analitik için histories (ve küçük boyut tabloları) sütunsal anlık görüntüye aktarılır.
+Varsayılan olarak sadece son aktarımdan sonra eklenen cevaplar yazılır; --full tüm tabloyu
+yeniden yazar. Biriken küçük parçalar ANALYTICS_SNAPSHOT_MAX_SEGMENTS aşılınca artımlı aktarımda da
+birleştirilir. Cron ile düzenli çalıştırılabilir.
+
+Kullanım (backend klasöründen):
+    python scripts/export_snapshot.py
+    python scripts/export_snapshot.py --full --chunk-size 200000
+"""
+import argparse
+import sys
+import os
+import time
+
+# backend klasörünü Python yoluna ekle (app paketine erişim için)
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.database import SessionLocal
+from app.services.history_snapshot import HistorySnapshotExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History analytics snapshot export")
+    parser.add_argument("--full", action="store_true", help="Artımlı yerine tam aktarım")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Sunucu taraflı imleç parça boyutu")
+    parser.add_argument("--directory", default=None, help="Varsayılan: ANALYTICS_SNAPSHOT_DIR")
+    args = parser.parse_args()
+
+    exporter = HistorySnapshotExporter(args.directory, args.chunk_size)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = exporter.export(db, full=args.full)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    mode = "Tam" if result["full"] else "Artımlı"
+    compacted = ", küçük parçalar birleştirildi" if result["compacted"] else ""
+    print(f"{mode} aktarım: {result['appended']:,} yeni cevap, toplam {result['rows']:,} satır / "
+          f"{result['segments']} parça ({exporter.directory}){compacted}, {elapsed:.1f} s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Veritabanı şemasını günceller (eksik tablolar + sıralı migration adımları).
+
+Kullanım (backend klasöründen):
+    python scripts/migrate.py            # bekleyen migration'ları uygula
+    python scripts/migrate.py --status   # hangi migration'ların uygulandığını göster
+"""
+import argparse
+import sys
+import os
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.database import engine
+from app.core.migrations import MIGRATIONS, applied_versions, run_migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema migration tool")
+    parser.add_argument("--status", action="store_true", help="Sadece durumu göster")
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions(engine)
+        for version, _ in MIGRATIONS:
+            print(f"[{'x' if version in done else ' '}] {version}")
+        return 0
+
+    applied = run_migrations(engine, verbose=True)
+    if not applied:
+        print("Veritabanı güncel, uygulanacak migration yok.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
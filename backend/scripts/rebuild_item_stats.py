@@ -0,0 +1,45 @@
+"""
+question_item_stats tablosunu (soru bazlı madde istatistikleri) tüm histories tablosundan yeniden oluşturur.
+0007_question_item_stats migration'ından sonra bir kez çalıştırılır. Ayırt edicilik öğrencilerin güncel
+genel yeteneğiyle hesaplanır; refit_abilities.py'den sonra çalıştırmak önerilir.
+
+Kullanım (backend klasöründen):
+    python scripts/rebuild_item_stats.py
+    python scripts/rebuild_item_stats.py --chunk-size 200000
+"""
+import argparse
+import sys
+import os
+import time
+
+# backend klasörünü Python yoluna ekle (app paketine erişim için)
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.database import SessionLocal, engine
+from app.core.migrations import run_migrations
+from app.services.item_stats_service import ItemStatsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Question item statistics rebuild")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Sunucu taraflı imleç parça boyutu")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = ItemStatsService().rebuild(db, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"{result['rows']:,} cevaptan {result['questions']:,} sorunun madde istatistikleri "
+          f"{elapsed:.1f} s içinde yeniden oluşturuldu.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
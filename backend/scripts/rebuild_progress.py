@@ -0,0 +1,51 @@
+"""
+user_progress tablosunu histories tablosundan yeniden oluşturur veya tutarlılığını kontrol eder.
+
+Kullanım (backend klasöründen):
+    python scripts/rebuild_progress.py           # tüm sayaçları yeniden yaz
+    python scripts/rebuild_progress.py --check   # sadece kontrol et, farkları listele
+"""
+import argparse
+import sys
+import os
+
+# backend klasörünü Python yoluna ekle (app paketine erişim için)
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.database import SessionLocal, engine, Base
+from app.models.user import User
+from app.models.lessons import Lesson
+from app.models.questions import Question
+from app.models.history import History
+from app.models.progress import UserProgress
+from app.services.progress_service import ProgressService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_progress backfill / consistency tool")
+    parser.add_argument("--check", action="store_true", help="Sadece tutarlılık kontrolü yap")
+    args = parser.parse_args()
+
+    # user_progress tablosu eski kurulumlarda henüz olmayabilir
+    Base.metadata.create_all(bind=engine)
+
+    service = ProgressService()
+    db = SessionLocal()
+    try:
+        if args.check:
+            mismatches = service.check_consistency(db)
+            for m in mismatches:
+                print(f"user_id={m['user_id']} expected={m['expected']} actual={m['actual']}")
+            print(f"{len(mismatches)} tutarsız kullanıcı bulundu.")
+            return 1 if mismatches else 0
+
+        count = service.rebuild_all(db)
+        print(f"{count} kullanıcının ilerleme sayaçları yeniden oluşturuldu.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
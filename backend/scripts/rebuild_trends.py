@@ -0,0 +1,44 @@
+"""
+learning_rollups tablosunu (gün / hafta öğrenme eğilimi) tüm histories tablosundan yeniden oluşturur.
+0006_learning_rollups migration'ından sonra bir kez, tutarsızlık şüphesinde tekrar çalıştırılabilir.
+
+Kullanım (backend klasöründen):
+    python scripts/rebuild_trends.py
+    python scripts/rebuild_trends.py --chunk-size 200000
+"""
+import argparse
+import sys
+import os
+import time
+
+# backend klasörünü Python yoluna ekle (app paketine erişim için)
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.database import SessionLocal, engine
+from app.core.migrations import run_migrations
+from app.services.trend_service import TrendService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learning trend rollup rebuild")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Sunucu taraflı imleç parça boyutu")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = TrendService().rebuild_all(db, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"{result['rows']:,} cevaptan {result['users']:,} öğrenci için {result['rollups']:,} rollup satırı "
+          f"{elapsed:.1f} s içinde yeniden oluşturuldu.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
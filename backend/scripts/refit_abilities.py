@@ -0,0 +1,46 @@
+"""
+Yetenek (theta) ve soru zorluğu tahminlerini tüm histories tablosu üzerinden yeniden hesaplar.
+0003_ability_tables migration'ından sonra çalıştırılması önerilir: çalıştırılmazsa yetenek kaydı olmayan
+öğrenciler mevcut seviyelerinin ortasından başlar (seviyeleri düşmez), geçmiş cevapları hesaba katılmaz.
+
+Kullanım (backend klasöründen):
+    python scripts/refit_abilities.py
+    python scripts/refit_abilities.py --epochs 50 --chunk-size 200000
+"""
+import argparse
+import sys
+import os
+import time
+
+# backend klasörünü Python yoluna ekle (app paketine erişim için)
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.database import SessionLocal, engine
+from app.core.migrations import run_migrations
+from app.services.ability_service import AbilityService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ability / difficulty re-fit")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Sunucu taraflı imleç parça boyutu")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = AbilityService().refit_all(db, epochs=args.epochs, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"{result['rows']:,} cevap, {result['users']:,} öğrenci, {result['lessons']:,} ders, "
+          f"{result['questions']:,} soru {elapsed:.1f} s içinde yeniden hesaplandı.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
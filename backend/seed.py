@@ -12,6 +12,8 @@ try:
     from app.models.lessons import Lesson
     from app.models.questions import Question
     from app.models.history import History
+    from app.models.progress import UserProgress
+    from app.models.ability import UserAbility
     print("Modüller başarıyla yüklendi.")
 except ImportError as e:
     print(f"Hata: Modül bulunamadı! Mevcut konum: {os.getcwd()}")
@@ -25,13 +25,24 @@ const ViewQuestions = () => {
         }
     };
 
+    const waitForJob = async (jobId) => {
+        while (true) {
+            const res = await API.get(`/questions/generate/jobs/${jobId}`);
+            if (res.data.status === 'completed' || res.data.status === 'failed') return res.data;
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+        }
+    };
+
     // --- YENİ FONKSİYON: AI Soru Üretme ---
     const handleGenerateAI = async () => {
         setGenerating(true);
         try {
             toast.info("AI is analyzing the topic and generating questions...");
             const res = await API.post(`/questions/generate/${lessonId}`);
-            toast.success(res.data.message);
+            // Üretim arka planda çalışır, iş bitene kadar durumunu sorgula
+            const job = await waitForJob(res.data.job_id);
+            if (job.status !== 'completed') throw new Error(job.error || 'Generation failed');
+            toast.success(`${job.result.count} AI questions generated successfully!`);
             fetchQuestions(); // Listeyi yenile
         } catch (error) {
             console.error(error);